@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the port balancing of ArchSemantics.assign_optimal_throughput on large unrolled
+kernels. The result is compared bit by bit against a reference, which re-reduces the whole
+kernel with get_throughput_sum() in every balancing step, as OSACA did before keeping running
+per-port sums.
+
+Usage: python benchmarks/benchmark_optimal_throughput.py [--arch ARCH] [--copies N] [KERNEL]
+"""
+import argparse
+import os
+import time
+from copy import deepcopy
+
+from osaca.osaca import get_asm_parser
+from osaca.semantics import ArchSemantics, MachineModel, reduce_to_section
+
+
+class ReferenceArchSemantics(ArchSemantics):
+    """Port balancing with a full re-reduction of the kernel for every port sum"""
+
+    def _get_port_sums(self, port_totals, indices):
+        tp_sum = self.get_throughput_sum(self.kernel)
+        return [tp_sum[i] for i in indices]
+
+
+def get_kernel(path, arch, copies):
+    """Return ``copies`` copies of the marked kernel in ``path`` with assigned semantics."""
+    parser = get_asm_parser(arch)
+    with open(path) as f:
+        kernel = reduce_to_section(
+            parser.parse_file(f.read()), MachineModel.get_isa_for_arch(arch)
+        )
+    kernel = [deepcopy(instruction_form) for _ in range(copies) for instruction_form in kernel]
+    for line_number, instruction_form in enumerate(kernel, start=1):
+        instruction_form['line_number'] = line_number
+    ArchSemantics(MachineModel(arch=arch)).add_semantics(kernel)
+    return kernel
+
+
+def benchmark(semantics, kernel):
+    """Return balanced port pressure of ``kernel`` and the runtime in seconds."""
+    kernel = deepcopy(kernel)
+    semantics.kernel = kernel
+    start = time.perf_counter()
+    semantics.assign_optimal_throughput(kernel)
+    return [instruction_form['port_pressure'] for instruction_form in kernel], (
+        time.perf_counter() - start
+    )
+
+
+def main():
+    default_kernel = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'examples', 'add', 'add.s.csx.gcc.s',
+    )
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--arch', default='csx', help='micro-architecture (default: csx)')
+    parser.add_argument(
+        '--copies', type=int, default=20, help='number of copies of the kernel (default: 20)'
+    )
+    parser.add_argument('kernel', nargs='?', default=default_kernel, help='marked kernel')
+    args = parser.parse_args()
+
+    kernel = get_kernel(args.kernel, args.arch, args.copies)
+    machine_model = MachineModel(arch=args.arch)
+    result, runtime = benchmark(ArchSemantics(machine_model), kernel)
+    reference, reference_runtime = benchmark(ReferenceArchSemantics(machine_model), kernel)
+    print('{} lines on {}'.format(len(kernel), args.arch.upper()))
+    print('running port sums:   {:8.3f} s'.format(runtime))
+    print('full re-reduction:   {:8.3f} s'.format(reference_runtime))
+    print('bit-identical:       {}'.format(result == reference))
+    if result != reference:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
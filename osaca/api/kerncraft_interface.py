@@ -25,7 +25,7 @@ class Capturing(list):
 
 class KerncraftAPI(object):
     def __init__(self, arch, code):
-        self.machine_model = MachineModel(arch=arch)
+        self.machine_model = MachineModel.get_shared(arch=arch)
         self.semantics = ArchSemantics(self.machine_model)
         isa = self.machine_model.get_ISA().lower()
         if isa == 'aarch64':
@@ -33,14 +33,21 @@ class KerncraftAPI(object):
         elif isa == 'x86':
             self.parser = ParserX86ATT()
 
-        parsed_code = self.parser.parse_file(code)
+        parsed_code = self.parser.parse_lazy(code)
         self.kernel = reduce_to_section(parsed_code, self.machine_model.get_ISA())
         self.semantics.add_semantics(self.kernel)
+        self._kernel_graph = None
+
+    @property
+    def kernel_graph(self):
+        """Dependency graph of the kernel, created on first access and shared by all queries."""
+        if self._kernel_graph is None:
+            self._kernel_graph = KernelDG(self.kernel, self.parser, self.machine_model)
+        return self._kernel_graph
 
     def create_output(self, verbose=False):
-        kernel_graph = KernelDG(self.kernel, self.parser, self.machine_model)
         frontend = Frontend(arch=self.machine_model.get_arch())
-        return frontend.full_analysis(self.kernel, kernel_graph, verbose=verbose)
+        return frontend.full_analysis(self.kernel, self.kernel_graph, verbose=verbose)
 
     def get_unmatched_instruction_ratio(self):
         unmatched_counter = 0
@@ -64,15 +71,7 @@ class KerncraftAPI(object):
         return (self.get_lcd(), self.get_cp())
 
     def get_cp(self):
-        kernel_graph = KernelDG(self.kernel, self.parser, self.machine_model)
-        kernel_cp = kernel_graph.get_critical_path()
-        return sum([x['latency_cp'] for x in kernel_cp])
+        return self.kernel_graph.critical_path_latency
 
     def get_lcd(self):
-        kernel_graph = KernelDG(self.kernel, self.parser, self.machine_model)
-        lcd_dict = kernel_graph.get_loopcarried_dependencies()
-        lcd = 0.0
-        for dep in lcd_dict:
-            lcd_tmp = sum([x['latency_lcd'] for x in lcd_dict[dep]['dependencies']])
-            lcd = lcd_tmp if lcd_tmp > lcd else lcd
-        return lcd
+        return max([0.0] + list(self.kernel_graph.loopcarried_latencies.values()))
@@ -3,9 +3,11 @@
 Frontend interface for OSACA. Does everything necessary for analysis report generation.
 """
 import io
+import json
 import os
 import re
 from datetime import datetime as dt
+from itertools import zip_longest
 
 from osaca.semantics import INSTR_FLAGS, ArchSemantics, KernelDG, MachineModel
 
@@ -41,9 +43,9 @@ class Frontend(object):
         self._arch = arch
         if arch:
             self._arch = arch.lower()
-            self._machine_model = MachineModel(arch=arch, lazy=True)
+            self._machine_model = MachineModel.get_shared(arch=arch, lazy=True)
         elif path_to_yaml:
-            self._machine_model = MachineModel(path_to_yaml=path_to_yaml, lazy=True)
+            self._machine_model = MachineModel.get_shared(path_to_yaml=path_to_yaml, lazy=True)
             self._arch = self._machine_model.get_arch()
 
     def _is_comment(self, instruction_form):
@@ -157,7 +159,56 @@ class Frontend(object):
             )
         return s
 
-    def full_analysis(self, kernel, kernel_dg: KernelDG, ignore_unknown=False, arch_warning=False, length_warning=False, verbose=False):
+    def unroll_analysis(self, kernel, kernel_dg: KernelDG, unroll, ignore_unknown=False):
+        """
+        Build a report of the loop unrolling with the cycles per source-level iteration.
+
+        :param kernel: kernel to report on
+        :type kernel: list
+        :param kernel_dg: directed graph containing CP and LCD
+        :type kernel_dg: :class:`~osaca.semantics.KernelDG`
+        :param unroll: unrolling of the loop as returned by :func:`~osaca.osaca.analyze_kernel`
+        :type unroll: dict
+        :param ignore_unknown: flag for showing result despite of missing instructions, defaults to
+            `False`
+        :type ignore_unknown: bool, optional
+        """
+        s = '\n\nLoop Unrolling Report\n---------------------\n'
+        s += 'Loop label:             {}\n'.format(unroll['label'])
+        s += 'Unroll factor:          {}\n'.format(unroll['unroll_factor'])
+        s += 'Unrolled copies:        {}\n'.format(unroll['copies'])
+        s += 'Stride:                 {} B\n'.format(unroll['stride'])
+        s += 'Pointer increment:      {} B\n'.format(unroll['pointer_increment'])
+        if unroll['canonical'] is None:
+            analyzed = 'full loop body'
+        elif unroll['canonical']:
+            analyzed = 'canonical iteration'
+        else:
+            analyzed = 'full loop body (no canonical iteration found)'
+        s += 'Analyzed kernel:        {} ({} source iterations)\n'.format(
+            analyzed, unroll['iterations']
+        )
+        if not ignore_unknown and INSTR_FLAGS.TP_UNKWN in [
+            flag for instr in kernel for flag in instr['flags']
+        ]:
+            return s
+        s += 'Cycles per source iteration:\n'
+        for name, cycles in zip(
+            ['TP', 'CP', 'LCD'], self._get_unroll_cycles(kernel, kernel_dg, unroll)
+        ):
+            s += '    {:4} {:6.2f}\n'.format(name, cycles)
+        return s
+
+    def full_analysis(
+        self,
+        kernel,
+        kernel_dg: KernelDG,
+        ignore_unknown=False,
+        arch_warning=False,
+        length_warning=False,
+        verbose=False,
+        unroll=None,
+    ):
         """
         Build the full analysis report including header, the symbol map, the combined TP/CP/LCD
         view and the list based LCD view.
@@ -175,6 +226,9 @@ class Frontend(object):
         :type print_length_warning: boolean, optional
         :param verbose: flag for verbosity level, defaults to False
         :type verbose: boolean, optional
+        :param unroll: unrolling of the loop for the unrolling report, see
+            :meth:`unroll_analysis`, defaults to `None`
+        :type unroll: dict, optional
         """
         return (
             self._header_report()
@@ -187,7 +241,98 @@ class Frontend(object):
                 ignore_unknown,
             )
             + self.loopcarried_dependencies(kernel_dg.get_loopcarried_dependencies())
+            + (
+                self.unroll_analysis(kernel, kernel_dg, unroll, ignore_unknown)
+                if unroll is not None
+                else ''
+            )
+        )
+
+    def analysis_result(
+        self, kernel, kernel_dg: KernelDG, arch_warning=False, length_warning=False, unroll=None
+    ):
+        """
+        Build the analysis result as plain data structure with the content of
+        :meth:`full_analysis`, but without formatting the report. The result can be serialized
+        with :func:`dump_result`.
+
+        Unlike in the report, the totals are also given if instruction forms are unknown, check
+        the ``unknown`` count or the ``tp_unknown`` flag of the lines instead.
+
+        :param kernel: kernel to report on
+        :type kernel: list
+        :param kernel_dg: directed graph containing CP and LCD
+        :type kernel_dg: :class:`~osaca.semantics.KernelDG`
+        :param arch_warning: flag for warning about a default micro-architecture
+        :type arch_warning: boolean, optional
+        :param length_warning: flag for warning about the kernel length
+        :type length_warning: boolean, optional
+        :param unroll: unrolling of the loop, see :meth:`unroll_analysis`, defaults to `None`
+        :type unroll: dict, optional
+        :returns: `dict` containing only dicts, lists, strings, numbers, booleans and `None`
+        """
+        cp_kernel = kernel_dg.get_critical_path()
+        dep_dict = kernel_dg.get_loopcarried_dependencies()
+        ports = self._machine_model.get_ports()
+        tp_sum = [float(x) for x in ArchSemantics.get_throughput_sum(kernel)]
+        throughput = max(tp_sum) if tp_sum else 0.0
+        lcds = [
+            {
+                'root': dep,
+                'latency': float(kernel_dg.loopcarried_latencies[dep]),
+                'lines': [x['line_number'] for x in dep_dict[dep]['dependencies']],
+            }
+            for dep in dep_dict
+        ]
+        longest_lcd = max(lcds, key=lambda lcd: lcd['latency']) if lcds else None
+        cp_latencies = {x['line_number']: float(x['latency_cp']) for x in cp_kernel}
+        lcd_latencies = (
+            {
+                x['line_number']: float(x['latency_lcd'])
+                for x in dep_dict[longest_lcd['root']]['dependencies']
+            }
+            if longest_lcd
+            else {}
         )
+        lines = [
+            {
+                'line_number': instruction_form['line_number'],
+                'line': instruction_form['line'].strip(),
+                'instruction': instruction_form['instruction'],
+                'port_pressure': [float(x) for x in instruction_form['port_pressure']],
+                'throughput': float(instruction_form['throughput']),
+                'latency': float(instruction_form['latency']),
+                'latency_cp': cp_latencies.get(instruction_form['line_number']),
+                'latency_lcd': lcd_latencies.get(instruction_form['line_number']),
+                'flags': sorted(instruction_form['flags']),
+            }
+            for instruction_form in kernel
+        ]
+        warnings = []
+        if arch_warning:
+            warnings.append('arch')
+        if length_warning:
+            warnings.append('length')
+        return {
+            'version': _get_version('__init__.py'),
+            'file': self._filename,
+            'arch': self._arch.upper(),
+            'warnings': warnings,
+            'ports': list(ports),
+            'lines': lines,
+            'port_pressure': tp_sum,
+            'throughput': throughput,
+            'bottleneck_ports': [
+                port for port, pressure in zip(ports, tp_sum)
+                if pressure == throughput and throughput > 0
+            ],
+            'critical_path': float(sum(cp_latencies.values())),
+            'critical_path_lines': [x['line_number'] for x in cp_kernel],
+            'loopcarried': longest_lcd['latency'] if longest_lcd else 0.0,
+            'loopcarried_dependencies': lcds,
+            'unknown': len([line for line in lines if INSTR_FLAGS.TP_UNKWN in line['flags']]),
+            'unroll': self._get_unroll_result(kernel, kernel_dg, unroll),
+        }
 
     def combined_view(
         self, kernel, cp_kernel: KernelDG, dep_dict, ignore_unknown=False, show_cmnts=True
@@ -290,6 +435,53 @@ class Frontend(object):
     # HELPER FUNCTIONS
     ####################
 
+    def _get_totals(self, kernel, kernel_dg):
+        """Returns throughput, CP and longest LCD latency of the kernel."""
+        tp_sum = ArchSemantics.get_throughput_sum(kernel)
+        lcd_sums = list(kernel_dg.loopcarried_latencies.values())
+        return (
+            float(max(tp_sum)) if tp_sum else 0.0,
+            float(kernel_dg.critical_path_latency),
+            float(max(lcd_sums)) if lcd_sums else 0.0,
+        )
+
+    def _get_unroll_cycles(self, kernel, kernel_dg, unroll):
+        """Returns throughput, CP and longest LCD latency per source-level iteration."""
+        throughput, critical_path, loopcarried = self._get_totals(kernel, kernel_dg)
+        if unroll['canonical']:
+            # the canonical copy stands for all unrolled copies, the loop control is executed
+            # once per assembly iteration
+            copy_tp_sum = ArchSemantics.get_throughput_sum(
+                [x for x in kernel if x['line_number'] not in unroll['control']]
+            )
+            control_tp_sum = ArchSemantics.get_throughput_sum(
+                [x for x in kernel if x['line_number'] in unroll['control']]
+            )
+            tp_sum = [
+                unroll['copies'] * copy_tp + control_tp
+                for copy_tp, control_tp in zip_longest(copy_tp_sum, control_tp_sum, fillvalue=0)
+            ]
+            throughput = float(max(tp_sum)) if tp_sum else 0.0
+        # CP and LCDs of the copies run in parallel to the ones of the loop control, i.e., cover
+        # a full assembly iteration
+        return (
+            throughput / unroll['unroll_factor'],
+            critical_path / unroll['unroll_factor'],
+            loopcarried / unroll['unroll_factor'],
+        )
+
+    def _get_unroll_result(self, kernel, kernel_dg, unroll):
+        """Returns unrolling of the loop with the cycles per source-level iteration."""
+        if unroll is None:
+            return None
+        result = dict(unroll)
+        for name, cycles in zip(
+            ['throughput', 'critical_path', 'loopcarried'],
+            self._get_unroll_cycles(kernel, kernel_dg, unroll),
+        ):
+            result[name] = cycles
+        return result
+
     def _missing_instruction_error(self, amount):
         """Returns the warning for if any instruction form in the analysis is missing."""
         s = (
@@ -429,3 +621,82 @@ class Frontend(object):
     
     def _port_binding_summary(self):
         raise NotImplementedError
+
+
+def dump_result(result, fmt='json'):
+    """
+    Serialize an analysis result, e.g., of :meth:`Frontend.analysis_result`.
+
+    :param result: analysis result
+    :type result: dict
+    :param fmt: output format, either "json" (one line) or "msgpack", defaults to "json"
+    :type fmt: str, optional
+    :returns: `str` for JSON, `bytes` for msgpack
+    """
+    if fmt == 'json':
+        return json.dumps(result, separators=(',', ':'))
+    elif fmt == 'msgpack':
+        # optional dependency
+        import msgpack
+
+        return msgpack.packb(result, use_bin_type=True)
+    raise ValueError('Unknown result format {!r}.'.format(fmt))
+
+
+def comparison_analysis(filename, results, ignore_unknown=False, length_warning=False):
+    """
+    Build the comparison report of one kernel analyzed for multiple micro-architectures.
+
+    :param filename: path to the analyzed kernel file for documentation
+    :type filename: str
+    :param results: one summary dict per micro-architecture with the keys ``arch``,
+        ``throughput``, ``bottleneck_ports``, ``critical_path``, ``loopcarried`` and ``unknown``
+    :type results: list
+    :param ignore_unknown: flag for showing results despite of missing instructions, defaults to
+        `False`
+    :type ignore_unknown: bool, optional
+    :param length_warning: flag for additional user warning to specify kernel length with --lines
+    :type length_warning: bool, optional
+    """
+    adjust = 20
+    s = 'Open Source Architecture Code Analyzer (OSACA) - {}\n'.format(
+        _get_version('__init__.py')
+    )
+    s += 'Analyzed file:'.ljust(adjust) + '{}\n'.format(filename)
+    s += 'Architectures:'.ljust(adjust) + '{}\n'.format(
+        ', '.join(r['arch'].upper() for r in results)
+    )
+    s += 'Timestamp:'.ljust(adjust) + '{}\n'.format(dt.utcnow().strftime('%Y-%m-%d %H:%M:%S'))
+    if length_warning:
+        s += (
+            '\nWARNING: You are analyzing a large amount of instruction forms. Analysis across '
+            'loops/block boundaries often do not make much sense.\n'
+            '         Specify the kernel length with --lines. See --help for more information.\n'
+        )
+    s += '\n\nArchitecture Comparison Report\n------------------------------\n'
+    row = '{:7}|{:>9} |{:>9} |{:>9} |{:>8} | {}\n'
+    s += row.format(' Arch', 'TP [cy]', 'CP [cy]', 'LCD [cy]', 'Unknown', 'Bottleneck ports')
+    s += '+'.join(['-' * 7, '-' * 10, '-' * 10, '-' * 10, '-' * 9, '-' * 18]) + '\n'
+    missing = False
+    for r in results:
+        if r['unknown'] > 0 and not ignore_unknown:
+            # no final analysis with missing performance data
+            missing = True
+            s += row.format(' ' + r['arch'].upper(), '-', '-', '-', r['unknown'], '-')
+            continue
+        s += row.format(
+            ' ' + r['arch'].upper(),
+            '{:.2f}'.format(r['throughput']),
+            '{:.1f}'.format(r['critical_path']),
+            '{:.1f}'.format(r['loopcarried']),
+            r['unknown'],
+            ', '.join(r['bottleneck_ports']),
+        )
+    if missing:
+        s += (
+            '\nWARNING: The performance data for some instructions is missing, no final analysis '
+            'is given for these architectures.\n'
+            '         If you want to ignore this warning and run the analysis anyway, start osaca '
+            'with --ignore-unknown flag.\n'
+        )
+    return s
@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 """CLI for OSACA"""
 import argparse
+import glob
 import io
 import os
 import re
 import sys
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
 
+from osaca import utils
 from osaca.db_interface import import_benchmark_output, sanity_check
-from osaca.frontend import Frontend
+from osaca.frontend import Frontend, comparison_analysis, dump_result
 from osaca.parser import BaseParser, ParserAArch64, ParserX86ATT
-from osaca.semantics import (INSTR_FLAGS, ArchSemantics, KernelDG,
-                             MachineModel, reduce_to_section)
+from osaca.result_cache import ResultCache
+from osaca.semantics import (INSTR_FLAGS, ArchSemantics, ISASemantics, KernelDG,
+                             MachineModel, find_unroll_info, get_canonical_iteration,
+                             reduce_to_section)
 
 
 SUPPORTED_ARCHS = [
@@ -32,6 +38,7 @@ DEFAULT_ARCHS = {
     'aarch64': 'A64FX',
     'x86': 'SKX',
 }
+ASM_EXTENSIONS = ('.s', '.S', '.asm')
 
 
 # Stolen from pip
@@ -86,7 +93,9 @@ def create_parser(parser=None):
         '--arch',
         type=str,
         help='Define architecture (SNB, IVB, HSW, BDW, SKX, CSX, ICL, ZEN1, ZEN2, TX2, N1, '
-        'A64FX). If no architecture is given, OSACA assumes a default uarch for x86/AArch64.',
+        'A64FX). If no architecture is given, OSACA assumes a default uarch for x86/AArch64. '
+        'A comma-separated list or "all" compares the kernel on multiple architectures of the '
+        'same ISA.',
     )
     parser.add_argument(
         '--fixed',
@@ -94,6 +103,12 @@ def create_parser(parser=None):
         help='Run the throughput analysis with fixed probabilities for all suitable ports per '
         'instruction. Otherwise, OSACA will print the optimal port utilization for the kernel.',
     )
+    parser.add_argument(
+        '--exact',
+        action='store_true',
+        help='Run the throughput analysis with an exact min-max flow port scheduler instead of '
+        'the iterative balancing in steps of 0.01 cy. Cannot be combined with --fixed.',
+    )
     parser.add_argument(
         '--lines',
         type=str,
@@ -141,6 +156,13 @@ def create_parser(parser=None):
         help='Output path for .dot file export. If "." is given, the file will be stored as '
         '"./osaca_dg.dot"',
     )
+    parser.add_argument(
+        '--canonical',
+        action='store_true',
+        help='Analyze one canonical iteration of an unrolled loop instead of the full loop body '
+        'and scale the results to the unrolled loop. Falls back to the full loop body if the '
+        'unrolled copies cannot be separated.',
+    )
     parser.add_argument(
         '--ignore-unknown',
         dest='ignore_unknown',
@@ -157,7 +179,51 @@ def create_parser(parser=None):
         help='Write analysis to this file (default to stdout).'
     )
     parser.add_argument(
-        'file', type=argparse.FileType('r'), help='Path to object (ASM or instruction file).'
+        '--format',
+        dest='format',
+        choices=['text', 'json', 'msgpack'],
+        default='text',
+        help='Output format of the analysis. "json" prints one JSON object per line, "msgpack" '
+        'writes a stream of MessagePack objects (requires the msgpack module) (default: text).',
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Store analysis results in a cache in ~/.osaca/cache and reuse them for kernels '
+        'analyzed before with the same machine models and options. Requires --format json or '
+        'msgpack.',
+    )
+    parser.add_argument(
+        '--cache-size',
+        metavar='MB',
+        type=int,
+        default=ResultCache.MAX_SIZE // 1024 ** 2,
+        help='Maximum size of the result cache in MB, least recently used results are evicted '
+        'first (default: {}).'.format(ResultCache.MAX_SIZE // 1024 ** 2),
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='BATCH',
+        type=str,
+        default=None,
+        help='Analyze many kernels in one run. BATCH is either a directory (all assembly files '
+        'in it), a glob pattern or a manifest file listing one kernel path per line. Cannot be '
+        'combined with a FILEPATH.',
+    )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        metavar='N',
+        type=int,
+        default=1,
+        help='Number of worker processes for --batch analysis or analysis on multiple '
+        'architectures. 0 uses all available CPUs (default: 1).',
+    )
+    parser.add_argument(
+        'file',
+        type=argparse.FileType('r'),
+        nargs='?',
+        help='Path to object (ASM or instruction file).',
     )
 
     return parser
@@ -177,10 +243,25 @@ def check_arguments(args, parser):
             'DB check and data import cannot work with a default microarchitecture. '
             'Please see --help for all valid architecture codes.'
         )
-    elif args.arch is not None and args.arch.upper() not in SUPPORTED_ARCHS:
+    elif args.arch is not None and args.arch.lower() != 'all':
+        archs = args.arch.upper().split(',')
+        if any(arch not in SUPPORTED_ARCHS for arch in archs):
+            parser.error(
+                'Microarchitecture not supported. Please see --help for all valid architecture '
+                'codes.'
+            )
+        if len(set(MachineModel.get_isa_for_arch(arch) for arch in archs)) > 1:
+            parser.error('All microarchitectures given by --arch must have the same ISA.')
+    multi_arch = is_multi_arch(args.arch)
+    if multi_arch and (
+        args.check_db or 'import_data' in args or args.insert_marker or args.dotpath
+    ):
         parser.error(
-            'Microarchitecture not supported. Please see --help for all valid architecture codes.'
+            'Multiple architectures cannot be combined with --db-check, --import, '
+            '--insert-marker or --export-graph'
         )
+    if multi_arch and args.canonical:
+        parser.error('Multiple architectures cannot be combined with --canonical')
     if 'import_data' in args and args.import_data not in supported_import_files:
         parser.error(
             'Microbenchmark not supported for data import. Please see --help for all valid '
@@ -188,6 +269,34 @@ def check_arguments(args, parser):
         )
     if args.internet_check and not args.check_db:
         parser.error('--online requires --check-db')
+    if args.exact and args.fixed:
+        parser.error('--exact cannot be combined with --fixed')
+    if args.batch is None and args.file is None:
+        parser.error('the following arguments are required: file')
+    if args.batch is not None:
+        if args.file is not None:
+            parser.error('--batch cannot be combined with a file')
+        if args.check_db or 'import_data' in args or args.insert_marker or args.dotpath:
+            parser.error(
+                '--batch cannot be combined with --db-check, --import, --insert-marker or '
+                '--export-graph'
+            )
+    if args.format == 'msgpack':
+        try:
+            import msgpack  # noqa: F401
+        except ImportError:
+            parser.error(
+                'Module msgpack not installed. Use \'pip install --user msgpack\' for '
+                'installation or choose another --format.'
+            )
+    if args.cache and args.format == 'text':
+        parser.error('--cache requires --format json or msgpack')
+    if args.cache_size < 1:
+        parser.error('--cache-size must be at least 1 MB')
+    if args.jobs < 0:
+        parser.error('--jobs must not be negative')
+    if args.jobs != 1 and args.batch is None and not multi_arch:
+        parser.error('--jobs requires --batch or multiple architectures')
 
 
 def import_data(benchmark_type, arch, filepath, output_file=sys.stdout):
@@ -256,18 +365,207 @@ def inspect(args, output_file=sys.stdout):
     """
     # Read file
     code = args.file.read()
+    write_analysis(inspect_kernel(code, args.file.name, args), output_file)
+
+
+def inspect_batch(args, output_file=sys.stdout):
+    """
+    Analyze all kernels of a batch, optionally distributed over ``args.jobs`` worker processes,
+    and print each analysis in order of the kernels as soon as it is done. Kernels which cannot
+    be analyzed are reported on stderr.
+
+    :param args: arguments given from :class:`~argparse.ArgumentParser` after parsing
+    :param output_file: Define the stream for output, defaults to :class:`sys.stdout`
+    :type output_file: stream, optional
+    """
+    filenames = get_batch_files(args.batch)
+    kernel_args = _get_worker_args(args)
+    if args.jobs == 1:
+        results = (_inspect_file(filename, kernel_args) for filename in filenames)
+        failed = _print_batch(filenames, results, args.verbose, output_file)
+    else:
+        # every worker process loads each model once and reuses it for all its kernels
+        with ProcessPoolExecutor(max_workers=args.jobs or None) as executor:
+            results = executor.map(
+                _inspect_file, filenames, [kernel_args] * len(filenames), chunksize=1
+            )
+            failed = _print_batch(filenames, results, args.verbose, output_file)
+    if failed:
+        sys.exit(1)
+
+
+def _get_worker_args(args):
+    """Return copy of ``args`` without streams, which cannot be passed to worker processes."""
+    worker_args = argparse.Namespace(**vars(args))
+    worker_args.out = None
+    worker_args.file = None
+    return worker_args
+
+
+def _inspect_file(filename, args):
+    """Return analysis, error and traceback of a batch kernel."""
+    try:
+        with open(filename) as f:
+            return inspect_kernel(f.read(), filename, args), None, None
+    except Exception as e:
+        return None, repr(e), traceback.format_exc()
+
+
+def _print_batch(filenames, results, verbose, output_file):
+    """Print batch results in order of the kernels and return the number of failed ones."""
+    failed = 0
+    for filename, (analysis, error, tb) in zip(filenames, results):
+        if error is not None:
+            failed += 1
+            print('Analysis of {} failed: {}'.format(filename, error), file=sys.stderr)
+            if verbose > 0:
+                print(tb, end='', file=sys.stderr)
+            continue
+        write_analysis(analysis, output_file)
+        output_file.flush()
+    return failed
+
+
+def write_analysis(analysis, output_file):
+    """Write analysis report or serialized result to ``output_file``."""
+    if isinstance(analysis, bytes):
+        # msgpack, write to underlying binary stream if available
+        output_file.flush()
+        getattr(output_file, 'buffer', output_file).write(analysis)
+    else:
+        print(analysis, file=output_file)
+
+
+def get_batch_files(batch):
+    """
+    Return all kernel files of a batch.
+
+    :param str batch: directory, glob pattern or manifest file with one path per line
+    :returns: `list` of file paths
+    """
+    if os.path.isdir(batch):
+        return sorted(
+            os.path.join(root, f)
+            for root, _, files in os.walk(batch)
+            for f in files
+            if not f.startswith('.') and f.endswith(ASM_EXTENSIONS)
+        )
+    if glob.has_magic(batch):
+        return sorted(f for f in glob.glob(batch, recursive=True) if os.path.isfile(f))
+    # manifest, paths are relative to its location
+    manifest_dir = os.path.dirname(batch)
+    with open(batch) as f:
+        return [
+            os.path.join(manifest_dir, line.strip())
+            for line in f
+            if line.strip() and not line.strip().startswith('#')
+        ]
+
+
+def inspect_kernel(code, filename, args):
+    """
+    Analyze assembly code and return the analysis.
+
+    :param str code: assembly code
+    :param str filename: name of kernel file for documentation
+    :param args: arguments given from :class:`~argparse.ArgumentParser` after parsing
+    :returns: `str` -- analysis report, or serialized analysis result for ``args.format`` other
+        than "text" (`bytes` for msgpack)
+    """
+    if is_multi_arch(args.arch):
+        # batch workers do not start further worker processes
+        return inspect_archs(code, filename, args, jobs=args.jobs if args.batch is None else 1)
+    if args.format != 'text' and args.cache and args.dotpath is None:
+        return dump_result(get_cached_result(code, filename, args), args.format)
+    arch, kernel, kernel_graph, print_arch_warning, print_length_warning, unroll = analyze_kernel(
+        code, args
+    )
+    if args.dotpath is not None:
+        kernel_graph.export_graph(args.dotpath if args.dotpath != '.' else None)
+    # Print analysis
+    frontend = Frontend(filename, arch=arch)
+    if args.format != 'text':
+        return dump_result(
+            frontend.analysis_result(
+                kernel,
+                kernel_graph,
+                arch_warning=print_arch_warning,
+                length_warning=print_length_warning,
+                unroll=unroll,
+            ),
+            args.format,
+        )
+    return frontend.full_analysis(
+        kernel,
+        kernel_graph,
+        ignore_unknown=args.ignore_unknown,
+        arch_warning=print_arch_warning,
+        length_warning=print_length_warning,
+        verbose=args.verbose,
+        unroll=unroll,
+    )
+
+
+def get_cached_result(code, filename, args):
+    """
+    Return analysis result of assembly code from the result cache, analyze and store it in the
+    cache if necessary.
+
+    :param str code: assembly code
+    :param str filename: name of kernel file for documentation
+    :param args: arguments given from :class:`~argparse.ArgumentParser` after parsing
+    :returns: `dict` -- analysis result, see :meth:`~osaca.frontend.Frontend.analysis_result`
+    """
+    cache = ResultCache(max_size=args.cache_size * 1024 ** 2)
+    arch = args.arch if args.arch is not None else DEFAULT_ARCHS[BaseParser.detect_ISA(code)]
+    options = {
+        'fixed': args.fixed,
+        'exact': args.exact,
+        'lines': args.lines,
+        'ignore_unknown': args.ignore_unknown,
+        'default_arch': args.arch is None,
+        'canonical': args.canonical,
+    }
+    key = cache.get_key(code, arch, MachineModel.get_isa_for_arch(arch), options)
+    result = cache.get(key)
+    if result is None:
+        arch, kernel, kernel_graph, arch_warning, length_warning, unroll = analyze_kernel(
+            code, args
+        )
+        result = Frontend(filename, arch=arch).analysis_result(
+            kernel,
+            kernel_graph,
+            arch_warning=arch_warning,
+            length_warning=length_warning,
+            unroll=unroll,
+        )
+        cache.put(key, result)
+    result['file'] = filename
+    return result
+
+
+def analyze_kernel(code, args):
+    """
+    Run the throughput, critical path and loop-carried dependency analysis on assembly code.
 
+    :param str code: assembly code
+    :param args: arguments given from :class:`~argparse.ArgumentParser` after parsing
+    :returns: `tuple` of micro-architecture, analyzed kernel, its
+        :class:`~osaca.semantics.KernelDG`, flags for printing the architecture and kernel
+        length warnings and the unrolling of the loop (see
+        :func:`~osaca.semantics.find_unroll_info`) with the number of source-level
+        ``iterations`` of the analyzed kernel and whether the ``canonical`` iteration was
+        analyzed (`None` if not requested) or `None` if no unrolled loop was found
+    """
     # Detect ISA if necessary
     arch = args.arch if args.arch is not None else DEFAULT_ARCHS[BaseParser.detect_ISA(code)]
     print_arch_warning = False if args.arch else True
     isa = MachineModel.get_isa_for_arch(arch)
-    verbose = args.verbose
-    ignore_unknown = args.ignore_unknown
 
-    # Parse file
+    # Parse marked kernel or chosen section
     parser = get_asm_parser(arch)
     try:
-        parsed_code = parser.parse_file(code)
+        kernel, print_length_warning = get_kernel(parser.parse_lazy(code), isa, args)
     except:
         # probably the wrong parser based on heuristic
         if args.arch is None:
@@ -275,46 +573,124 @@ def inspect(args, output_file=sys.stdout):
             arch = DEFAULT_ARCHS['x86'] if BaseParser.detect_ISA(code) == 'aarch64' else DEFAULT_ARCHS['aarch64']
             isa = MachineModel.get_isa_for_arch(arch)
             parser = get_asm_parser(arch)
-            parsed_code = parser.parse_file(code)
+            kernel, print_length_warning = get_kernel(parser.parse_lazy(code), isa, args)
         else:
-            traceback.print_exc(file=sys.stderr)
-            sys.exit(1)
+            raise
 
-    # Reduce to marked kernel or chosen section and add semantics
-    if args.lines:
-        line_range = get_line_range(args.lines)
-        kernel = [line for line in parsed_code if line['line_number'] in line_range]
-        print_length_warning = False
-    else:
-        kernel = reduce_to_section(parsed_code, isa)
-        # Print warning if kernel has no markers and is larger than threshold (100)
-        print_length_warning = True if len(kernel) == len(parsed_code) and len(kernel) > 100 else False
-    machine_model = MachineModel(arch=arch)
+    # Add semantics
+    machine_model = MachineModel.get_shared(arch=arch)
     semantics = ArchSemantics(machine_model)
-    semantics.add_semantics(kernel)
+    semantics.process(kernel)
+    unroll = find_unroll_info(kernel, parser)
+    if unroll is not None:
+        unroll['iterations'] = unroll['unroll_factor']
+        unroll['canonical'] = None
+        if args.canonical:
+            canonical_kernel = get_canonical_iteration(kernel, parser)
+            unroll['canonical'] = canonical_kernel is not None
+            if canonical_kernel is not None:
+                kernel = canonical_kernel
+                unroll['iterations'] = unroll['unroll_factor'] // unroll['copies']
+    semantics.add_arch_semantics(kernel)
     # Do optimal schedule for kernel throughput if wished
-    if not args.fixed:
+    if args.exact:
+        semantics.assign_exact_throughput(kernel)
+    elif not args.fixed:
         semantics.assign_optimal_throughput(kernel)
 
     # Create DiGrahps
     kernel_graph = KernelDG(kernel, parser, machine_model)
-    if args.dotpath is not None:
-        kernel_graph.export_graph(args.dotpath if args.dotpath != '.' else None)
-    # Print analysis
-    frontend = Frontend(args.file.name, arch=arch)
-    print(
-        frontend.full_analysis(
-            kernel,
-            kernel_graph,
-            ignore_unknown=ignore_unknown,
-            arch_warning=print_arch_warning,
-            length_warning=print_length_warning,
-            verbose=verbose
-        ),
-        file=output_file,
+    return arch, kernel, kernel_graph, print_arch_warning, print_length_warning, unroll
+
+
+def inspect_archs(code, filename, args, jobs=1):
+    """
+    Analyze assembly code for multiple micro-architectures and return a comparison report.
+    The code is parsed and its source/destination operands are assigned only once, since this
+    only depends on the ISA.
+
+    :param str code: assembly code
+    :param str filename: name of kernel file for documentation
+    :param args: arguments given from :class:`~argparse.ArgumentParser` after parsing
+    :param int jobs: number of worker processes for the micro-architectures, 0 for all CPUs,
+        defaults to 1
+    :returns: `str` -- comparison report, or serialized summaries for ``args.format`` other
+        than "text"
+    """
+    if args.arch.lower() == 'all':
+        isa = BaseParser.detect_ISA(code)
+    else:
+        isa = MachineModel.get_isa_for_arch(args.arch.split(',')[0])
+    archs = get_archs(args.arch, isa)
+    parser = get_asm_parser(archs[0])
+    kernel, print_length_warning = get_kernel(parser.parse_lazy(code), isa, args)
+    ISASemantics(isa).process(kernel)
+    if jobs == 1:
+        results = [_inspect_arch(arch, kernel, args) for arch in archs]
+    else:
+        worker_args = _get_worker_args(args)
+        with ProcessPoolExecutor(max_workers=jobs or None) as executor:
+            results = list(
+                executor.map(
+                    _inspect_arch, archs, [kernel] * len(archs), [worker_args] * len(archs)
+                )
+            )
+    if args.format != 'text':
+        result = {
+            'version': get_version(),
+            'file': filename,
+            'warnings': ['length'] if print_length_warning else [],
+            'archs': results,
+        }
+        return dump_result(result, args.format)
+    return comparison_analysis(
+        filename, results, ignore_unknown=args.ignore_unknown, length_warning=print_length_warning
     )
 
 
+def _inspect_arch(arch, kernel, args):
+    """Return summary of throughput, CP and LCD analysis of ``kernel`` for ``arch``."""
+    kernel = deepcopy(kernel)
+    machine_model = MachineModel.get_shared(arch=arch)
+    semantics = ArchSemantics(machine_model)
+    semantics.add_arch_semantics(kernel)
+    if args.exact:
+        semantics.assign_exact_throughput(kernel)
+    elif not args.fixed:
+        semantics.assign_optimal_throughput(kernel)
+    kernel_graph = KernelDG(kernel, get_asm_parser(arch), machine_model)
+    return get_summary(arch, kernel, kernel_graph)
+
+
+def get_summary(arch, kernel, kernel_graph):
+    """
+    Return summary of the analysis of a kernel.
+
+    :param str arch: micro-architecture of the analysis
+    :param list kernel: analyzed kernel
+    :param kernel_graph: dependency graph of the kernel
+    :type kernel_graph: :class:`~osaca.semantics.KernelDG`
+    :returns: `dict` with throughput, bottleneck ports, critical path, longest loop-carried
+        dependency and number of unknown instructions
+    """
+    machine_model = MachineModel.get_shared(arch=arch, lazy=True)
+    tp_sum = ArchSemantics.get_throughput_sum(kernel)
+    lcd_sums = list(kernel_graph.loopcarried_latencies.values())
+    throughput = max(tp_sum) if tp_sum else 0.0
+    return {
+        'arch': arch.upper(),
+        'throughput': throughput,
+        'bottleneck_ports': [
+            port
+            for port, pressure in zip(machine_model.get_ports(), tp_sum)
+            if pressure == throughput and throughput > 0
+        ],
+        'critical_path': float(kernel_graph.critical_path_latency),
+        'loopcarried': float(max(lcd_sums)) if lcd_sums else 0.0,
+        'unknown': len([instr for instr in kernel if INSTR_FLAGS.TP_UNKWN in instr['flags']]),
+    }
+
+
 def run(args, output_file=sys.stdout):
     """
     Main entry point for OSACAs workflow. Decides whether to run an analysis or other things.
@@ -335,11 +711,68 @@ def run(args, output_file=sys.stdout):
     elif args.insert_marker:
         # Try to add IACA marker
         insert_byte_marker(args)
+    elif args.batch is not None:
+        # Analyze many kernels in one process
+        inspect_batch(args, output_file=output_file)
     else:
         # Analyze kernel
         inspect(args, output_file=output_file)
 
 
+def is_multi_arch(arch):
+    """Return `True` if ``arch`` argument selects more than one micro-architecture."""
+    return arch is not None and (arch.lower() == 'all' or ',' in arch)
+
+
+def get_archs(arch, isa):
+    """
+    Return micro-architectures selected by the ``arch`` argument.
+
+    :param str arch: comma-separated list of architecture codes or "all"
+    :param str isa: ISA of the kernel, "all" selects all supported architectures with a
+        machine model of this ISA
+    :returns: `list` of architecture codes
+    """
+    if arch.lower() != 'all':
+        return [a.strip() for a in arch.split(',')]
+    archs = []
+    for a in SUPPORTED_ARCHS:
+        if MachineModel.get_isa_for_arch(a) != isa:
+            continue
+        try:
+            utils.find_datafile(a.lower() + '.yml')
+        except FileNotFoundError:
+            continue
+        archs.append(a)
+    return archs
+
+
+def get_kernel(parsed_code, isa, args):
+    """
+    Return kernel to analyze, either marked section or lines chosen by ``args.lines``. Only the
+    lines of the kernel and possible markers are parsed.
+
+    :param parsed_code: lazily parsed assembly
+    :type parsed_code: :class:`~osaca.parser.LazyParsedCode`
+    :param str isa: ISA of the code
+    :param args: arguments given from :class:`~argparse.ArgumentParser` after parsing
+    :returns: `tuple` of kernel and flag for printing a warning about the kernel length
+    """
+    if args.lines:
+        line_ranges = get_line_range(args.lines)
+        kernel = [
+            parsed_code[i]
+            for i, line_number in enumerate(parsed_code.line_numbers)
+            if any(line_number in line_range for line_range in line_ranges)
+        ]
+        print_length_warning = False
+    else:
+        kernel = reduce_to_section(parsed_code, isa)
+        # Print warning if kernel has no markers and is larger than threshold (100)
+        print_length_warning = True if len(kernel) == len(parsed_code) and len(kernel) > 100 else False
+    return kernel, print_length_warning
+
+
 def get_asm_parser(arch) -> BaseParser:
     """
     Helper function to create the right parser for a specific architecture.
@@ -367,21 +800,31 @@ def get_unmatched_instruction_ratio(kernel):
     return unmatched_counter / len(kernel)
 
 def get_line_range(line_str):
+    """
+    Return line ranges given as comma-separated list of line numbers and ranges.
+
+    :param str line_str: line numbers and ranges, e.g., "1,2,8-18"
+    :returns: `list` of `range` objects, which do not store the line numbers they contain
+    """
     line_str = line_str.replace(':', '-')
     lines = line_str.split(',')
-    lines_int = []
+    line_ranges = []
     for l in lines:
         if '-' in l:
             start = int(l.split('-')[0])
             end = int(l.split('-')[1])
-            rnge = list(range(start, end+1))
-            lines_int += rnge
+            line_ranges.append(range(start, end + 1))
         else:
-            lines_int.append(int(l))
-    return lines_int
+            line_ranges.append(range(int(l), int(l) + 1))
+    return line_ranges
 
 def main():
     """Initialize and run command line interface."""
+    if sys.argv[1:2] == ['serve']:
+        # analysis daemon
+        from osaca import server
+        server.main(sys.argv[2:])
+        return
     parser = create_parser()
     args = parser.parse_args()
     check_arguments(args, parser)
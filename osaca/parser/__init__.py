@@ -4,11 +4,16 @@ Collection of parsers supported by OSACA.
 Only the parser below will be exported, so please add new parsers to __all__.
 """
 from .attr_dict import AttrDict
-from .base_parser import BaseParser
+from .base_parser import BaseParser, LazyParsedCode
+from .instruction_form import (
+    Identifier, Immediate, InstructionForm, Memory, Operand, Register, SlottedDict
+)
 from .parser_x86att import ParserX86ATT
 from .parser_AArch64 import ParserAArch64
 
-__all__ = ['AttrDict', 'BaseParser', 'ParserX86ATT', 'ParserAArch64', 'get_parser']
+__all__ = ['AttrDict', 'BaseParser', 'LazyParsedCode', 'ParserX86ATT', 'ParserAArch64',
+           'SlottedDict', 'InstructionForm', 'Operand', 'Register', 'Memory', 'Immediate',
+           'Identifier', 'get_parser']
 
 def get_parser(isa):
     if isa.lower() == 'x86':
@@ -7,6 +7,10 @@ class AttrDict(dict):
         super(AttrDict, self).__init__(*args, **kwargs)
         self.__dict__ = self
 
+    def __setstate__(self, state):
+        # restore attribute access after unpickling or copying
+        self.__dict__ = self
+
     @staticmethod
     def convert_dict(dictionary):
         """
@@ -2,6 +2,11 @@
 """Parser superclass of specific parsers."""
 import operator
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from osaca.parser.instruction_form import SlottedDict
 
 class BaseParser(object):
     # Identifiers for operand types
@@ -15,10 +20,24 @@ class BaseParser(object):
     SEGMENT_EXT_ID = 'segment_extension'
     INSTRUCTION_ID = 'instruction'
     OPERANDS_ID = 'operands'
+    # number of distinct lines memoized by parse_line
+    LINE_CACHE_SIZE = 4096
+    # markers starting a comment in the ISA, lines differing only in their comments share one
+    # entry of the line cache
+    COMMENT_MARKERS = ()
+    # comments the grammars accept regardless of their content
+    _PRINTABLE_COMMENT = re.compile(r'[\t\n\r -~]*\Z')
     _parser_constructed = False
 
     def __init__(self):
         if not self._parser_constructed:
+            # canonical register IDs by register name and register class
+            self._reg_ids = {}
+            self._reg_classes = {}
+            # parsed instruction forms by stripped line without comment, least recently used
+            # first
+            self._line_cache = OrderedDict()
+            self._line_cache_lock = threading.Lock()
             self.construct_parser()
             self._parser_constructed = True
 
@@ -49,15 +68,97 @@ class BaseParser(object):
         :return: list of instruction forms
         """
         # Create instruction form list
-        asm_instructions = []
-        lines = file_content.split('\n')
-        for i, line in enumerate(lines):
+        return list(self.parse_stream(file_content.split('\n'), start_line=start_line))
+
+    def parse_stream(self, stream, start_line=0):
+        """
+        Parse assembly line by line. Like :meth:`parse_file`, but returns a generator.
+
+        :param stream: assembly code as file object or any other iterable of lines
+        :param int start_line: offset, if first line in stream is meant to be not 1
+        :return: generator of instruction forms
+        """
+        for i, line in enumerate(stream):
+            line = line.rstrip('\n')
             if line.strip() == '':
                 continue
-            asm_instructions.append(self.parse_line(line, i + 1 + start_line))
-        return asm_instructions
+            yield self.parse_line(line, i + 1 + start_line)
+
+    def parse_lazy(self, stream, start_line=0):
+        """
+        Read assembly file, but only parse lines when they are accessed, e.g., the marked
+        kernel in :func:`~osaca.semantics.reduce_to_section`.
+
+        :param stream: assembly code as string, file object or any other iterable of lines
+        :param int start_line: offset, if first line in stream is meant to be not 1
+        :return: :class:`LazyParsedCode` of instruction forms
+        """
+        if isinstance(stream, str):
+            stream = stream.split('\n')
+        return LazyParsedCode(self, stream, start_line=start_line)
 
     def parse_line(self, line, line_number=None):
+        """
+        Parse line and return instruction form. Repeated lines, e.g., in unrolled loops, are
+        parsed only once and copied from a cache of the last :attr:`LINE_CACHE_SIZE` lines.
+        Lines only differing in their comment are parsed once as well.
+
+        :param str line: line of assembly code
+        :param line_number: identifier of instruction form, defaults to `None`
+        :type line_number: int, optional
+        :return: `dict` -- parsed asm line (comment, label, directive or instruction form)
+        """
+        code, marker, comment = self._split_comment(line)
+        # lines whose comment was not recognized by the parser are cached as a whole
+        keys = [(code, marker)] if marker is None else [(code, marker), line.strip(' \t\r\n')]
+        with self._line_cache_lock:
+            for key in keys:
+                template = self._line_cache.get(key)
+                if template is not None:
+                    self._line_cache.move_to_end(key)
+                    break
+        if template is None:
+            instruction_form = self._parse_line(line, line_number)
+            if marker is None or instruction_form.get(self.COMMENT_ID) == comment:
+                key = keys[0]
+            else:
+                key = keys[1]
+            with self._line_cache_lock:
+                self._line_cache[key] = self._copy_parsed(instruction_form)
+                if len(self._line_cache) > self.LINE_CACHE_SIZE:
+                    self._line_cache.popitem(last=False)
+            return instruction_form
+        instruction_form = self._copy_parsed(template)
+        if marker is not None and key == keys[0]:
+            instruction_form[self.COMMENT_ID] = comment
+        instruction_form['line'] = line
+        instruction_form['line_number'] = line_number
+        return instruction_form
+
+    def _split_comment(self, line):
+        """
+        Split comment off a line of assembly code.
+
+        :param str line: line of assembly code
+        :returns: `tuple` of stripped code, comment marker and comment with normalized whitespace,
+            marker and comment are `None` for lines without comment
+        """
+        # the grammars ignore leading and trailing whitespace
+        stripped = line.strip(' \t\r\n')
+        position, marker = -1, None
+        for comment_marker in self.COMMENT_MARKERS:
+            index = stripped.find(comment_marker)
+            if index != -1 and (position == -1 or index < position):
+                position, marker = index, comment_marker
+        # markers may be part of quoted strings
+        if marker is None or '"' in stripped[:position] or "'" in stripped[:position]:
+            return stripped, None, None
+        comment = stripped[position + len(marker):]
+        if not self._PRINTABLE_COMMENT.match(comment):
+            return stripped, None, None
+        return stripped[:position].rstrip(' \t\r\n'), marker, ' '.join(comment.split())
+
+    def _parse_line(self, line, line_number=None):
         # Done in derived classes
         raise NotImplementedError
 
@@ -77,6 +178,9 @@ class BaseParser(object):
     def get_reg_type(self, register):
         raise NotImplementedError
 
+    def get_access_width(self, register):
+        raise NotImplementedError
+
     def construct_parser(self):
         return
         # raise NotImplementedError
@@ -85,6 +189,15 @@ class BaseParser(object):
     # Helper functions
     ##################
 
+    @staticmethod
+    def _copy_parsed(value):
+        """Return deep copy of parsed instruction form or operand ``value``."""
+        if isinstance(value, (dict, SlottedDict)):
+            return type(value)((k, BaseParser._copy_parsed(v)) for k, v in value.items())
+        if isinstance(value, list):
+            return [BaseParser._copy_parsed(v) for v in value]
+        return value
+
     def process_operand(self, operand):
         raise NotImplementedError
 
@@ -96,3 +209,68 @@ class BaseParser(object):
 
     def is_reg_dependend_of(self, reg_a, reg_b):
         raise NotImplementedError
+
+    def get_reg_class(self, register):
+        raise NotImplementedError
+
+    def get_reg_id(self, register):
+        """
+        Return canonical ID of the register class of ``register``, i.e., all registers depending
+        on each other share the same integer ID. Returns `None` for registers without
+        dependencies. IDs are computed once per register name, usually while parsing.
+        """
+        if register is None or 'name' not in register:
+            return None
+        name = self.get_full_reg_name(register)
+        if name not in self._reg_ids:
+            reg_class = self.get_reg_class(register)
+            if reg_class is not None:
+                reg_class = self._reg_classes.setdefault(reg_class, len(self._reg_classes))
+            self._reg_ids[name] = reg_class
+        return self._reg_ids[name]
+
+
+class LazyParsedCode(Sequence):
+    """
+    Instruction forms of an assembly file as returned by :meth:`BaseParser.parse_file`, but
+    each line is only parsed on first access.
+    """
+
+    def __init__(self, parser, stream, start_line=0):
+        """
+        Read all non-empty lines of ``stream``.
+
+        :param parser: parser for the lines
+        :type parser: :class:`BaseParser`
+        :param stream: iterable of lines, e.g., a file object
+        :param int start_line: offset, if first line in stream is meant to be not 1
+        """
+        self._parser = parser
+        self._parsed = {}
+        # raw text and line number of each instruction form
+        self.raw_lines = []
+        self.line_numbers = []
+        for i, line in enumerate(stream):
+            line = line.rstrip('\n')
+            if line.strip() == '':
+                continue
+            self.raw_lines.append(line)
+            self.line_numbers.append(i + 1 + start_line)
+
+    def __len__(self):
+        return len(self.raw_lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        instruction_form = self._parsed.get(index)
+        if instruction_form is None:
+            instruction_form = self._parser.parse_line(
+                self.raw_lines[index], self.line_numbers[index]
+            )
+            self._parsed[index] = instruction_form
+        return instruction_form
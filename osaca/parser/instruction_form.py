@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Compact types for parsed instruction forms and operands."""
+from abc import ABCMeta
+from collections.abc import MutableMapping
+from copy import deepcopy
+
+# default for looking up unset fields, never stored in a field
+_UNSET = object()
+
+
+class _SlottedDictMeta(ABCMeta):
+    """Metaclass deriving the fields of `SlottedDict` subclasses from their ``__slots__``"""
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        if any(isinstance(base, _SlottedDictMeta) for base in bases):
+            cls._fields = frozenset(cls.__slots__)
+
+
+class SlottedDict(MutableMapping, metaclass=_SlottedDictMeta):
+    """
+    Mapping with a fixed set of fields stored in ``__slots__``. Like `AttrDict`, fields can be
+    accessed as attributes as well as dictionary keys and unset fields behave like missing keys
+    and attributes. Keys which are no fields are stored in an additional dictionary and are only
+    accessible as dictionary keys.
+    """
+
+    __slots__ = ('_extra',)
+    _fields = frozenset()
+
+    def __init__(self, *args, **kwargs):
+        self._extra = None
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._fields and hasattr(self, key):
+            delattr(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, dict(self.items()))
+
+    def __reduce__(self):
+        return type(self), (self.items(),)
+
+    def __deepcopy__(self, memo):
+        new = type(self)()
+        memo[id(self)] = new
+        for key, value in self.items():
+            new[key] = deepcopy(value, memo)
+        return new
+
+    # faster than the generic implementations of MutableMapping based on __iter__ and
+    # __getitem__
+    def items(self):
+        items = []
+        for key in self.__slots__:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                items.append((key, value))
+        if self._extra is not None:
+            items += self._extra.items()
+        return items
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def copy(self):
+        """Return shallow copy."""
+        return type(self)(self.items())
+
+
+class InstructionForm(SlottedDict):
+    """Parsed line of assembly and its semantics"""
+
+    __slots__ = (
+        'instruction',
+        'operands',
+        'directive',
+        'comment',
+        'label',
+        'line',
+        'line_number',
+        'semantic_operands',
+        'flags',
+        'port_pressure',
+        'port_uops',
+        'throughput',
+        'latency',
+        'latency_wo_load',
+        'latency_cp',
+        'latency_lcd',
+        'mem_dep',
+        'note',
+    )
+
+
+class Operand(SlottedDict):
+    """Operand of an instruction form, only the field of the operand type is set"""
+
+    __slots__ = ('register', 'memory', 'immediate', 'identifier')
+
+
+class Register(SlottedDict):
+    """Register operand"""
+
+    __slots__ = ('prefix', 'name', 'shape', 'lanes', 'index', 'mask', 'zeroing', 'predication')
+
+
+class Memory(SlottedDict):
+    """Memory operand"""
+
+    __slots__ = ('offset', 'base', 'index', 'scale', 'segment_extension')
+
+
+class Immediate(SlottedDict):
+    """Immediate operand or offset of a memory operand"""
+
+    __slots__ = ('value',)
+
+
+class Identifier(SlottedDict):
+    """Identifier operand, e.g., a label or symbol"""
+
+    __slots__ = ('name', 'offset', 'relocation', 'suffix')
@@ -3,11 +3,12 @@
 
 import pyparsing as pp
 
-from osaca.parser import AttrDict, BaseParser
+from osaca.parser import AttrDict, BaseParser, InstructionForm
 
 
 class ParserAArch64(BaseParser):
     _instance = None
+    COMMENT_MARKERS = ('//',)
 
     # Singelton pattern, as this is created very many times
     def __new__(cls):
@@ -214,25 +215,23 @@ class ParserAArch64(BaseParser):
         self.vector = vector
         self.register = register
 
-    def parse_line(self, line, line_number=None):
+    def _parse_line(self, line, line_number=None):
         """
-        Parse line and return instruction form.
+        Parse line and return instruction form, see :meth:`BaseParser.parse_line`.
 
         :param str line: line of assembly code
         :param line_number: identifier of instruction form, defautls to None
         :type line_number: int, optional
         :return: `dict` -- parsed asm line (comment, label, directive or instruction form)
         """
-        instruction_form = AttrDict(
-            {
-                self.INSTRUCTION_ID: None,
-                self.OPERANDS_ID: [],
-                self.DIRECTIVE_ID: None,
-                self.COMMENT_ID: None,
-                self.LABEL_ID: None,
-                'line': line,
-                'line_number': line_number,
-            }
+        instruction_form = InstructionForm(
+            instruction=None,
+            operands=[],
+            directive=None,
+            comment=None,
+            label=None,
+            line=line,
+            line_number=line_number,
         )
         result = None
 
@@ -352,6 +351,9 @@ class ParserAArch64(BaseParser):
             return self.process_register_list(operand[self.REGISTER_ID])
         if self.REGISTER_ID in operand and operand[self.REGISTER_ID]['name'] == 'sp':
             return self.process_sp_register(operand[self.REGISTER_ID])
+        if self.REGISTER_ID in operand:
+            # precompute canonical register ID
+            self.get_reg_id(operand[self.REGISTER_ID])
         # add value attribute to floating point immediates without exponent
         if self.IMMEDIATE_ID in operand:
             return self.process_immediate(operand[self.IMMEDIATE_ID])
@@ -374,6 +376,8 @@ class ParserAArch64(BaseParser):
             base['prefix'] = 'x'
         if index is not None and 'name' in index and index['name'] == 'sp':
             index['prefix'] = 'x'
+        self.get_reg_id(base)
+        self.get_reg_id(index)
         valid_shift_ops = ['lsl', 'uxtw', 'sxtw']
         if 'index' in memory_address:
             if 'shift' in memory_address['index']:
@@ -511,15 +515,40 @@ class ParserAArch64(BaseParser):
 
     def is_reg_dependend_of(self, reg_a, reg_b):
         """Check if ``reg_a`` is dependent on ``reg_b``"""
+        reg_id = self.get_reg_id(reg_a)
+        return reg_id is not None and reg_id == self.get_reg_id(reg_b)
+
+    def get_reg_class(self, register):
+        """Return name of the register class ``register`` belongs to (e.g., GPR_1 for w1)"""
         prefixes_gpr = 'wx'
         prefixes_vec = 'bhsdqvz'
-        if reg_a['name'] == reg_b['name']:
-            if reg_a['prefix'].lower() in prefixes_gpr and reg_b['prefix'].lower() in prefixes_gpr:
-                return True
-            if reg_a['prefix'].lower() in prefixes_vec and reg_b['prefix'].lower() in prefixes_vec:
-                return True
-        return False
+        if register['prefix'].lower() in prefixes_gpr:
+            return 'GPR_' + str(register['name'])
+        if register['prefix'].lower() in prefixes_vec:
+            return 'VEC_' + str(register['name'])
+        # no dependencies for other registers
+        return None
 
     def get_reg_type(self, register):
         """Get register type"""
         return register['prefix']
+
+    def get_access_width(self, register):
+        """
+        Return number of bytes loaded or stored with ``register`` (or register list) by a memory
+        access or `None` if unknown.
+        """
+        if 'list' in register:
+            if register.get('index') is not None:
+                # single lane of each register
+                return None
+            widths = [self.get_access_width(r) for r in register['list']]
+            return sum(widths) if widths and None not in widths else None
+        if 'prefix' not in register:
+            return None
+        sizes = {'b': 1, 'h': 2, 'w': 4, 's': 4, 'x': 8, 'd': 8, 'q': 16}
+        if register['prefix'] == 'v':
+            if 'lanes' in register and register.get('shape') in sizes and 'index' not in register:
+                return int(register['lanes']) * sizes[register['shape']]
+            return None
+        return sizes.get(register['prefix'])
@@ -2,14 +2,59 @@
 
 import string
 import re
+from itertools import chain
 
 import pyparsing as pp
 
-from osaca.parser import AttrDict, BaseParser
+from osaca.parser import (
+    AttrDict, BaseParser, Identifier, Immediate, InstructionForm, Memory, Operand, Register
+)
 
 
 class ParserX86ATT(BaseParser):
     _instance = None
+    COMMENT_MARKERS = ('#', '//')
+    # Patterns for the fast path of parse_line. Lines which do not match exactly are parsed
+    # with the pyparsing grammars, which also cover the rare syntax (e.g., segments, masks).
+    _WS = r'[ \t\r\n]*'
+    _COMMENT = r'(?:(?:#|//)(?P<comment>.*))?'
+    _IDENTIFIER = r'[A-Za-z_.][A-Za-z0-9_.]*'
+    _NUMBER = r'-?0x[0-9A-Fa-f]+|-?[0-9]+'
+    # printable ASCII and whitespace, as handled by pyparsing
+    _PRINTABLE_LINE = re.compile(r'[\t\n\r -~]*')
+    _COMMENT_LINE = re.compile(_WS + r'(?:#|//)(?P<comment>.*)', re.DOTALL)
+    _LABEL_LINE = re.compile(
+        _WS + r'(?P<name>[A-Za-z_.][A-Za-z0-9_.$]*)' + _WS + ':' + _WS + _COMMENT, re.DOTALL
+    )
+    _DIRECTIVE_LINE = re.compile(
+        _WS + r'\.(?P<name>[A-Za-z0-9_]+)(?P<parameters>[^"\'#:]*)(?:#(?P<comment>.*))?',
+        re.DOTALL,
+    )
+    _INSTRUCTION_LINE = re.compile(
+        _WS + r'(?P<mnemonic>[A-Za-z0-9]+)(?:[ \t\r\n]+(?P<operands>[^#/:]*?))?' + _WS + _COMMENT,
+        re.DOTALL,
+    )
+    _OPERAND = re.compile(
+        _WS
+        + r'(?:%(?P<register>[A-Za-z0-9]+)'
+        + r'|\$(?P<immediate>' + _NUMBER + ')'
+        + r'|\$(?P<immediate_identifier>' + _IDENTIFIER + ')'
+        + r'|(?:(?P<offset>' + _NUMBER + ')|(?P<offset_identifier>' + _IDENTIFIER + '))?'
+        + r'\(' + _WS + r'(?:%(?P<base>[A-Za-z0-9]+))?' + _WS
+        + r'(?:,' + _WS + r'(?:%(?P<index>[A-Za-z0-9]+))?' + _WS
+        + r'(?:,' + _WS + r'(?P<scale>[1248])' + _WS + r')?)?\)'
+        + r'|(?P<identifier>' + _IDENTIFIER + '))'
+        + _WS + r'(?:,|\Z)'
+    )
+    GPR_GROUPS = {
+        'A': ['RAX', 'EAX', 'AX', 'AH', 'AL'],
+        'B': ['RBX', 'EBX', 'BX', 'BH', 'BL'],
+        'C': ['RCX', 'ECX', 'CX', 'CH', 'CL'],
+        'D': ['RDX', 'EDX', 'DX', 'DH', 'DL'],
+        'SP': ['RSP', 'ESP', 'SP', 'SPL'],
+        'SRC': ['RSI', 'ESI', 'SI', 'SIL'],
+        'DST': ['RDI', 'EDI', 'DI', 'DIL']
+    }
 
     # Singelton pattern, as this is created very many times
     def __new__(cls):
@@ -186,38 +231,43 @@ class ParserX86ATT(BaseParser):
         except pp.ParseException:
             return None
 
-    def parse_line(self, line, line_number=None):
+    def _parse_line(self, line, line_number=None):
         """
-        Parse line and return instruction form.
+        Parse line and return instruction form, see :meth:`BaseParser.parse_line`.
 
         :param str line: line of assembly code
         :param line_number: default None, identifier of instruction form
         :type line_number: int, optional
         :return: ``dict`` -- parsed asm line (comment, label, directive or instruction form)
         """
-        instruction_form = AttrDict(
-            {
-                self.INSTRUCTION_ID: None,
-                self.OPERANDS_ID: [],
-                self.DIRECTIVE_ID: None,
-                self.COMMENT_ID: None,
-                self.LABEL_ID: None,
-                'line': line,
-                'line_number': line_number,
-            }
+        instruction_form = InstructionForm(
+            instruction=None,
+            operands=[],
+            directive=None,
+            comment=None,
+            label=None,
+            line=line,
+            line_number=line_number,
         )
+        if self._PRINTABLE_LINE.fullmatch(line) and self._parse_line_fast(line, instruction_form):
+            return instruction_form
         result = None
+        # only try grammars which can match, based on the first character and labels' colon
+        stripped = line.lstrip(' \t\r\n')
 
         # 1. Parse comment
-        try:
-            result = self.process_operand(self.comment.parseString(line, parseAll=True).asDict())
-            result = AttrDict.convert_dict(result)
-            instruction_form[self.COMMENT_ID] = ' '.join(result[self.COMMENT_ID])
-        except pp.ParseException:
-            pass
+        if stripped.startswith('#') or stripped.startswith('//'):
+            try:
+                result = self.process_operand(
+                    self.comment.parseString(line, parseAll=True).asDict()
+                )
+                result = AttrDict.convert_dict(result)
+                instruction_form[self.COMMENT_ID] = ' '.join(result[self.COMMENT_ID])
+            except pp.ParseException:
+                pass
 
         # 2. Parse label
-        if result is None:
+        if result is None and ':' in line:
             try:
                 result = self.process_operand(self.label.parseString(line, parseAll=True).asDict())
                 result = AttrDict.convert_dict(result)
@@ -230,7 +280,7 @@ class ParserX86ATT(BaseParser):
                 pass
 
         # 3. Parse directive
-        if result is None:
+        if result is None and stripped.startswith('.'):
             try:
                 result = self.process_operand(
                     self.directive.parseString(line, parseAll=True).asDict()
@@ -263,6 +313,94 @@ class ParserX86ATT(BaseParser):
 
         return instruction_form
 
+    def _parse_line_fast(self, line, instruction_form):
+        """
+        Parse common comment, label, directive and instruction lines without pyparsing.
+
+        :param str line: line of printable ASCII characters
+        :param instruction_form: instruction form to fill in
+        :type instruction_form: `AttrDict`
+        :returns: `True` if ``line`` was parsed, `False` if it needs the pyparsing grammars
+        """
+        match = self._COMMENT_LINE.fullmatch(line)
+        if match:
+            instruction_form[self.COMMENT_ID] = ' '.join(match.group('comment').split())
+            return True
+        match = self._LABEL_LINE.fullmatch(line)
+        if match:
+            instruction_form[self.LABEL_ID] = match.group('name')
+        elif ':' in line.split('#', 1)[0]:
+            # might be a label with more complex identifier
+            return False
+        if not match:
+            match = self._DIRECTIVE_LINE.fullmatch(line)
+            if match:
+                instruction_form[self.DIRECTIVE_ID] = AttrDict(
+                    {'name': match.group('name'), 'parameters': re.findall(
+                        r'[^ \t\r\n,]+', match.group('parameters')
+                    )}
+                )
+        if not match:
+            match = self._INSTRUCTION_LINE.fullmatch(line)
+            if not match or match.group('mnemonic').startswith(('data16', 'data32')):
+                return False
+            operands = self._parse_operands_fast(match.group('operands') or '')
+            if operands is None:
+                return False
+            instruction_form[self.INSTRUCTION_ID] = match.group('mnemonic')
+            instruction_form[self.OPERANDS_ID] = operands
+        if match.group('comment') is not None:
+            instruction_form[self.COMMENT_ID] = ' '.join(match.group('comment').split())
+        return True
+
+    def _parse_operands_fast(self, operands_string):
+        """
+        Parse plain register, immediate and memory operands without pyparsing.
+
+        :param str operands_string: comma-separated operands of an instruction
+        :returns: `list` of operands or `None` if they need the pyparsing grammars
+        """
+        operands = []
+        pos = 0
+        while pos < len(operands_string):
+            match = self._OPERAND.match(operands_string, pos)
+            if not match or len(operands) == 4:
+                return None
+            pos = match.end()
+            if match.group('register') is not None:
+                register = Register(name=match.group('register'))
+                self.get_reg_id(register)
+                operands.append(Operand(register=register))
+            elif match.group('immediate') is not None:
+                operands.append(Operand(immediate=Immediate(value=match.group('immediate'))))
+            elif match.group('immediate_identifier') is not None:
+                operands.append(
+                    Operand(identifier=Identifier(name=match.group('immediate_identifier')))
+                )
+            elif match.group('identifier') is not None:
+                # identifiers are only allowed as first operand (e.g., jump targets)
+                if operands:
+                    return None
+                operands.append(Operand(identifier=Identifier(name=match.group('identifier'))))
+            else:
+                offset = None
+                if match.group('offset') is not None:
+                    offset = Immediate(value=match.group('offset'))
+                elif match.group('offset_identifier') is not None:
+                    offset = Operand(identifier=Identifier(name=match.group('offset_identifier')))
+                base = index = None
+                if match.group('base') is not None:
+                    base = Register(name=match.group('base'))
+                    self.get_reg_id(base)
+                if match.group('index') is not None:
+                    index = Register(name=match.group('index'))
+                    self.get_reg_id(index)
+                scale = int(match.group('scale')) if match.group('scale') is not None else 1
+                operands.append(
+                    Operand(memory=Memory(offset=offset, base=base, index=index, scale=scale))
+                )
+        return operands
+
     def parse_instruction(self, instruction):
         """
         Parse instruction in asm line.
@@ -308,6 +446,13 @@ class ParserX86ATT(BaseParser):
             return self.process_label(operand[self.LABEL_ID])
         if self.DIRECTIVE_ID in operand:
             return self.process_directive(operand[self.DIRECTIVE_ID])
+        if self.REGISTER_ID in operand:
+            register = Register(operand[self.REGISTER_ID])
+            # precompute canonical register ID
+            self.get_reg_id(register)
+            return Operand(register=register)
+        if self.IDENTIFIER_ID in operand:
+            return Operand(identifier=Identifier(operand[self.IDENTIFIER_ID]))
         return operand
 
     def process_directive(self, directive):
@@ -325,13 +470,23 @@ class ParserX86ATT(BaseParser):
         base = memory_address.get('base', None)
         index = memory_address.get('index', None)
         scale = 1 if 'scale' not in memory_address else int(memory_address['scale'])
+        if base is not None:
+            base = Register(base)
+        if index is not None:
+            index = Register(index)
+        self.get_reg_id(base)
+        self.get_reg_id(index)
         if isinstance(offset, str) and base is None and index is None:
-            offset = {'value': offset}
-        new_dict = AttrDict({'offset': offset, 'base': base, 'index': index, 'scale': scale})
+            offset = Immediate(value=offset)
+        elif isinstance(offset, dict) and list(offset) == ['value']:
+            offset = Immediate(offset)
+        elif isinstance(offset, dict) and list(offset) == [self.IDENTIFIER_ID]:
+            offset = Operand(identifier=Identifier(offset[self.IDENTIFIER_ID]))
+        new_dict = Memory(offset=offset, base=base, index=index, scale=scale)
         # Add segmentation extension if existing
         if self.SEGMENT_EXT_ID in memory_address:
             new_dict[self.SEGMENT_EXT_ID] = memory_address[self.SEGMENT_EXT_ID]
-        return AttrDict({self.MEMORY_ID: new_dict})
+        return Operand(memory=new_dict)
 
     def process_label(self, label):
         """Post-process label asm line"""
@@ -343,9 +498,9 @@ class ParserX86ATT(BaseParser):
         """Post-process immediate operand"""
         if 'identifier' in immediate:
             # actually an identifier, change declaration
-            return immediate
+            return Operand(identifier=Identifier(immediate[self.IDENTIFIER_ID]))
         # otherwise nothing to do
-        return AttrDict({self.IMMEDIATE_ID: immediate})
+        return Operand(immediate=Immediate(immediate))
 
     def get_full_reg_name(self, register):
         """Return one register name string including all attributes"""
@@ -372,46 +527,28 @@ class ParserX86ATT(BaseParser):
 
     def is_reg_dependend_of(self, reg_a, reg_b):
         """Check if ``reg_a`` is dependent on ``reg_b``"""
-        # Normalize name
-        reg_a_name = reg_a['name'].upper()
-        reg_b_name = reg_b['name'].upper()
+        reg_id = self.get_reg_id(reg_a)
+        return reg_id is not None and reg_id == self.get_reg_id(reg_b)
 
-        # Check if they are the same registers
-        if reg_a_name == reg_b_name:
-            return True
+    def get_reg_class(self, register):
+        """Return name of the register class ``register`` belongs to (e.g., GPR_A for AL)"""
+        # Normalize name
+        name = register['name'].upper()
         # Check vector registers first
-        if self.is_vector_register(reg_a):
-            if self.is_vector_register(reg_b):
-                if reg_a_name[1:] == reg_b_name[1:]:
-                    # Registers in the same vector space
-                    return True
-            return False
+        if self.is_vector_register(register):
+            # Registers in the same vector space
+            return 'VEC_' + name[1:]
         # Check basic GPRs
-        gpr_groups = {
-            'A': ['RAX', 'EAX', 'AX', 'AH', 'AL'],
-            'B': ['RBX', 'EBX', 'BX', 'BH', 'BL'],
-            'C': ['RCX', 'ECX', 'CX', 'CH', 'CL'],
-            'D': ['RDX', 'EDX', 'DX', 'DH', 'DL'],
-            'SP': ['RSP', 'ESP', 'SP', 'SPL'],
-            'SRC': ['RSI', 'ESI', 'SI', 'SIL'],
-            'DST': ['RDI', 'EDI', 'DI', 'DIL']
-        }
-        if self.is_basic_gpr(reg_a):
-            if self.is_basic_gpr(reg_b):
-                for dep_group in gpr_groups.values():
-                    if reg_a_name in dep_group:
-                        if reg_b_name in dep_group:
-                            return True
-            return False
-
+        if self.is_basic_gpr(register):
+            for group, dep_group in self.GPR_GROUPS.items():
+                if name in dep_group:
+                    return 'GPR_' + group
+            return name
         # Check other GPRs
-        ma = re.match(r'R([0-9]+)[DWB]?', reg_a_name)
-        mb = re.match(r'R([0-9]+)[DWB]?', reg_b_name)
-        if ma and mb and ma.group(1) == mb.group(1):
-            return True
-
-        # No dependencies
-        return False
+        m = re.match(r'R([0-9]+)[DWB]?', name)
+        if m:
+            return 'GPR_' + m.group(1)
+        return name
 
     def is_basic_gpr(self, register):
         """Check if register is a basic general purpose register (ebi, rax, ...)"""
@@ -447,3 +584,17 @@ class ParserX86ATT(BaseParser):
         elif self.is_vector_register(register):
             return register['name'].rstrip(string.digits).lower()
         raise ValueError
+
+    def get_access_width(self, register):
+        """
+        Return number of bytes loaded or stored with ``register`` by a memory access or `None`
+        if unknown, e.g., for vector registers, which are also used by scalar instructions.
+        """
+        name = register['name'].upper()
+        m = re.match(r'R[0-9]+([DWB]?)$', name)
+        if m:
+            return {'': 8, 'D': 4, 'W': 2, 'B': 1}[m.group(1)]
+        for dep_group in chain(self.GPR_GROUPS.values(), [['RBP', 'EBP', 'BP', 'BPL']]):
+            if name in dep_group:
+                return [8, 4, 2, 1, 1][dep_group.index(name)]
+        return None
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for analysis results of :meth:`Frontend.analysis_result`.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from osaca import __version__, utils
+from osaca.semantics import MachineModel
+
+# bytes written per cache directory since the last size check of this process
+_written = {}
+_written_lock = threading.Lock()
+
+
+class ResultCache(object):
+    """
+    On-disk cache of analysis results, keyed by a hash of the normalized kernel code, the
+    content of the machine models, the OSACA version and the analysis options. The size of the
+    cache is bounded, least recently used results are evicted first.
+    """
+
+    MAX_SIZE = 256 * 1024 ** 2  # default maximum size of cache in bytes
+    # size is checked again after this fraction of the maximum size was written
+    CHECK_RATIO = 0.1
+    # eviction reduces cache to this fraction of the maximum size
+    EVICT_RATIO = 0.9
+
+    def __init__(self, cache_dir=None, max_size=MAX_SIZE):
+        """
+        Constructor method.
+
+        :param cache_dir: directory of cache, defaults to ``results`` in
+            :data:`~osaca.utils.CACHE_DIR`
+        :type cache_dir: str, optional
+        :param max_size: maximum size of cache in bytes, defaults to :attr:`MAX_SIZE`
+        :type max_size: int, optional
+        """
+        self._dir = cache_dir or os.path.join(utils.CACHE_DIR, 'results')
+        self._max_size = max_size
+
+    @staticmethod
+    def get_key(code, arch, isa, options):
+        """
+        Return cache key of an analysis.
+
+        :param str code: assembly code
+        :param str arch: micro-architecture of the analysis
+        :param str isa: ISA of the analysis
+        :param dict options: analysis options affecting the result
+        :returns: `str` -- hexadecimal key
+        """
+        # line numbers are part of the result, so only line endings and trailing whitespace
+        # are normalized
+        lines = [line.rstrip() for line in code.splitlines()]
+        while lines and not lines[-1]:
+            lines.pop()
+        key = hashlib.sha256()
+        for part in [
+            __version__,
+            arch.lower(),
+            MachineModel.get_file_hash(utils.find_datafile(arch.lower() + '.yml')),
+            MachineModel.get_file_hash(utils.find_datafile('isa/' + isa.lower() + '.yml')),
+            json.dumps(options, sort_keys=True),
+            '\n'.join(lines),
+        ]:
+            key.update(part.encode())
+            key.update(b'\0')
+        return key.hexdigest()
+
+    def get(self, key):
+        """
+        Return cached result of ``key``.
+
+        :param str key: cache key, see :meth:`get_key`
+        :returns: `dict` -- analysis result or `None` if not cached
+        """
+        path = self._get_path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            # mark as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """
+        Store result of ``key`` and evict least recently used results if the cache is full.
+
+        :param str key: cache key, see :meth:`get_key`
+        :param dict result: analysis result
+        """
+        path = self._get_path(key)
+        content = json.dumps(result, separators=(',', ':')).encode()
+        tmp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            # cache is optional
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with _written_lock:
+            # always check on first write of this process
+            written = _written.get(self._dir, self._max_size) + len(content)
+            check = written >= self.CHECK_RATIO * self._max_size
+            _written[self._dir] = 0 if check else written
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used results until the cache is smaller than the maximum."""
+        entries = []
+        for subdir in self._scandir(self._dir):
+            if subdir.is_dir():
+                for entry in self._scandir(subdir.path):
+                    if entry.name.endswith('.json'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        size = sum(entry[1] for entry in entries)
+        if size <= self._max_size:
+            return
+        for _, entry_size, path in sorted(entries):
+            if size <= self.EVICT_RATIO * self._max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # removed by another process
+                pass
+            size -= entry_size
+
+    def _get_path(self, key):
+        """Return path of cache file for ``key``."""
+        return os.path.join(self._dir, key[:2], key + '.json')
+
+    @staticmethod
+    def _scandir(path):
+        """Return directory entries of ``path`` or an empty list if it does not exist."""
+        try:
+            # scandir iterators are context managers only since Python 3.6
+            return list(os.scandir(path))
+        except OSError:
+            return []
@@ -9,6 +9,7 @@ from .hw_model import MachineModel
 from .kernel_dg import KernelDG
 from .marker_utils import reduce_to_section, find_basic_blocks, find_basic_loop_bodies
 from .marker_utils import find_jump_labels
+from .unroll_analysis import find_unroll_info, get_canonical_iteration
 
 __all__ = [
     'MachineModel',
@@ -20,4 +21,6 @@ __all__ = [
     'find_basic_blocks',
     'find_basic_loop_bodies',
     'find_jump_labels',
+    'find_unroll_info',
+    'get_canonical_iteration',
 ]
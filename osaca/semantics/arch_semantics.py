@@ -2,12 +2,14 @@
 """Semantics opbject responsible for architecture specific semantic operations"""
 
 import warnings
+from fractions import Fraction
 from functools import reduce
 from itertools import chain
 from operator import itemgetter
 
 from .hw_model import MachineModel
 from .isa_semantics import INSTR_FLAGS, ISASemantics
+from .port_scheduler import schedule_uops
 
 
 class ArchSemantics(ISASemantics):
@@ -28,6 +30,17 @@ class ArchSemantics(ISASemantics):
         """
         for instruction_form in kernel:
             self.assign_src_dst(instruction_form)
+        self.add_arch_semantics(kernel)
+
+    def add_arch_semantics(self, kernel):
+        """
+        Applies performance data (throughput, latency, port pressure) to each instruction of a
+        given kernel with already assigned source/destination distribution. This way, the ISA
+        dependent part of :meth:`add_semantics` can be shared between micro-architectures.
+
+        :param list kernel: kernel to apply semantics
+        """
+        for instruction_form in kernel:
             self.assign_tp_lt(instruction_form)
         if self._machine_model.has_hidden_loads():
             self.set_hidden_loads(kernel)
@@ -41,13 +54,24 @@ class ArchSemantics(ISASemantics):
         INC = 0.01
         kernel.reverse()
         port_list = self._machine_model.get_ports()
+        # Keep a running sum per port of all instructions considered by get_throughput_sum(),
+        # so changing the port pressure of a single instruction only requires an update of the
+        # sums of its changed ports instead of a re-reduction of the whole kernel. The sums are
+        # exact fractions, since float additions and subtractions would drift from the sums
+        # of get_throughput_sum() and change the balancing decisions.
+        tp_kernel = [instr for instr in kernel if instr['throughput'] != 0.0]
+        port_columns = [list(col) for col in zip(*[instr['port_pressure'] for instr in tp_kernel])]
+        port_totals = [sum(Fraction(x) for x in col) for col in port_columns]
+        rows = {id(instr): row for row, instr in enumerate(tp_kernel)}
         for instruction_form in kernel:
+            row = rows.get(id(instruction_form))
             for uop in instruction_form['port_uops']:
                 cycles = uop[0]
                 ports = list(uop[1])
                 indices = [port_list.index(p) for p in ports]
+                uop_indices = list(indices)
                 # check if port sum of used ports for uop are unbalanced
-                port_sums = self._to_list(itemgetter(*indices)(self.get_throughput_sum(kernel)))
+                port_sums = self._get_port_sums(port_totals, indices)
                 instr_ports = self._to_list(
                     itemgetter(*indices)(instruction_form['port_pressure'])
                 )
@@ -105,11 +129,66 @@ class ArchSemantics(ISASemantics):
                                  itemgetter(*indices)(instruction_form['port_pressure'])
                             )
                             del differences[differences.index(min(differences))]
-                        port_sums = self._to_list(
-                            itemgetter(*indices)(self.get_throughput_sum(kernel))
-                        )
+                        if row is not None:
+                            # update running sums of changed ports
+                            for p in uop_indices:
+                                pressure = instruction_form['port_pressure'][p]
+                                if pressure != port_columns[p][row]:
+                                    port_totals[p] += Fraction(pressure) - Fraction(
+                                        port_columns[p][row]
+                                    )
+                                    port_columns[p][row] = pressure
+                        port_sums = self._get_port_sums(port_totals, indices)
         kernel.reverse()
 
+    def assign_exact_throughput(self, kernel):
+        """
+        Assign optimal throughput port pressure to a kernel. In contrast to
+        :func:`~ArchSemantics.assign_optimal_throughput`, the port assignment is solved exactly
+        as min-max flow problem over all uops of the kernel.
+
+        :param list kernel: kernel to apply optimal port utilization
+        """
+        port_list = self._machine_model.get_ports()
+        data_ports = self._machine_model.get_data_ports()
+        uops = []
+        uop_owners = []
+        base_load = [0.0] * len(port_list)
+        # same selection of instructions as in get_throughput_sum()
+        scheduled_kernel = [instr for instr in kernel if instr['throughput'] != 0.0]
+        offsets = []
+        for instruction_form in scheduled_kernel:
+            instr_uops = [
+                uop
+                for uop in instruction_form['port_uops']
+                # hidden loads do not occupy their data ports
+                if not (
+                    INSTR_FLAGS.HIDDEN_LD in instruction_form['flags']
+                    and all(p in data_ports for p in uop[1])
+                )
+            ]
+            # keep load which is not covered by uops (e.g., load throughput multipliers)
+            offset = [
+                pp - avg
+                for pp, avg in zip(
+                    instruction_form['port_pressure'],
+                    self._machine_model.average_port_pressure(instr_uops),
+                )
+            ]
+            offsets.append(offset)
+            base_load = [b + o for b, o in zip(base_load, offset)]
+            for cycles, ports in instr_uops:
+                uops.append((cycles, [port_list.index(p) for p in ports]))
+                uop_owners.append(len(offsets) - 1)
+
+        shares = schedule_uops(uops, len(port_list), base_load=base_load)
+        port_pressures = [list(offset) for offset in offsets]
+        for owner, share in zip(uop_owners, shares):
+            for port_idx, cycles in share.items():
+                port_pressures[owner][port_idx] += cycles
+        for instruction_form, port_pressure in zip(scheduled_kernel, port_pressures):
+            instruction_form['port_pressure'] = port_pressure
+
     def set_hidden_loads(self, kernel):
         """Hide loads behind stores if architecture supports hidden loads (depricated)"""
         loads = [instr for instr in kernel if INSTR_FLAGS.HAS_LD in instr['flags']]
@@ -405,6 +484,10 @@ class ArchSemantics(ISASemantics):
 
         return g
 
+    def _get_port_sums(self, port_totals, indices):
+        """Get rounded throughput sum of ports ``indices`` out of the exact per-port sums"""
+        return [float(round(port_totals[i], 2)) for i in indices]
+
     def _to_list(self, obj):
         if isinstance(obj, tuple):
             return list(obj)
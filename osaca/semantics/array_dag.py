@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Compact, array-backed directed acyclic graph for dependency analysis"""
+from array import array
+
+import networkx as nx
+
+
+class ArrayDAG(object):
+    """
+    Directed graph with integer node indices and edges stored in CSR format, i.e., the successors
+    of node ``n`` are ``targets[offsets[n]:offsets[n + 1]]``. Nodes are additionally identified by
+    their networkx node ID (e.g., the line number) and hold an instruction form.
+
+    Nodes and edges keep the order they were added in, so all routines break ties exactly like the
+    corresponding networkx algorithms.
+    """
+
+    def __init__(self, node_ids, instruction_forms, edges):
+        """
+        Constructor method.
+
+        :param list node_ids: networkx node ID of each node
+        :param list instruction_forms: instruction form of each node
+        :param list edges: ``(source, target, latency)`` tuples of node indices in order of
+            insertion, latencies are kept as given
+        """
+        self.node_ids = node_ids
+        self.instruction_forms = instruction_forms
+        self.index = {node_id: n for n, node_id in enumerate(node_ids)}
+        edges = list(edges)
+        self.offsets, self.targets, self.latencies = self._to_csr(len(node_ids), edges)
+        self.pred_offsets, self.sources, self.pred_latencies = self._to_csr(
+            len(node_ids), [(t, s, lat) for s, t, lat in edges]
+        )
+        self._topological_order = None
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """
+        Create graph from networkx graph with ``instruction_form`` node and ``latency`` edge
+        attributes, e.g., as returned by :meth:`to_networkx`.
+        """
+        node_ids = list(graph.nodes)
+        index = {node_id: n for n, node_id in enumerate(node_ids)}
+        return cls(
+            node_ids,
+            [graph.nodes[node_id].get('instruction_form') for node_id in node_ids],
+            # networkx uses a weight of 1 for edges without latency
+            [(index[u], index[v], lat) for u, v, lat in graph.edges(data='latency', default=1)],
+        )
+
+    def to_networkx(self):
+        """Return graph as :class:`~nx.DiGraph` with the same node and edge order."""
+        graph = nx.DiGraph()
+        for node_id, instruction_form in zip(self.node_ids, self.instruction_forms):
+            graph.add_node(node_id, instruction_form=instruction_form)
+        for u, v, latency in self.edges(data=True):
+            graph.add_edge(u, v, latency=latency)
+        return graph
+
+    @staticmethod
+    def _to_csr(node_count, edges):
+        """Return offsets, targets and weights of ``edges`` grouped stably by their source"""
+        offsets = array('l', [0] * (node_count + 1))
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for n in range(node_count):
+            offsets[n + 1] += offsets[n]
+        position = array('l', offsets[:-1])
+        targets = array('l', [0] * len(edges))
+        weights = [None] * len(edges)
+        for source, target, weight in edges:
+            targets[position[source]] = target
+            weights[position[source]] = weight
+            position[source] += 1
+        return offsets, targets, weights
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def has_node(self, node_id):
+        return node_id in self.index
+
+    def has_edge(self, u, v):
+        return self.get_latency(u, v) is not None
+
+    def get_latency(self, u, v):
+        """Return latency of edge from node ``u`` to ``v`` (networkx IDs) or `None`"""
+        if u not in self.index or v not in self.index:
+            return None
+        source, target = self.index[u], self.index[v]
+        for e in range(self.offsets[source], self.offsets[source + 1]):
+            if self.targets[e] == target:
+                return self.latencies[e]
+        return None
+
+    def successors(self, node_id):
+        """Return iterator over the networkx IDs of all successors of ``node_id``"""
+        n = self.index[node_id]
+        return (
+            self.node_ids[self.targets[e]] for e in range(self.offsets[n], self.offsets[n + 1])
+        )
+
+    def edges(self, data=False):
+        """Return iterator over all edges as networkx IDs in networkx order"""
+        for source, node_id in enumerate(self.node_ids):
+            for e in range(self.offsets[source], self.offsets[source + 1]):
+                if data:
+                    yield node_id, self.node_ids[self.targets[e]], self.latencies[e]
+                else:
+                    yield node_id, self.node_ids[self.targets[e]]
+
+    def topological_order(self):
+        """
+        Return node indices in topological order (like :func:`nx.topological_sort`) or `None`
+        if the graph is cyclic.
+        """
+        if self._topological_order is None:
+            in_degree = [
+                self.pred_offsets[n + 1] - self.pred_offsets[n] for n in range(len(self))
+            ]
+            order = [n for n in range(len(self)) if in_degree[n] == 0]
+            # generations of nodes, as networkx does
+            start = 0
+            while start < len(order):
+                end = len(order)
+                for n in order[start:end]:
+                    for e in range(self.offsets[n], self.offsets[n + 1]):
+                        in_degree[self.targets[e]] -= 1
+                        if in_degree[self.targets[e]] == 0:
+                            order.append(self.targets[e])
+                start = end
+            self._topological_order = order if len(order) == len(self) else False
+        if self._topological_order is False:
+            return None
+        return self._topological_order
+
+    def is_acyclic(self):
+        return self.topological_order() is not None
+
+    def longest_path(self):
+        """
+        Return longest path as list of networkx IDs, weighted by latency.
+        Same result as :func:`nx.dag_longest_path`.
+        """
+        if len(self) == 0:
+            return []
+        order = self.topological_order()
+        distance = [0] * len(self)
+        predecessor = list(range(len(self)))
+        for v in order:
+            best = None
+            for e in range(self.pred_offsets[v], self.pred_offsets[v + 1]):
+                length = distance[self.sources[e]] + self.pred_latencies[e]
+                # first predecessor with maximum distance
+                if best is None or length > best:
+                    best = length
+                    predecessor[v] = self.sources[e]
+            if best is not None and best >= 0:
+                distance[v] = best
+            else:
+                distance[v], predecessor[v] = 0, v
+        # first node in topological order with maximum distance
+        v = max(order, key=lambda n: distance[n])
+        path = [v]
+        while predecessor[v] != v:
+            v = predecessor[v]
+            path.append(v)
+        return [self.node_ids[n] for n in reversed(path)]
+
+    def longest_paths_from(self, source, node_ids):
+        """
+        Compute the longest paths from ``source`` to all nodes reachable via ``node_ids``.
+
+        :param source: networkx ID of the start node
+        :param list node_ids: networkx IDs of nodes to visit in topological order, starting
+            with ``source``
+        :returns: `tuple` -- dicts with the path latency and the predecessor of each node
+        """
+        distances = {source: 0}
+        predecessors = {source: None}
+        for node in node_ids:
+            if node not in distances:
+                continue
+            n = self.index[node]
+            for e in range(self.offsets[n], self.offsets[n + 1]):
+                successor = self.node_ids[self.targets[e]]
+                distance = distances[node] + self.latencies[e]
+                if successor not in distances or distance > distances[successor]:
+                    distances[successor] = distance
+                    predecessors[successor] = node
+        return distances, predecessors
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 
+import mmap
 import os
 import pickle
 import re
 import string
-from copy import deepcopy
+import struct
+import threading
+from copy import copy, deepcopy
 from itertools import product
 import hashlib
 from pathlib import Path
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
 
 import ruamel.yaml
 from ruamel.yaml.compat import StringIO
@@ -19,9 +23,29 @@ from osaca.parser import ParserX86ATT
 
 class MachineModel(object):
     WILDCARD = '*'
+    VECTOR_REGISTERS = ('mm', 'xmm', 'ymm', 'zmm')
+    MIN_INDEXED_FORMS = 2  # smaller lists of instruction forms are faster to scan linearly
+    LOOKUP_CACHE_SIZE = 4096  # maximum number of cached get_instruction results
     INTERNAL_VERSION = 1  # increase whenever self._data format changes to invalidate cache!
+    CACHE_MAGIC = b'OSACAMM\0'
+    CACHE_FORMAT_VERSION = 1  # increase whenever the binary cache layout changes
+    # magic, format version, internal version, number of mnemonics, base offset and length
+    CACHE_HEADER = struct.Struct('<8sHHIQQ')
+    # name offset and length in string table, forms offset and length
+    CACHE_ENTRY = struct.Struct('<IIQQ')
+    # shared models of this process, see get_shared()
+    _registry = {}
+    _registry_lock = threading.Lock()
+    # content hashes of model files, see get_file_hash()
+    _hashes = {}
 
-    def __init__(self, arch=None, path_to_yaml=None, isa=None, lazy=False):
+    def __init__(self, arch=None, path_to_yaml=None, isa=None, lazy=False, on_demand=False):
+        # shared models copy their data before modifying it
+        self._shared = False
+        # operand signature index per mnemonic, built on demand
+        self._operand_index = {}
+        # LRU cache of get_instruction results, shared by all views of a shared model
+        self._lookup_cache = _LookupCache(self.LOOKUP_CACHE_SIZE)
         if not arch and not path_to_yaml:
             if not isa:
                 raise ValueError('One of arch, path_to_yaml and isa must be specified')
@@ -47,6 +71,8 @@ class MachineModel(object):
         else:
             if arch and path_to_yaml:
                 raise ValueError('Only one of arch and path_to_yaml is allowed.')
+            if lazy and on_demand:
+                raise ValueError('Only one of lazy and on_demand is allowed.')
             self._path = path_to_yaml
             self._arch = arch
             yaml = self._create_yaml_object()
@@ -57,6 +83,10 @@ class MachineModel(object):
             cached = self._get_cached(self._path) if not lazy else False
             if cached:
                 self._data = cached
+            elif on_demand or (not lazy and not self._can_write_cache(Path(self._path))):
+                # only parse instruction forms of requested mnemonics, without a cache all forms
+                # would be parsed again by every process
+                self._data = self._load_on_demand(self._path, yaml)
             else:
                 # otherwise load
                 with open(self._path, 'r') as f:
@@ -74,10 +104,7 @@ class MachineModel(object):
                 for entry in [x for x in self._data['instruction_forms']
                               if isinstance(x['name'], list)]:
                     for name in entry['name']:
-                        new_entry = {'name': name}
-                        for k in [x for x in entry.keys() if x != 'name']:
-                            new_entry[k] = entry[k]
-                        self._data['instruction_forms'].append(new_entry)
+                        self._data['instruction_forms'].append(self._get_alias_entry(entry, name))
                     # remove old entry
                     self._data['instruction_forms'].remove(entry)
                 # Normalize instruction_form names (to UPPERCASE) and build dict for faster access:
@@ -93,12 +120,119 @@ class MachineModel(object):
 
     def __getitem__(self, key):
         """Return configuration entry."""
+        if key == 'instruction_forms' and self._data[key] is None:
+            # instruction forms of binary cache are only loaded if needed as whole list
+            self._data[key] = self._data['instruction_forms_dict'].get_all()
         return self._data[key]
 
     def __contains__(self, key):
         """Return true if configuration key is present."""
         return key in self._data
 
+    @classmethod
+    def get_shared(cls, arch=None, path_to_yaml=None, lazy=False, on_demand=False):
+        """
+        Return machine model shared with all other users in this process.
+
+        Models are loaded only once per resolved path and modification stamp of their file.
+        Shared models must be treated as read-only, except for :meth:`set_instruction`, which
+        creates a private copy of the data first.
+
+        :param arch: micro-arch code of machine model, defaults to `None`
+        :type arch: str, optional
+        :param path_to_yaml: path to the YAML file of machine model, defaults to `None`
+        :type path_to_yaml: str, optional
+        :param lazy: instruction forms are not needed, defaults to `False`
+        :type lazy: bool, optional
+        :param on_demand: only parse instruction forms of requested mnemonics if the model is not
+            cached, defaults to `False`
+        :type on_demand: bool, optional
+        :returns: :class:`~MachineModel` instance
+        """
+        if not arch and not path_to_yaml:
+            raise ValueError('One of arch and path_to_yaml must be specified')
+        if arch and path_to_yaml:
+            raise ValueError('Only one of arch and path_to_yaml is allowed.')
+        path = Path(path_to_yaml or utils.find_datafile(arch.lower() + '.yml')).resolve()
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        mode = (lazy, on_demand)
+        with cls._registry_lock:
+            # models with instruction forms serve all requests
+            for candidate in [mode, (False, False), (False, True)]:
+                model = cls._registry.get(key + candidate)
+                if model is not None:
+                    break
+            else:
+                if arch:
+                    model = cls(arch=arch, lazy=lazy, on_demand=on_demand)
+                else:
+                    model = cls(path_to_yaml=path_to_yaml, lazy=lazy, on_demand=on_demand)
+                # drop models of outdated files
+                for outdated in [k for k in cls._registry if k[0] == key[0] and k[1:3] != key[1:]]:
+                    del cls._registry[outdated]
+                cls._registry[key + mode] = model
+        return model._get_view()
+
+    @classmethod
+    def clear_shared(cls):
+        """Remove all shared machine models of this process."""
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    @classmethod
+    def get_file_hash(cls, filepath):
+        """
+        Return SHA-256 hash of a machine model file.
+
+        The hash is taken from earlier calls or the stamp files of the model cache if the file
+        was not modified since, so the file only needs to be read if it was touched.
+
+        :param filepath: path of machine model file
+        :type filepath: str
+        :returns: `str` -- hexadecimal content hash
+        """
+        p = Path(filepath).resolve()
+        stat = p.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = (str(p),) + stamp
+        with cls._registry_lock:
+            hexhash = cls._hashes.get(key)
+        if hexhash is None:
+            for _, _, stampfile in cls._get_cache_locations(p):
+                hexhash = cls._read_stamp(stampfile, p, stamp)
+                if hexhash is not None:
+                    break
+            else:
+                hexhash = hashlib.sha256(p.read_bytes()).hexdigest()
+            with cls._registry_lock:
+                cls._hashes[key] = hexhash
+        return hexhash
+
+    def _get_view(self):
+        """Return shared view of this model, which uses the same data and lookup cache."""
+        view = copy(self)
+        view._shared = True
+        return view
+
+    def _detach(self):
+        """Replace shared data by a private copy."""
+        shared_data = self._data
+        self._data = {
+            k: deepcopy(v) for k, v in shared_data.items() if k != 'instruction_forms_dict'
+        }
+        if self._data['instruction_forms'] is None:
+            # lazily loaded instruction forms need to be copied as well
+            self._data['instruction_forms'] = deepcopy(
+                shared_data['instruction_forms_dict'].get_all()
+            )
+        self._data['instruction_forms_dict'] = defaultdict(list)
+        for iform in self._data['instruction_forms']:
+            self._data['instruction_forms_dict'][iform['name']].append(iform)
+        self._operand_index = {}
+        self._lookup_cache = _LookupCache(self.LOOKUP_CACHE_SIZE)
+        self._shared = False
+
     ######################################################
 
     def get_instruction(self, name, operands):
@@ -106,7 +240,18 @@ class MachineModel(object):
         # For use with dict instead of list as DB
         if name is None:
             return None
+        # check for previous lookup of same mnemonic and operand shape
+        key = (name.upper(), self._get_operands_shape(operands))
+        return self._lookup_cache.get(key, lambda: self._find_instruction(name, operands))
+
+    def _find_instruction(self, name, operands):
+        """Find and return instruction data from name and operands without using the cache."""
         name_matched_iforms = self._data['instruction_forms_dict'].get(name.upper(), [])
+        # narrow down candidates by operand signature for mnemonics with many forms
+        if len(name_matched_iforms) > self.MIN_INDEXED_FORMS:
+            key = self._get_key(name, operands)
+            if key is not None:
+                name_matched_iforms = self._get_indexed_iforms(*key)
         try:
             return next(
                 instruction_form
@@ -119,6 +264,15 @@ class MachineModel(object):
             print('\nname: {}\noperands: {}'.format(name, operands))
             raise TypeError from e
 
+    def get_cache_info(self):
+        """Return hits, misses, maximum and current size of the instruction lookup cache."""
+        return self._lookup_cache.get_info()
+
+    def clear_cache(self):
+        """Clear instruction lookup cache and operand signature index."""
+        self._lookup_cache.clear()
+        self._operand_index.clear()
+
     def average_port_pressure(self, port_pressure):
         """Construct average port pressure list from instruction data."""
         port_list = self._data['ports']
@@ -132,11 +286,15 @@ class MachineModel(object):
         self, name, operands=None, latency=None, port_pressure=None, throughput=None, uops=None
     ):
         """Import instruction form information."""
+        if self._shared:
+            # copy on write
+            self._detach()
         # If it already exists. Overwrite information.
         instr_data = self.get_instruction(name, operands)
+        self.clear_cache()
         if instr_data is None:
             instr_data = {}
-            self._data['instruction_forms'].append(instr_data)
+            self['instruction_forms'].append(instr_data)
 
         instr_data['name'] = name
         instr_data['operands'] = operands
@@ -192,9 +350,20 @@ class MachineModel(object):
 
     def get_store_latency(self, reg_type):
         """Return store latency for given register type."""
-        # assume 0 for now, since load-store-dependencies currently not detectable
+        # assume 0, the latency of loads depending on stores is accounted for by KernelDG, see
+        # get_store_to_load_forward_latency()
         return 0
 
+    def get_store_to_load_forward_latency(self, reg_type):
+        """
+        Return latency of forwarding stored data to a load of the same address for given
+        register type, i.e., from the store until the loaded data is available. Defaults to the
+        load latency if not specified in the model.
+        """
+        if reg_type in (self._data.get('store_to_load_forward_latency') or {}):
+            return self._data['store_to_load_forward_latency'][reg_type]
+        return (self._data.get('load_latency') or {}).get(reg_type, 0)
+
     def get_store_throughput(self, memory):
         """Return store throughput for given register type."""
         st_tp = [m for m in self._data['store_throughput'] if self._match_mem_entries(memory, m)]
@@ -262,7 +431,7 @@ class MachineModel(object):
     def dump(self, stream=None):
         """Dump machine model to stream or return it as a ``str`` if no stream is given."""
         # Replace instruction form's port_pressure with styled version for RoundtripDumper
-        formatted_instruction_forms = deepcopy(self._data['instruction_forms'])
+        formatted_instruction_forms = deepcopy(self['instruction_forms'])
         for instruction_form in formatted_instruction_forms:
             if instruction_form['port_pressure'] is not None:
                 cs = ruamel.yaml.comments.CommentedSeq(instruction_form['port_pressure'])
@@ -302,29 +471,30 @@ class MachineModel(object):
         """
         Check if machine model is cached and if so, load it.
 
+        A stamp file next to the cache records modification time, size and hash of the YAML
+        file, so the file only needs to be hashed if it was touched.
+
         :param filepath: path to check for cached machine model
         :type filepath: str
         :returns: cached DB if existing, `False` otherwise
         """
         p = Path(filepath)
-        hexhash = hashlib.sha256(p.read_bytes()).hexdigest()
-
-        # 1. companion cachefile: same location, with '.<name>_<sha512hash>.pickle'
-        companion_cachefile = p.with_name('.' + p.stem + '_' + hexhash).with_suffix('.pickle')
-        if companion_cachefile.exists():
-            # companion file (must be up-to-date, due to equal hash)
-            with companion_cachefile.open('rb') as f:
-                data = pickle.load(f)
-            if data.get('internal_version') == self.INTERNAL_VERSION:
-                return data
+        stat = p.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        locations = self._get_cache_locations(p)
+        for cache_dir, prefix, stampfile in locations:
+            hexhash = self._read_stamp(stampfile, p, stamp)
+            if hexhash is not None:
+                data = self._load_binary(cache_dir / (prefix + hexhash + '.bin'))
+                if data:
+                    return data
 
-        # 2. home cachefile: ~/.osaca/cache/<name>_<sha512hash>.pickle
-        home_cachefile = (Path(utils.CACHE_DIR) / (p.stem + '_' + hexhash)).with_suffix('.pickle')
-        if home_cachefile.exists():
-            # home file (must be up-to-date, due to equal hash)
-            with home_cachefile.open('rb') as f:
-                data = pickle.load(f)
-            if data.get('internal_version') == self.INTERNAL_VERSION:
+        # stamps are missing or outdated, fall back to content hash
+        hexhash = hashlib.sha256(p.read_bytes()).hexdigest()
+        for cache_dir, prefix, stampfile in locations:
+            data = self._load_binary(cache_dir / (prefix + hexhash + '.bin'))
+            if data:
+                self._write_stamp(stampfile, p, stamp, hexhash)
                 return data
         return False
 
@@ -336,66 +506,395 @@ class MachineModel(object):
         :type filepath: str
         """
         p = Path(filepath)
+        stat = p.stat()
         hexhash = hashlib.sha256(p.read_bytes()).hexdigest()
-        # 1. companion cachefile: same location, with '.<name>_<sha512hash>.pickle'
-        companion_cachefile = p.with_name('.' + p.stem + '_' + hexhash).with_suffix('.pickle')
-        if os.access(str(companion_cachefile.parent), os.W_OK):
-            with companion_cachefile.open('wb') as f:
-                pickle.dump(self._data, f)
-                return
-
-        # 2. home cachefile: ~/.osaca/cache/<name>_<sha512hash>.pickle
-        cache_dir = Path(utils.CACHE_DIR)
+        for cache_dir, prefix, stampfile in self._get_cache_locations(p):
+            if not self._is_writable(cache_dir):
+                continue
+            self._write_binary(cache_dir / (prefix + hexhash + '.bin'))
+            self._write_stamp(stampfile, p, (stat.st_mtime_ns, stat.st_size), hexhash)
+            return
+
+    @classmethod
+    def _can_write_cache(cls, p):
+        """Return true if the cache of machine model file ``p`` can be written."""
+        return any(
+            cls._is_writable(cache_dir) for cache_dir, _, _ in cls._get_cache_locations(p)
+        )
+
+    @staticmethod
+    def _is_writable(cache_dir):
+        """Create ``cache_dir`` if needed and return true if it is writable."""
         try:
             os.makedirs(cache_dir, exist_ok=True)
         except OSError:
-            return
-        home_cachefile = (cache_dir / (p.stem + '_' + hexhash)).with_suffix('.pickle')
-        if os.access(str(home_cachefile.parent), os.W_OK):
-            with home_cachefile.open('wb') as f:
-                pickle.dump(self._data, f)
+            return False
+        return os.access(str(cache_dir), os.W_OK)
+
+    @staticmethod
+    def _get_cache_locations(p):
+        """
+        Return cache locations of machine model file.
+
+        :param p: path of machine model file
+        :type p: :class:`~pathlib.Path`
+        :returns: `list` of tuples with cache directory, cache file prefix and stamp file
+        """
+        cache_dir = Path(utils.CACHE_DIR)
+        return [
+            # 1. companion cachefile: same location, with '.<name>_<sha256hash>.bin'
+            (p.parent, '.' + p.stem + '_', p.parent / ('.' + p.stem + '.stamp')),
+            # 2. home cachefile: ~/.osaca/cache/<name>_<sha256hash>.bin
+            (cache_dir, p.stem + '_', cache_dir / (p.stem + '.stamp')),
+        ]
+
+    @staticmethod
+    def _read_stamp(stampfile, p, stamp):
+        """Return hash of stamp file if it matches ``stamp`` of ``p``, `None` otherwise."""
+        try:
+            mtime, size, hexhash, path = stampfile.read_text().split(' ', 3)
+        except (OSError, ValueError):
+            return None
+        if (int(mtime), int(size)) != stamp or path != str(p.resolve()):
+            return None
+        return hexhash
+
+    def _write_stamp(self, stampfile, p, stamp, hexhash):
+        """Write modification time, size and content hash of ``p`` to ``stampfile``."""
+        content = '{} {} {} {}'.format(stamp[0], stamp[1], hexhash, p.resolve())
+        try:
+            self._write_atomic(stampfile, content.encode())
+        except OSError:
+            pass
+
+    def _write_binary(self, cachefile):
+        """
+        Write machine model in binary cache format.
+
+        The header is followed by a table of all mnemonics, a string table with their names, the
+        pickled model without instruction forms and one pickled chunk of instruction forms per
+        mnemonic, which allows to load single mnemonics on demand.
+
+        :param cachefile: path of binary cache file
+        :type cachefile: :class:`~pathlib.Path`
+        """
+        positions = {id(iform): i for i, iform in enumerate(self._data['instruction_forms'])}
+        base = pickle.dumps(
+            {
+                k: v
+                for k, v in self._data.items()
+                if k not in ['instruction_forms', 'instruction_forms_dict']
+            }
+        )
+        names = [name.encode() for name in self._data['instruction_forms_dict']]
+        chunks = [
+            pickle.dumps([(positions[id(iform)], iform) for iform in iforms])
+            for iforms in self._data['instruction_forms_dict'].values()
+        ]
+        strings_offset = self.CACHE_HEADER.size + len(names) * self.CACHE_ENTRY.size
+        base_offset = strings_offset + sum(len(name) for name in names)
+        header = self.CACHE_HEADER.pack(
+            self.CACHE_MAGIC,
+            self.CACHE_FORMAT_VERSION,
+            self.INTERNAL_VERSION,
+            len(names),
+            base_offset,
+            len(base),
+        )
+        table = []
+        name_offset = strings_offset
+        chunk_offset = base_offset + len(base)
+        for name, chunk in zip(names, chunks):
+            table.append(self.CACHE_ENTRY.pack(name_offset, len(name), chunk_offset, len(chunk)))
+            name_offset += len(name)
+            chunk_offset += len(chunk)
+        try:
+            self._write_atomic(cachefile, b''.join([header] + table + names + [base] + chunks))
+        except OSError:
+            pass
+
+    def _load_binary(self, cachefile):
+        """
+        Map binary cache file into memory and load machine model without instruction forms.
+
+        :param cachefile: path of binary cache file
+        :type cachefile: :class:`~pathlib.Path`
+        :returns: cached DB if valid, `False` otherwise
+        """
+        try:
+            with cachefile.open('rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, internal_version, count, base_offset, base_length = (
+                self.CACHE_HEADER.unpack_from(buffer)
+            )
+            if (
+                magic != self.CACHE_MAGIC
+                or version != self.CACHE_FORMAT_VERSION
+                or internal_version != self.INTERNAL_VERSION
+            ):
+                return False
+            entries = {}
+            for i in range(count):
+                name_offset, name_length, offset, length = self.CACHE_ENTRY.unpack_from(
+                    buffer, self.CACHE_HEADER.size + i * self.CACHE_ENTRY.size
+                )
+                name = buffer[name_offset:name_offset + name_length].decode()
+                entries[name] = (offset, length)
+            data = pickle.loads(buffer[base_offset:base_offset + base_length])
+        except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError):
+            return False
+        data['instruction_forms'] = None
+        data['instruction_forms_dict'] = _InstructionFormsChunks(buffer, entries)
+        return data
+
+    def _write_atomic(self, path, content):
+        """Write ``content`` to temporary file and move it to ``path``."""
+        tmp_path = path.with_name(
+            '{}.{}.{}.tmp'.format(path.name, os.getpid(), threading.get_ident())
+        )
+        try:
+            with tmp_path.open('wb') as f:
+                f.write(content)
+            os.replace(str(tmp_path), str(path))
+        except OSError:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+    def _load_on_demand(self, filepath, yaml):
+        """
+        Load machine model without instruction forms and index their location in the file.
+
+        :param filepath: path of machine model file
+        :type filepath: str
+        :param yaml: YAML object for parsing instruction forms later on
+        :returns: DB with instruction forms being parsed on demand
+        """
+        content = Path(filepath).read_bytes()
+        section = re.search(rb'^instruction_forms:.*$', content, re.MULTILINE)
+        if section is None:
+            data = yaml.load(content.decode())
+            data['instruction_forms'] = []
+            data['instruction_forms_dict'] = defaultdict(list)
+            data['internal_version'] = self.INTERNAL_VERSION
+            return data
+        # instruction forms section ends with next top level key
+        section_end = re.compile(rb'^[A-Za-z_]', re.MULTILINE).search(content, section.end())
+        end = section_end.start() if section_end is not None else len(content)
+        data = yaml.load((content[:section.start()] + content[end:]).decode())
+
+        first_entry = re.compile(rb'^( *)- ', re.MULTILINE).search(content, section.end(), end)
+        offsets = defaultdict(list)
+        if first_entry is not None:
+            entry_start = re.compile(b'^' + first_entry.group(1) + b'- ', re.MULTILINE)
+            starts = [m.start() for m in entry_start.finditer(content, section.end(), end)]
+            for index, (start, stop) in enumerate(zip(starts, starts[1:] + [end])):
+                for name in self._get_entry_names(content[start:stop], yaml):
+                    offsets[name.upper()].append((index, start, stop))
+        data['instruction_forms'] = None
+        data['instruction_forms_dict'] = _InstructionFormsIndex(content, offsets, yaml)
+        data['internal_version'] = self.INTERNAL_VERSION
+        return data
+
+    def _get_entry_names(self, entry, yaml):
+        """Return all mnemonics of YAML instruction form ``entry``."""
+        match = re.match(rb' *- +name: *(.*?)(?: +#.*)?\r?$', entry, re.MULTILINE)
+        if match is not None:
+            value = match.group(1).decode().strip()
+            if value.startswith('[') and value.endswith(']'):
+                names = [name.strip().strip('\'"') for name in value[1:-1].split(',')]
+            else:
+                names = [value.strip('\'"')]
+            if all(names) and not any(set(name) & set('[]{}:,\'"') for name in names):
+                return names
+        # name is not a plain scalar in the first line, parse whole entry
+        iform = yaml.load((b'instruction_forms:\n' + entry).decode())['instruction_forms'][0]
+        return iform['name'] if isinstance(iform['name'], list) else [iform['name']]
+
+    @staticmethod
+    def _get_alias_entry(entry, name):
+        """Return copy of multi-alias instruction form ``entry`` for single mnemonic ``name``."""
+        new_entry = {'name': name}
+        for k in [x for x in entry.keys() if x != 'name']:
+            new_entry[k] = entry[k]
+        return new_entry
 
     def _get_key(self, name, operands):
-        """Get unique instruction form key for dict DB."""
-        key_string = name.lower() + '-'
+        """
+        Get instruction form key for operand signature index.
+
+        :returns: `tuple` of normalized mnemonic and operand signature, `None` if operands can
+            match instruction forms of any signature (e.g., because of wildcards)
+        """
+        if operands is None:
+            return None
+        isa = self._data['isa'].lower()
+        signature = tuple(self._get_operand_hash(op, isa) for op in operands)
+        if None in signature:
+            return None
+        return name.upper(), signature
+
+    def _get_operands_shape(self, operands):
+        """
+        Get hashable representation of operands for the lookup cache.
+
+        Register numbers are removed where irrelevant for matching, so that, e.g., all xmm
+        registers share the same shape.
+        """
         if operands is None:
-            return key_string[:-1]
-        key_string += '_'.join([self._get_operand_hash(op) for op in operands])
-        return key_string
+            return None
+        isa = self._data['isa'].lower()
+        return tuple(self._get_shape(op, isa) for op in operands)
 
-    def _get_operand_hash(self, operand):
-        """Get unique key for operand for dict DB"""
-        operand_string = ''
+    def _get_shape(self, obj, isa, is_register=False):
+        """Convert (parsed) operand ``obj`` recursively to hashable tuples"""
+        if isinstance(obj, Mapping):
+            items = dict(obj.items())
+            if is_register and isa == 'x86' and 'name' in items:
+                # differentiate between vector registers (mm, xmm, ymm, zmm) and others (gpr)
+                reg_type = items['name'].rstrip(string.digits).lower()
+                if reg_type in self.VECTOR_REGISTERS:
+                    items['name'] = reg_type
+                elif items['name'] != self.WILDCARD:
+                    items['name'] = 'gpr'
+                if 'mask' in items:
+                    items['mask'] = items['mask'].rstrip(string.digits).lower()
+            elif is_register and isa == 'aarch64':
+                # only prefix and shape are relevant
+                items.pop('name', None)
+            # registers in parsed operands and memory addresses
+            register_keys = ['register', 'base', 'index'] if 'class' not in obj else []
+            return tuple(
+                sorted(
+                    (k, self._get_shape(v, isa, is_register=k in register_keys))
+                    for k, v in items.items()
+                )
+            )
+        if isinstance(obj, list):
+            return tuple(self._get_shape(x, isa) for x in obj)
+        return obj
+
+    def _get_operand_hash(self, operand, isa):
+        """
+        Get hashable signature of operand class for operand signature index.
+
+        Works for DB entries and parsed operands. All operands matching each other (see
+        :func:`~MachineModel._check_operands`) have the same signature.
+
+        :param dict operand: DB or parsed operand
+        :param str isa: lower case ISA of the model
+        :returns: `tuple` representing operand class, `None` for wildcards and unknown operands
+        """
+        if self.WILDCARD in operand:
+            return None
         if 'class' in operand:
             # DB entry
-            opclass = operand['class']
-        else:
-            # parsed instruction
-            opclass = list(operand.keys())[0]
-            operand = operand[opclass]
-        if opclass == 'immediate':
-            # Immediate
-            operand_string += 'i'
-        elif opclass == 'register':
-            # Register
-            if 'prefix' in operand:
-                operand_string += operand['prefix']
-                operand_string += operand['shape'] if 'shape' in operand else ''
-            elif 'name' in operand:
-                operand_string += 'r' if operand['name'] == 'gpr' else operand['name'][0]
-        elif opclass == 'memory':
-            # Memory
-            operand_string += 'm'
-            operand_string += 'b' if operand['base'] is not None else ''
-            operand_string += 'o' if operand['offset'] is not None else ''
-            operand_string += 'i' if operand['index'] is not None else ''
-            operand_string += (
-                's' if operand['scale'] == self.WILDCARD or operand['scale'] > 1 else ''
+            return self._get_db_operand_hash(operand, isa)
+        # parsed operand
+        if 'register' in operand:
+            register = operand['register']
+            if isa == 'x86':
+                if 'name' not in register or register['name'] == self.WILDCARD:
+                    return None
+                # differentiate between vector registers (mm, xmm, ymm, zmm) and others (gpr)
+                reg_type = register['name'].rstrip(string.digits).lower()
+                return ('register', reg_type if reg_type in self.VECTOR_REGISTERS else 'gpr')
+            if 'prefix' not in register or register['prefix'] == self.WILDCARD:
+                return None
+            return ('register', register['prefix'])
+        if 'memory' in operand:
+            memory = operand['memory']
+            if isa == 'x86':
+                return (
+                    'memory',
+                    memory['base'] is not None,
+                    memory['index'] is not None,
+                    memory['scale'] != 1,
+                )
+            return (
+                'memory',
+                memory['base'] is not None,
+                memory['offset'] is not None,
+                memory['index'] is not None,
+                memory['scale'] != 1,
+                'pre_indexed' in memory,
+                'post_indexed' in memory,
+            )
+        if isa == 'x86':
+            if 'immediate' in operand or 'value' in operand:
+                return ('immediate', 'int')
+            if 'identifier' in operand:
+                return ('identifier',)
+            return None
+        immediate = operand['immediate'] if 'immediate' in operand else {}
+        for imd_key, imd in [('value', 'int'), ('float', 'float'), ('double', 'double')]:
+            if imd_key in operand or imd_key in immediate:
+                return ('immediate', imd)
+        if 'identifier' in operand or 'identifier' in immediate:
+            return ('identifier',)
+        if 'prfop' in operand:
+            return ('prfop',)
+        return None
+
+    def _get_db_operand_hash(self, operand, isa):
+        """Get hashable signature of DB operand, `None` if it contains wildcards"""
+        if operand['class'] == 'register':
+            attribute = 'name' if isa == 'x86' else 'prefix'
+            if operand.get(attribute, self.WILDCARD) == self.WILDCARD:
+                return None
+            return ('register', operand[attribute])
+        if operand['class'] == 'memory':
+            attributes = ['base', 'index', 'scale']
+            if isa != 'x86':
+                attributes += ['offset', 'pre-indexed', 'post-indexed']
+            if any(operand.get(a, self.WILDCARD) == self.WILDCARD for a in attributes):
+                return None
+            if isa == 'x86':
+                return (
+                    'memory',
+                    operand['base'] is not None,
+                    operand['index'] is not None,
+                    operand['scale'] != 1,
+                )
+            return (
+                'memory',
+                operand['base'] is not None,
+                operand['offset'] is not None,
+                operand['index'] is not None,
+                operand['scale'] != 1,
+                bool(operand['pre-indexed']),
+                bool(operand['post-indexed']),
             )
-            if 'pre-indexed' in operand:
-                operand_string += 'r' if operand['pre-indexed'] else ''
-                operand_string += 'p' if operand['post-indexed'] else ''
-        return operand_string
+        if operand['class'] == 'immediate':
+            if operand.get('imd', self.WILDCARD) == self.WILDCARD:
+                return None
+            return ('immediate', operand['imd'])
+        if operand['class'] == self.WILDCARD:
+            return None
+        return (operand['class'],)
+
+    def _get_indexed_iforms(self, name, signature):
+        """Return instruction forms of mnemonic ``name`` possibly matching operand ``signature``"""
+        if name not in self._operand_index:
+            # build index of mnemonic on first use, keep instruction forms in DB order and add
+            # forms with wildcards to every signature
+            iforms = self._data['instruction_forms_dict'].get(name, [])
+            keys = [
+                self._get_key(name, iform['operands'] if 'operands' in iform else [])
+                for iform in iforms
+            ]
+            index = {key[1]: [] for key in keys if key is not None}
+            wildcard_iforms = []
+            for key, iform in zip(keys, iforms):
+                if key is not None:
+                    index[key[1]].append(iform)
+                else:
+                    wildcard_iforms.append(iform)
+                    for iform_list in index.values():
+                        iform_list.append(iform)
+            self._operand_index[name] = (index, wildcard_iforms)
+        index, wildcard_iforms = self._operand_index[name]
+        return index.get(signature, wildcard_iforms)
 
     def _create_db_operand_aarch64(self, operand):
         """Create instruction form operand for DB out of operand string."""
@@ -448,7 +947,7 @@ class MachineModel(object):
         """
         matches = [
             instruction_form
-            for instruction_form in self._data['instruction_forms']
+            for instruction_form in self['instruction_forms']
             if instruction_form['name'].lower() == name.lower()
             and self._match_operands(instruction_form['operands'], operands)
         ]
@@ -747,3 +1246,134 @@ class MachineModel(object):
     def __represent_none(self, yaml_obj, data):
         """YAML representation for `None`"""
         return yaml_obj.represent_scalar(u'tag:yaml.org,2002:null', u'~')
+
+
+class _LookupCache(object):
+    """Thread-safe LRU cache of instruction lookups"""
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, find):
+        """Return cached value of ``key`` or store and return the result of ``find()``."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+        # search outside of the lock, concurrent misses of the same key find the same value
+        value = find()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_info(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'maxsize': self._maxsize,
+                'currsize': len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _LazyInstructionForms(Mapping):
+    """Mapping of mnemonics to instruction forms, which are loaded on demand"""
+
+    def __init__(self, names):
+        self._names = names
+        self._positions = {}
+        self._iforms = {}
+        # models and therefore their instruction forms may be shared between threads
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name not in self._iforms:
+            if name not in self._names:
+                raise KeyError(name)
+            with self._lock:
+                if name not in self._iforms:
+                    self._add(self._load([name]))
+        return self._iforms[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def get_all(self):
+        """Return all instruction forms in the order of the machine model file."""
+        with self._lock:
+            self._add(self._load([name for name in self._names if name not in self._iforms]))
+        entries = []
+        for name in self._names:
+            entries += zip(self._positions[name], self._iforms[name])
+        return [iform for _, iform in sorted(entries, key=lambda entry: entry[0])]
+
+    def _add(self, loaded):
+        for name, entries in loaded.items():
+            self._positions[name] = [position for position, _ in entries]
+            self._iforms[name] = [iform for _, iform in entries]
+
+    def _load(self, names):
+        """Return list of ``(position, instruction form)`` tuples for each of ``names``."""
+        raise NotImplementedError
+
+
+class _InstructionFormsChunks(_LazyInstructionForms):
+    """Instruction forms unpickled from the binary cache on demand"""
+
+    def __init__(self, buffer, entries):
+        super().__init__(entries)
+        self._buffer = buffer
+
+    def _load(self, names):
+        loaded = {}
+        for name in names:
+            offset, length = self._names[name]
+            loaded[name] = pickle.loads(self._buffer[offset:offset + length])
+        return loaded
+
+
+class _InstructionFormsIndex(_LazyInstructionForms):
+    """Instruction forms parsed on demand from their location in the YAML file"""
+
+    def __init__(self, content, offsets, yaml):
+        super().__init__(offsets)
+        self._content = content
+        self._yaml = yaml
+
+    def _load(self, names):
+        loaded = {name: [] for name in names}
+        if not names:
+            return loaded
+        entries = sorted({entry for name in names for entry in self._names[name]})
+        text = b'instruction_forms:\n' + b''.join(
+            self._content[start:stop] for _, start, stop in entries
+        )
+        iforms = self._yaml.load(text.decode())['instruction_forms']
+        # same order as in MachineModel: single mnemonic forms first, then multi-alias forms
+        for (index, _, _), entry in zip(entries, iforms):
+            if isinstance(entry['name'], list):
+                for alias_index, name in enumerate(entry['name']):
+                    if name.upper() in loaded:
+                        new_entry = MachineModel._get_alias_entry(entry, name.upper())
+                        loaded[name.upper()].append(((1, index, alias_index), new_entry))
+            elif entry['name'].upper() in loaded:
+                entry['name'] = entry['name'].upper()
+                loaded[entry['name']].append(((0, index), entry))
+        for name in names:
+            loaded[name].sort(key=lambda entry: entry[0])
+        return loaded
@@ -27,7 +27,7 @@ class ISASemantics(object):
     def __init__(self, isa, path_to_yaml=None):
         self._isa = isa.lower()
         path = path_to_yaml or utils.find_datafile('isa/' + self._isa + '.yml')
-        self._isa_model = MachineModel(path_to_yaml=path)
+        self._isa_model = MachineModel.get_shared(path_to_yaml=path)
         if self._isa == 'x86':
             self._parser = ParserX86ATT()
         elif self._isa == 'aarch64':
@@ -1,121 +1,431 @@
 #!/usr/bin/env python3
 
-import copy
-from itertools import chain, product
+from itertools import chain
 
 import networkx as nx
 
-from osaca.parser import AttrDict
 from osaca.semantics import INSTR_FLAGS, MachineModel
+from osaca.semantics.array_dag import ArrayDAG
+from osaca.semantics.memory_dependencies import find_store_dependents
 
 
-class KernelDG(nx.DiGraph):
+class KernelDG(object):
     def __init__(self, parsed_kernel, parser, hw_model: MachineModel):
         self.kernel = parsed_kernel
         self.parser = parser
         self.model = hw_model
-        self.dg = self.create_DG(self.kernel)
-        self.loopcarried_deps = self.check_for_loopcarried_dep(self.kernel)
+        self._nodes_by_lineno = {}
+        for instruction_form in reversed(self.kernel):
+            self._nodes_by_lineno[instruction_form.line_number] = instruction_form
+        self.graph = self.create_DG(self.kernel)
+        # networkx adapter of the graph, created on first access of dg
+        self._dg = None
+        self._dg_state = None
+        self._analyze_graph()
+        self._critical_path = self._find_critical_path()
 
-    def create_DG(self, kernel):
+    @property
+    def dg(self):
+        """
+        Dependency graph as :class:`~nx.DiGraph`, created from :attr:`graph` on first access.
+        Changes to the returned graph or an assigned graph are applied to the analysis on its
+        next query.
+        """
+        if self._dg is None:
+            self._dg = self.graph.to_networkx()
+            self._dg_state = self._get_graph_state(self._dg)
+        return self._dg
+
+    @dg.setter
+    def dg(self, graph):
+        self._dg = graph
+        self._dg_state = None
+        self._sync_graph()
+
+    @staticmethod
+    def _get_graph_state(graph):
+        """Return nodes, instruction forms and edge latencies of a networkx graph"""
+        return (
+            list(graph.nodes(data='instruction_form')),
+            list(graph.edges(data='latency', default=1)),
+        )
+
+    def _sync_graph(self):
+        """Rebuild :attr:`graph` and reset the analysis if :attr:`dg` was changed."""
+        if self._dg is None:
+            return
+        state = self._get_graph_state(self._dg)
+        if state == self._dg_state:
+            return
+        self._dg_state = state
+        self.graph = ArrayDAG.from_networkx(self._dg)
+        self._analyze_graph()
+        # critical path is computed again on next access
+        self._critical_path = None
+
+    def _analyze_graph(self):
+        """Reset CP and LCD annotations and find the LCDs of :attr:`graph`, if it is acyclic."""
+        for instruction_form in self.kernel:
+            instruction_form['latency_cp'] = 0
+            instruction_form['latency_lcd'] = 0
+        if self.graph.is_acyclic():
+            self.loopcarried_deps = self.check_for_loopcarried_dep(self.kernel)
+        else:
+            self.loopcarried_deps = {}
+        self._loopcarried_latencies = {
+            root: sum(instr_form['latency_lcd'] for instr_form in dep['dependencies'])
+            for root, dep in self.loopcarried_deps.items()
+        }
+
+    def create_DG(self, kernel, flag_dependencies=False):
         """
         Create directed graph from given kernel
 
         :param kernel: Parsed asm kernel with assigned semantic information
         :type kerne: list
-        :returns: :class:`~nx.DiGraph` -- directed graph object
+        :param flag_dependencies: indicating if dependencies of flags should be considered,
+            defaults to `False`
+        :type flag_dependencies: boolean, optional
+        :returns: :class:`~osaca.semantics.array_dag.ArrayDAG` -- directed graph object
         """
-        # 1. go through kernel instruction forms and add them as node attribute
-        # 2. find edges (to dependend further instruction)
-        # 3. get LT value and set as edge weight
-        dg = nx.DiGraph()
+        # 1. find dependent instructions by looking up the last writer of each register read
+        #    and loads of stored data
+        # 2. go through kernel instruction forms and add them as node attribute
+        # 3. add edges (to dependend further instruction)
+        # 4. get LT value and set as edge weight
+        dependents = self._find_dependents(kernel, flag_dependencies)
+        store_dependents = find_store_dependents(kernel, self.parser)
+        # nodes are numbered in the order networkx would have added them
+        index = {}
+        node_ids = []
+        instruction_forms = []
+        edges = []
+
+        def add_node(node_id, instruction_form):
+            if node_id not in index:
+                index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+                instruction_forms.append(instruction_form)
+            else:
+                instruction_forms[index[node_id]] = instruction_form
+            return index[node_id]
+
+        edge_index = {}
+
+        def add_edge(source, target, latency):
+            # keep maximum latency of register and memory dependency between the same nodes
+            if (source, target) in edge_index:
+                e = edge_index[(source, target)]
+                edges[e] = (source, target, max(edges[e][2], latency))
+            else:
+                edge_index[(source, target)] = len(edges)
+                edges.append((source, target, latency))
+
         for i, instruction_form in enumerate(kernel):
-            dg.add_node(instruction_form['line_number'])
-            dg.nodes[instruction_form['line_number']]['instruction_form'] = instruction_form
+            node = add_node(instruction_form['line_number'], instruction_form)
             # add load as separate node if existent
-            if (
-                INSTR_FLAGS.HAS_LD in instruction_form['flags']
-                and INSTR_FLAGS.LD not in instruction_form['flags']
-            ):
-                # add new node
-                dg.add_node(instruction_form['line_number'] + 0.1)
-                dg.nodes[instruction_form['line_number'] + 0.1][
-                    'instruction_form'
-                ] = instruction_form
-                # and set LD latency as edge weight
-                dg.add_edge(
-                    instruction_form['line_number'] + 0.1,
-                    instruction_form['line_number'],
-                    latency=instruction_form['latency'] - instruction_form['latency_wo_load'],
+            if self._get_load_node(instruction_form) != instruction_form['line_number']:
+                # add new node and set LD latency as edge weight
+                load_node = add_node(self._get_load_node(instruction_form), instruction_form)
+                add_edge(
+                    load_node,
+                    node,
+                    instruction_form['latency'] - instruction_form['latency_wo_load'],
                 )
-            for dep in self.find_depending(instruction_form, kernel[i + 1 :]):
-                edge_weight = (
-                    instruction_form['latency']
-                    if 'latency_wo_load' not in instruction_form
-                    else instruction_form['latency_wo_load']
+            for dep in dependents[i]:
+                add_edge(
+                    node,
+                    add_node(dep['line_number'], dep),
+                    self._get_edge_latency(instruction_form),
                 )
-                dg.add_edge(
-                    instruction_form['line_number'], dep['line_number'], latency=edge_weight
+            # loads of stored data depend on the store via store-to-load forwarding
+            for load in [kernel[j] for j in store_dependents[i]]:
+                add_edge(
+                    node,
+                    add_node(self._get_load_node(load), load),
+                    self._get_edge_latency(instruction_form)
+                    + self._get_store_forwarding_penalty(load),
                 )
-                dg.nodes[dep['line_number']]['instruction_form'] = dep
-        return dg
+        return ArrayDAG(node_ids, instruction_forms, edges)
+
+    def _get_edge_latency(self, instruction_form):
+        """Return latency of edges from ``instruction_form`` to its dependent instruction forms"""
+        if 'latency_wo_load' not in instruction_form:
+            return instruction_form['latency']
+        return instruction_form['latency_wo_load']
+
+    def _get_load_node(self, instruction_form):
+        """
+        Return node ID of the load of ``instruction_form``, which is a separate node if the
+        instruction form is no pure load instruction.
+        """
+        if (
+            INSTR_FLAGS.HAS_LD in instruction_form['flags']
+            and INSTR_FLAGS.LD not in instruction_form['flags']
+        ):
+            return instruction_form['line_number'] + 0.1
+        return instruction_form['line_number']
+
+    def _get_store_forwarding_penalty(self, load):
+        """
+        Return latency of forwarding stored data to ``load`` exceeding the load latency, which is
+        already part of the latency of the load.
+        """
+        if self.model is None or 'store_to_load_forward_latency' not in self.model:
+            return 0
+        registers = [
+            op['register']
+            for op in load['operands']
+            if 'register' in op and 'name' in op['register']
+        ]
+        try:
+            reg_type = self.parser.get_reg_type(registers[0]) if registers else None
+        except ValueError:
+            reg_type = None
+        load_latency = (self.model['load_latency'] or {}).get(reg_type, 0)
+        return max(0, self.model.get_store_to_load_forward_latency(reg_type) - load_latency)
+
+    def _get_forwarding_penalty(self, source, target):
+        """
+        Return latency of the edge from node ``source`` to ``target`` exceeding the latency of
+        ``source`` due to store-to-load forwarding.
+        """
+        if (
+            int(source) != source
+            or self.model is None
+            or 'store_to_load_forward_latency' not in self.model
+        ):
+            return 0
+        return self.graph.get_latency(source, target) - self._get_edge_latency(
+            self._get_node_by_lineno(source)
+        )
+
+    def _find_dependents(self, kernel, flag_dependencies=False):
+        """
+        Find all directly dependent instruction forms for each instruction form of the kernel.
+
+        Instead of scanning the rest of the kernel for each instruction, the last writer of every
+        register (and flag) is kept in a table while going through the kernel once.
+
+        :param list kernel: kernel to analyze
+        :param flag_dependencies: indicating if dependencies of flags should be considered,
+            defaults to `False`
+        :type flag_dependencies: boolean, optional
+        :returns: `list` -- list of dependent instruction forms for each instruction form
+        """
+        dependents = [[] for _ in kernel]
+        # last writer of each register and flag as (index, memory dependency)
+        last_writer = {}
+        for i, instruction_form in enumerate(kernel):
+            if instruction_form.semantic_operands is None:
+                continue
+            reads, kills, defs = self._get_accesses(instruction_form, flag_dependencies)
+            writers = {}
+            for writer, mem_dep in [last_writer[key] for key in reads if key in last_writer]:
+                writers[writer] = writers.get(writer, False) or mem_dep
+            for writer in sorted(writers):
+                dependents[writer].append(instruction_form)
+                if writers[writer]:
+                    instruction_form['mem_dep'] = kernel[writer]
+            for key in kills:
+                last_writer.pop(key, None)
+            for key, mem_dep in defs.items():
+                last_writer[key] = (i, mem_dep)
+        return dependents
+
+    def _find_loopcarried_dependents(self, kernel, flag_dependencies=False):
+        """
+        Find all instruction forms of the next iteration directly depending on each instruction
+        form of the kernel, i.e., the targets of dependencies with iteration distance 1.
+
+        The kernel is treated as cyclic: after going through it once, the table of last writers
+        is used to scan its beginning again as next iteration, until no register (or flag) is
+        written by the first iteration anymore. No instruction forms are copied.
+
+        :param list kernel: kernel to analyze
+        :param flag_dependencies: indicating if dependencies of flags should be considered,
+            defaults to `False`
+        :type flag_dependencies: boolean, optional
+        :returns: `list` -- list of indices of dependent instruction forms in the next
+            iteration for each instruction form
+        """
+        dependents = [[] for _ in kernel]
+        accesses = [
+            None
+            if instruction_form.semantic_operands is None
+            else self._get_accesses(instruction_form, flag_dependencies)
+            for instruction_form in kernel
+        ]
+        # first iteration: last writer of each register and flag
+        last_writer = {}
+        for i, access in enumerate(accesses):
+            if access is None:
+                continue
+            _, kills, defs = access
+            for key in kills:
+                last_writer.pop(key, None)
+            for key in defs:
+                last_writer[key] = i
+        # next iteration: reads of keys not overwritten yet depend on the first iteration
+        for i, access in enumerate(accesses):
+            if not last_writer:
+                break
+            if access is None:
+                continue
+            reads, kills, defs = access
+            for writer in sorted({last_writer[key] for key in reads if key in last_writer}):
+                dependents[writer].append(i)
+            for key in chain(kills, defs):
+                last_writer.pop(key, None)
+        return dependents
+
+    def _get_accesses(self, instruction_form, flag_dependencies=False):
+        """
+        Return registers and flags read, overwritten and defined by ``instruction_form``.
+
+        Same semantics as :func:`~KernelDG.is_read` and :func:`~KernelDG.is_written`, but with
+        registers mapped to their canonical register ID (and flags to their name).
+
+        :returns: `tuple` -- set of read keys, set of written keys and dict of keys defined by the
+            instruction form, mapped to `True` if defined by pre- or post-indexed memory access
+        """
+        reads = set()
+        kills = set()
+        defs = {}
+        semantic_operands = instruction_form.semantic_operands
+        for src in chain(semantic_operands.source, semantic_operands.src_dst):
+            if 'register' in src:
+                reads.add(self.parser.get_reg_id(src.register))
+            if 'flag' in src and flag_dependencies:
+                reads.add(('flag', src.flag.name))
+            if 'memory' in src:
+                reads.add(self.parser.get_reg_id(src.memory.base))
+                reads.add(self.parser.get_reg_id(src.memory.index))
+                if 'pre_indexed' in src.memory or 'post_indexed' in src.memory:
+                    kills.add(self.parser.get_reg_id(src.memory.base))
+        for dst in chain(semantic_operands.destination, semantic_operands.src_dst):
+            if 'register' in dst:
+                key = self.parser.get_reg_id(dst.register)
+                kills.add(key)
+                defs[key] = defs.get(key, False)
+            if 'flag' in dst and flag_dependencies:
+                kills.add(('flag', dst.flag.name))
+                defs[('flag', dst.flag.name)] = False
+            elif 'memory' in dst:
+                reads.add(self.parser.get_reg_id(dst.memory.base))
+                reads.add(self.parser.get_reg_id(dst.memory.index))
+                if 'pre_indexed' in dst.memory or 'post_indexed' in dst.memory:
+                    key = self.parser.get_reg_id(dst.memory.base)
+                    kills.add(key)
+                    defs[key] = True
+        reads.discard(None)
+        kills.discard(None)
+        defs.pop(None, None)
+        return reads, kills, defs
 
     def check_for_loopcarried_dep(self, kernel):
         """
         Try to find loop-carried dependencies in given kernel.
 
+        Dependencies crossing the loop boundary are edges with an iteration distance of 1, see
+        :func:`~KernelDG._find_loopcarried_dependents` for registers and
+        :func:`~osaca.semantics.memory_dependencies.find_store_dependents` for memory. For each of
+        their source instructions, the recurrence with maximum latency is the longest path in
+        the (acyclic) kernel graph from the target of the cross-iteration edge back to its source.
+
         :param kernel: Parsed asm kernel with assigned semantic information
         :type kernel: list
         :returns: `dict` -- dependency dictionary with all cyclic LCDs
         """
-        multiplier = len(kernel) + 1
-        # increase line number for second kernel loop
-        kernel_length = len(kernel)
-        first_line_no = kernel[0].line_number
-        kernel_copy = [AttrDict.convert_dict(d) for d in copy.deepcopy(kernel)]
-        tmp_kernel = kernel + kernel_copy
-        for i, instruction_form in enumerate(tmp_kernel[kernel_length:]):
-            tmp_kernel[i + kernel_length].line_number = instruction_form.line_number * multiplier
-        # get dependency graph
-        dg = self.create_DG(tmp_kernel)
-
-        # build cyclic loop-carried dependencies
-        loopcarried_deps = [
-            (node, list(nx.algorithms.simple_paths.all_simple_paths(dg, node, node * multiplier)))
-            for node in dg.nodes
-            if node < first_line_no * multiplier and node == int(node)
-        ]
-        # filter others and create graph
-        loopcarried_deps = list(
-            chain.from_iterable(
-                [list(product([dep_chain[0]], dep_chain[1])) for dep_chain in loopcarried_deps]
+        line_numbers = [instr.line_number for instr in kernel]
+        graph = self._get_recurrence_graph(kernel)
+        # targets of the loop-carried edges of each source in order of the next iteration,
+        # mapped to the additional latency of store-to-load forwarding
+        loopcarried_edges = {}
+        writeback = set(n for n in line_numbers if graph.has_node(n + 0.2))
+        for writer, readers in enumerate(self._find_loopcarried_dependents(kernel)):
+            for reader in readers:
+                for source, target in self._get_recurrence_edges(
+                    writeback, line_numbers[writer], line_numbers[reader]
+                ):
+                    loopcarried_edges.setdefault(source, {})[target] = 0
+        store_dependents = find_store_dependents(kernel, self.parser, loopcarried=True)
+        for store, loads in enumerate(store_dependents):
+            for load in [kernel[j] for j in loads]:
+                targets = loopcarried_edges.setdefault(line_numbers[store], {})
+                target = self._get_load_node(load)
+                penalty = self._get_store_forwarding_penalty(load)
+                targets[target] = max(penalty, targets.get(target, penalty))
+        # nodes in topological order, i.e., in program order with loads before and base register
+        # updates after their instruction
+        nodes = []
+        for line_number in line_numbers:
+            if graph.has_node(line_number + 0.1):
+                nodes.append(line_number + 0.1)
+            nodes.append(line_number)
+            if graph.has_node(line_number + 0.2):
+                nodes.append(line_number + 0.2)
+
+        # find longest recurrence for each source of a loop-carried edge
+        longest_paths = {}
+        loopcarried_deps = {}
+        penalties = {}
+        for line_number in line_numbers:
+            chains = []
+            # recurrences of the base register update of a store end in the update
+            for root in [line_number, line_number + 0.2]:
+                for target, penalty in loopcarried_edges.get(root, {}).items():
+                    if target not in longest_paths:
+                        longest_paths[target] = self._get_longest_paths_from(
+                            graph, target, nodes
+                        )
+                    distances, predecessors = longest_paths[target]
+                    if root in distances:
+                        path = [
+                            int(n) if self._is_writeback_node(n) else n
+                            for n in self._get_path(predecessors, root)
+                        ]
+                        chains.append((distances[root] + penalty, path, penalty))
+            if chains:
+                # longest chain, first one found if ambiguous
+                _, loopcarried_deps[line_number], penalties[line_number] = max(
+                    chains, key=lambda c: c[0]
+                )
+
+        # filter chains already contained in a chain of another root
+        chains_by_node = {}
+        for root, dep_chain in loopcarried_deps.items():
+            for n in dep_chain:
+                chains_by_node.setdefault(n, []).append(root)
+        loopcarried_deps = {
+            root: dep_chain
+            for root, dep_chain in loopcarried_deps.items()
+            if not any(
+                set(dep_chain).issubset(loopcarried_deps[other_root])
+                for other_root in chains_by_node[root]
+                if other_root != root
             )
-        )
-        # adjust line numbers, filter duplicates
-        # and add reference to kernel again
+        }
+
+        # add reference to kernel again
         loopcarried_deps_dict = {}
-        tmp_list = []
-        for i, dep in enumerate(loopcarried_deps):
-            nodes = [int(n / multiplier) for n in dep[1] if n >= first_line_no * multiplier]
-            loopcarried_deps[i] = (dep[0], nodes)
-        for dep in loopcarried_deps:
-            is_subset = False
-            for other_dep in [x for x in loopcarried_deps if x[0] != dep[0]]:
-                if set(dep[1]).issubset(set(other_dep[1])) and dep[0] in other_dep[1]:
-                    is_subset = True
-            if not is_subset:
-                tmp_list.append(dep)
-        loopcarried_deps = tmp_list
-        for dep in loopcarried_deps:
+        for dep in loopcarried_deps.items():
             nodes = []
             for n in dep[1]:
                 self._get_node_by_lineno(int(n))['latency_lcd'] = 0
-            for n in dep[1]:
+            for k, n in enumerate(dep[1]):
                 node = self._get_node_by_lineno(int(n))
                 if int(n) != n and int(n) in dep[1]:
+                    # load is part of the instruction form
                     node['latency_lcd'] += node['latency'] - node['latency_wo_load']
-                else:
-                    node['latency_lcd'] += node['latency_wo_load']
+                    continue
+                node['latency_lcd'] += node['latency_wo_load']
+                # add latency of store-to-load forwarding exceeding the load latency
+                node['latency_lcd'] += (
+                    self._get_forwarding_penalty(n, dep[1][k + 1])
+                    if k + 1 < len(dep[1])
+                    else penalties[dep[0]]
+                )
                 nodes.append(node)
             loopcarried_deps_dict[dep[0]] = {
                 'root': self._get_node_by_lineno(dep[0]),
@@ -124,43 +434,171 @@ class KernelDG(nx.DiGraph):
 
         return loopcarried_deps_dict
 
+    def _get_longest_paths_from(self, graph, source, nodes):
+        """
+        Compute the longest paths from ``source`` to all reachable instructions of the kernel.
+
+        :param graph: dependency graph of the kernel
+        :type graph: :class:`~osaca.semantics.array_dag.ArrayDAG`
+        :param source: ID of the start node
+        :param list nodes: node IDs of the kernel in topological order
+        :returns: `tuple` -- dicts with the path latency and the predecessor of each node
+        """
+        return graph.longest_paths_from(source, nodes[nodes.index(source):])
+
+    def _get_recurrence_graph(self, kernel):
+        """
+        Return :attr:`graph` as used to find loop-carried dependencies: The base register update
+        of each store with pre- or post-indexed address is a separate node (line number + 0.2),
+        which only depends on the writers of the base register. Readers of the updated register
+        depend on this node, loads of the stored data on the store.
+        """
+        writeback = set(
+            instr['line_number'] for instr in kernel if self._get_writeback_register(instr)
+        )
+        if not writeback:
+            return self.graph
+        memory_edges = set()
+        for store, loads in enumerate(find_store_dependents(kernel, self.parser)):
+            for load in [kernel[j] for j in loads]:
+                memory_edges.add((kernel[store]['line_number'], self._get_load_node(load)))
+        node_ids = list(self.graph.node_ids)
+        instruction_forms = list(self.graph.instruction_forms)
+        for line_number in sorted(writeback):
+            node_ids.append(line_number + 0.2)
+            instruction_forms.append(self._get_node_by_lineno(line_number))
+        index = {node_id: n for n, node_id in enumerate(node_ids)}
+        edges = []
+        for source, target, latency in self.graph.edges(data=True):
+            for u, v in self._get_recurrence_edges(writeback, source, target, memory_edges):
+                edges.append((index[u], index[v], latency))
+        return ArrayDAG(node_ids, instruction_forms, edges)
+
+    def _get_recurrence_edges(self, writeback, source, target, memory_edges=()):
+        """
+        Return the edges of :func:`~KernelDG._get_recurrence_graph` for a dependency of node
+        ``target`` on node ``source``.
+
+        :param set writeback: line numbers of stores with pre- or post-indexed address
+        :param set memory_edges: ``(source, target)`` node IDs of memory dependencies
+        :returns: `list` -- ``(source, target)`` node IDs of the edges
+        """
+        sources = [source]
+        if source in writeback:
+            # readers of the updated base register depend on the update
+            sources = [source] if (source, target) in memory_edges else []
+            if (source, target) not in memory_edges or self.is_read(
+                self._get_writeback_register(self._get_node_by_lineno(source)),
+                self._get_node_by_lineno(int(target)),
+            ):
+                sources.append(source + 0.2)
+        edges = [(edge_source, target) for edge_source in sources]
+        if target in writeback:
+            # only writers of the base register, neither loads nor stored data
+            base = self._get_writeback_register(self._get_node_by_lineno(target))
+            edges += [
+                (edge_source, target + 0.2)
+                for edge_source in sources
+                if edge_source not in writeback
+                and (edge_source == int(edge_source) or self._is_writeback_node(edge_source))
+                and self.is_written(base, self._get_node_by_lineno(int(edge_source)))
+            ]
+        return edges
+
+    def _get_writeback_register(self, instruction_form):
+        """
+        Return base register of ``instruction_form`` if it is a store with pre- or post-indexed
+        address, otherwise `None`.
+        """
+        if instruction_form.semantic_operands is None:
+            return None
+        for dst in chain(
+            instruction_form.semantic_operands.destination,
+            instruction_form.semantic_operands.src_dst,
+        ):
+            if 'memory' in dst and ('pre_indexed' in dst.memory or 'post_indexed' in dst.memory):
+                return dst.memory.base
+        return None
+
+    def _is_writeback_node(self, node_id):
+        """Return `True` if ``node_id`` is the base register update of a store."""
+        return node_id != int(node_id) and node_id == int(node_id) + 0.2
+
+    def _get_path(self, predecessors, node):
+        """Return path to ``node`` given by ``predecessors`` as list of nodes"""
+        path = []
+        while node is not None:
+            path.append(node)
+            node = predecessors[node]
+        return path[::-1]
+
     def _get_node_by_lineno(self, lineno):
         """Return instruction form with line number ``lineno`` from  kernel"""
-        return [instr for instr in self.kernel if instr.line_number == lineno][0]
+        return self._nodes_by_lineno[lineno]
 
-    def get_critical_path(self):
-        """Find and return critical path after the creation of a directed graph."""
-        if nx.algorithms.dag.is_directed_acyclic_graph(self.dg):
-            longest_path = nx.algorithms.dag.dag_longest_path(self.dg, weight='latency')
-            for line_number in longest_path:
-                self._get_node_by_lineno(int(line_number))['latency_cp'] = 0
-            # add LD latency to instruction
-            for line_number in longest_path:
-                node = self._get_node_by_lineno(int(line_number))
-                if line_number != int(line_number) and int(line_number) in longest_path:
-                    node['latency_cp'] += self.dg.edges[(line_number, int(line_number))]['latency']
-                elif (
-                    line_number == int(line_number)
-                    and 'mem_dep' in node
-                    and self.dg.has_edge(node['mem_dep']['line_number'], line_number)
-                ):
-                    node['latency_cp'] += node['latency']
-                else:
-                    node['latency_cp'] += (
-                        node['latency']
-                        if 'latency_wo_load' not in node
-                        else node['latency_wo_load']
+    def _find_critical_path(self):
+        """Find critical path in the graph and assign the CP latency of its instruction forms."""
+        if not self.graph.is_acyclic():
+            # split to DAG
+            raise NotImplementedError('Kernel is cyclic.')
+        longest_path = self.graph.longest_path()
+        path_nodes = set(longest_path)
+        for line_number in longest_path:
+            self._get_node_by_lineno(int(line_number))['latency_cp'] = 0
+        # add LD latency to instruction
+        for k, line_number in enumerate(longest_path):
+            node = self._get_node_by_lineno(int(line_number))
+            if line_number != int(line_number) and int(line_number) in path_nodes:
+                node['latency_cp'] += self.graph.get_latency(line_number, int(line_number))
+            elif (
+                line_number == int(line_number)
+                and 'mem_dep' in node
+                and self.graph.has_edge(node['mem_dep']['line_number'], line_number)
+            ):
+                node['latency_cp'] += node['latency']
+            else:
+                node['latency_cp'] += (
+                    node['latency'] if 'latency_wo_load' not in node else node['latency_wo_load']
+                )
+                if k + 1 < len(longest_path):
+                    # store-to-load forwarding exceeding the load latency
+                    node['latency_cp'] += self._get_forwarding_penalty(
+                        line_number, longest_path[k + 1]
                     )
-            return [x for x in self.kernel if x['line_number'] in longest_path]
-        else:
+        return [x for x in self.kernel if x['line_number'] in path_nodes]
+
+    @property
+    def critical_path(self):
+        """Instruction forms on the critical path, found only once."""
+        self._sync_graph()
+        if self._critical_path is None:
+            self._critical_path = self._find_critical_path()
+        return self._critical_path
+
+    @property
+    def critical_path_latency(self):
+        """Sum of the CP latencies of all instruction forms on the critical path."""
+        return sum(x['latency_cp'] for x in self.critical_path)
+
+    @property
+    def loopcarried_latencies(self):
+        """Sum of the LCD latencies of each LCD, keyed by the line number of its root."""
+        self._sync_graph()
+        if not self.graph.is_acyclic():
             # split to DAG
             raise NotImplementedError('Kernel is cyclic.')
+        return self._loopcarried_latencies
+
+    def get_critical_path(self):
+        """Return critical path after the creation of a directed graph."""
+        return self.critical_path
 
     def get_loopcarried_dependencies(self):
         """
         Return all LCDs from kernel (after :func:`~KernelDG.check_for_loopcarried_dep` was run)
         """
-        if nx.algorithms.dag.is_directed_acyclic_graph(self.dg):
+        self._sync_graph()
+        if self.graph.is_acyclic():
             return self.loopcarried_deps
         else:
             # split to DAG
@@ -241,8 +679,9 @@ class KernelDG(nx.DiGraph):
         if not instr_form and not line_number:
             raise ValueError('Either instruction form or line_number required.')
         line_number = line_number if line_number else instr_form['line_number']
-        if self.dg.has_node(line_number):
-            return self.dg.successors(line_number)
+        self._sync_graph()
+        if self.graph.has_node(line_number):
+            return self.graph.successors(line_number)
         return iter([])
 
     def is_read(self, register, instruction_form):
@@ -315,8 +754,9 @@ class KernelDG(nx.DiGraph):
         :param filepath: path to write DOT file, defaults to None.
         :type filepath: str, optional
         """
-        graph = copy.deepcopy(self.dg)
         cp = self.get_critical_path()
+        # highlight on a copy to keep the dependency graph unchanged
+        graph = self.dg.copy()
         cp_line_numbers = [x['line_number'] for x in cp]
         lcd = self.get_loopcarried_dependencies()
         lcd_line_numbers = {}
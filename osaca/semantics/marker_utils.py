@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
+import re
 from collections import OrderedDict
 
-from osaca.parser import ParserAArch64, ParserX86ATT, get_parser
+from osaca.parser import LazyParsedCode, ParserAArch64, ParserX86ATT, get_parser
 
 COMMENT_MARKER = {'start': 'OSACA-BEGIN', 'end': 'OSACA-END'}
 
@@ -131,7 +132,8 @@ def find_marked_section(
     # TODO match to instructions returned by get_marker
     index_start = -1
     index_end = -1
-    for i, line in enumerate(lines):
+    for i in _get_marker_candidates(lines, mov_vals, comments):
+        line = lines[i]
         try:
             if line.instruction is None and comments is not None and line.comment is not None:
                 if comments['start'] == line.comment:
@@ -171,6 +173,21 @@ def find_marked_section(
     return index_start, index_end
 
 
+def _get_marker_candidates(lines, mov_vals, comments):
+    """
+    Return indices of all lines possibly containing a marker. For lazily parsed code, these are
+    only the lines containing one of ``mov_vals`` (decimal or hexadecimal) or a comment marker,
+    so all other lines do not need to be parsed.
+    """
+    if not isinstance(lines, LazyParsedCode):
+        return range(len(lines))
+    patterns = [str(val) for val in mov_vals] + ['0x0*{:x}'.format(val) for val in mov_vals]
+    if comments is not None:
+        patterns += [re.escape(comment) for comment in comments.values()]
+    candidate = re.compile('|'.join(patterns), re.IGNORECASE)
+    return [i for i, line in enumerate(lines.raw_lines) if candidate.search(line)]
+
+
 def match_bytes(lines, index, byte_list):
     """Match bytes directives of markers"""
     # either all bytes are in one line or in separate ones
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Detection of memory-carried dependencies between stores and loads of a kernel"""
+from itertools import chain
+
+from osaca.semantics.isa_semantics import INSTR_FLAGS
+
+# instructions with memory operands, which do not access memory
+NON_ACCESSING_INSTRUCTIONS = ('lea', 'prefetch', 'prfm', 'prfum')
+
+
+def find_store_dependents(kernel, parser, loopcarried=False):
+    """
+    Find loads reading the data of a previous store to the same memory location.
+
+    The address of each memory operand is expressed as unknown register values plus a constant
+    offset. Register values are tracked through constant increments (ADD, SUB, INC, DEC, LEA,
+    register MOV and pre- or post-indexed addressing), every other write to a register creates
+    a new unknown value. A load depends on a store if both addresses are identical or, if the
+    access widths are known, provably overlap. Loop-carried dependencies are found by analyzing
+    a second iteration of the kernel, so that offsets shifted by induction variables match.
+
+    :param list kernel: kernel with assigned semantic operands
+    :param parser: parser of the kernel
+    :type parser: :class:`~osaca.parser.BaseParser`
+    :param loopcarried: return dependent loads of the next instead of the same iteration,
+        defaults to `False`
+    :type loopcarried: boolean, optional
+    :returns: `list` -- list of indices of dependent loads for each instruction form
+    """
+    dependents = [[] for _ in kernel]
+    if not any('flags' in instr and INSTR_FLAGS.HAS_ST in instr['flags'] for instr in kernel):
+        return dependents
+    # value of each register as tuple of unknown value and constant offset
+    values = {}
+    # stores as lists of (offset, width, index, iteration) per address without offset
+    stores = {}
+    load_iteration = 1 if loopcarried else 0
+    for iteration in range(load_iteration + 1):
+        for i, instruction_form in enumerate(kernel):
+            if instruction_form.instruction is None or instruction_form.semantic_operands is None:
+                continue
+            loads, writes = _get_memory_operands(instruction_form)
+            width = _get_access_width(instruction_form, parser) if loads or writes else None
+            for memory in loads if iteration == load_iteration else []:
+                address = _get_address(memory, parser, values)
+                if address is None:
+                    continue
+                for store, store_iteration in _find_stores(stores, address, width):
+                    if store_iteration == 0 and i not in dependents[store]:
+                        dependents[store].append(i)
+            for memory in writes:
+                address = _get_address(memory, parser, values)
+                if address is not None:
+                    stores.setdefault(address[0], []).append((address[1], width, i, iteration))
+            _update_register_values(
+                instruction_form, parser, values, (iteration, i), loads + writes
+            )
+    return dependents
+
+
+def _get_memory_operands(instruction_form):
+    """Return memory operands loaded from and stored to by ``instruction_form``."""
+    if instruction_form.instruction.lower().startswith(NON_ACCESSING_INSTRUCTIONS):
+        return [], []
+    flags = instruction_form['flags'] if 'flags' in instruction_form else []
+    operands = instruction_form.semantic_operands
+    loads = []
+    if INSTR_FLAGS.HAS_LD in flags:
+        loads = [op.memory for op in chain(operands.source, operands.src_dst) if 'memory' in op]
+    stores = []
+    if INSTR_FLAGS.HAS_ST in flags:
+        stores = [
+            op.memory for op in chain(operands.destination, operands.src_dst) if 'memory' in op
+        ]
+    return loads, stores
+
+
+def _get_access_width(instruction_form, parser):
+    """Return number of bytes accessed by ``instruction_form`` or `None` if unknown."""
+    mnemonic = instruction_form.instruction.lower()
+    if (
+        mnemonic.startswith(('movz', 'movs'))
+        or (mnemonic.startswith(('ld', 'st')) and mnemonic.endswith(('b', 'h', 'sw')))
+        or mnemonic in ('ld1r', 'ld2r', 'ld3r', 'ld4r')
+    ):
+        # zero- or sign-extending, partial or replicating access
+        return None
+    widths = [
+        parser.get_access_width(op['register'])
+        for op in instruction_form.operands
+        if 'register' in op
+    ]
+    if not widths or None in widths:
+        return None
+    return sum(widths)
+
+
+def _get_address(memory, parser, values):
+    """
+    Return address of memory operand as tuple of a key, which identifies the address without
+    constant offset, and the constant offset or `None` if the address is unknown.
+    """
+    if memory.get('segment_extension') is not None:
+        return None
+    offset = 0
+    symbol = None
+    if memory.get('offset') is not None:
+        offset = _get_immediate_value(memory['offset'])
+        if offset is None:
+            if 'identifier' not in memory['offset']:
+                return None
+            identifier = memory['offset']['identifier']
+            symbol = (identifier.get('name'), identifier.get('relocation'))
+            offset = 0
+    base, base_offset = _get_register_value(memory.get('base'), parser, values)
+    index, index_offset = _get_register_value(memory.get('index'), parser, values)
+    scale = memory.get('scale', 1) if index is not None else None
+    if index is not None:
+        offset += scale * index_offset
+    return (base, index, scale, symbol), offset + base_offset
+
+
+def _find_stores(stores, address, width):
+    """
+    Return stores accessing the same memory as a load of ``address`` and ``width`` as list of
+    store index and iteration, from the last store up to the first one covering the load.
+    """
+    key, offset = address
+    found = []
+    for store_offset, store_width, index, iteration in reversed(stores.get(key, [])):
+        if width is None or store_width is None:
+            # only identical addresses are known to overlap
+            overlaps = covers = store_offset == offset
+        else:
+            overlaps = store_offset < offset + width and offset < store_offset + store_width
+            covers = store_offset <= offset and offset + width <= store_offset + store_width
+        if overlaps:
+            found.append((index, iteration))
+        if covers:
+            break
+    return found
+
+
+def _get_register_key(register, parser):
+    """Return key of ``register`` shared with all registers depending on it."""
+    reg_id = parser.get_reg_id(register)
+    return reg_id if reg_id is not None else parser.get_full_reg_name(register)
+
+
+def _get_register_value(register, parser, values):
+    """Return value of ``register`` as tuple of unknown value and constant offset."""
+    if register is None:
+        return None, 0
+    key = _get_register_key(register, parser)
+    # initial values are identified by their register
+    return values.get(key, (key, 0))
+
+
+def _get_immediate_value(immediate):
+    """Return integer value of ``immediate`` or `None` if it is no integer constant."""
+    value = immediate.get('value') if 'value' in immediate else None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        for base in [0, 10]:
+            try:
+                return int(value, base)
+            except ValueError:
+                pass
+    return None
+
+
+def _update_register_values(instruction_form, parser, values, definition, memory_operands):
+    """
+    Update ``values`` of all registers written by ``instruction_form``.
+
+    :param tuple definition: identifier of the instruction form, used as new unknown value
+    :param list memory_operands: memory operands accessed by the instruction form
+    """
+    new_values = {}
+    # base register update of pre- and post-indexed addressing
+    for memory in memory_operands:
+        if memory.get('pre_indexed') or memory.get('post_indexed'):
+            key = _get_register_key(memory['base'], parser)
+            value, offset = _get_register_value(memory['base'], parser, values)
+            if memory.get('pre_indexed'):
+                increment = _get_immediate_value(memory['offset']) if memory.get('offset') else 0
+            else:
+                increment = _get_immediate_value(memory['post_indexed'])
+            if increment is not None:
+                new_values[key] = (value, offset + increment)
+    increment = _get_constant_increment(instruction_form, parser, values)
+    if increment is not None:
+        new_values[increment[0]] = increment[1]
+    operands = instruction_form.semantic_operands
+    for op in chain(operands.destination, operands.src_dst):
+        if 'register' in op and 'name' in op['register']:
+            key = _get_register_key(op['register'], parser)
+            new_values.setdefault(key, (definition + (key,), 0))
+    values.update(new_values)
+
+
+def _get_constant_increment(instruction_form, parser, values):
+    """
+    Return key and new value of the register written by ``instruction_form`` if it adds a
+    constant to a register value, otherwise `None`.
+    """
+    mnemonic = instruction_form.instruction.lower()
+    operands = instruction_form.operands
+    if parser.isa == 'x86':
+        if mnemonic[-1:] in 'bwlq' and mnemonic[:-1] in ['add', 'sub', 'inc', 'dec', 'lea', 'mov']:
+            mnemonic = mnemonic[:-1]
+        if len(operands) == 0 or 'register' not in operands[-1]:
+            return None
+        destination = operands[-1]['register']
+        if mnemonic in ['add', 'sub'] and len(operands) == 2 and 'immediate' in operands[0]:
+            source, increment = destination, _get_immediate_value(operands[0]['immediate'])
+        elif mnemonic in ['inc', 'dec'] and len(operands) == 1:
+            source, increment = destination, 1
+        elif mnemonic == 'mov' and len(operands) == 2 and 'register' in operands[0]:
+            source, increment = operands[0]['register'], 0
+        elif mnemonic == 'lea' and len(operands) == 2 and 'memory' in operands[0]:
+            address = _get_address(operands[0]['memory'], parser, values)
+            if address is None or address[0][1:] != (None, None, None):
+                return None
+            return _get_register_key(destination, parser), (address[0][0], address[1])
+        else:
+            return None
+        if mnemonic in ['sub', 'dec'] and increment is not None:
+            increment = -increment
+    elif parser.isa == 'aarch64':
+        if len(operands) == 0 or 'register' not in operands[0]:
+            return None
+        destination = operands[0]['register']
+        if (
+            mnemonic in ['add', 'adds', 'sub', 'subs']
+            and len(operands) == 3
+            and 'register' in operands[1]
+            and 'immediate' in operands[2]
+        ):
+            source = operands[1]['register']
+            increment = _get_immediate_value(operands[2]['immediate'])
+            if mnemonic.startswith('sub') and increment is not None:
+                increment = -increment
+        elif mnemonic == 'mov' and len(operands) == 2 and 'register' in operands[1]:
+            source, increment = operands[1]['register'], 0
+        else:
+            return None
+    else:
+        return None
+    if increment is None or 'name' not in destination or 'name' not in source:
+        return None
+    value, offset = _get_register_value(source, parser, values)
+    return _get_register_key(destination, parser), (value, offset + increment)
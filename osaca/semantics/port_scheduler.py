@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Exact port scheduling of micro-ops by means of a lexicographic min-max flow"""
+from collections import defaultdict, deque
+from fractions import Fraction
+
+
+def schedule_uops(uops, port_number, base_load=None):
+    """
+    Distribute uops to their ports such that the maximum port load is minimal.
+
+    The port assignment is solved as a sequence of max-flow problems on the bipartite
+    uop/port graph. Uops with the same set of ports are merged into one group first. The
+    bottleneck level is found by Newton iterations on the min-cut density, the ports forming
+    the bottleneck are fixed and the remaining ports are balanced the same way. All arithmetic
+    is done with fractions, so the result is exact.
+
+    :param list uops: list of ``(cycles, ports)`` tuples with ``ports`` being port indices
+    :param int port_number: number of ports of the machine model
+    :param base_load: fixed, not schedulable load per port, defaults to `None`
+    :type base_load: list, optional
+    :returns: `list` -- one ``{port_index: cycles}`` dict per uop in the order of ``uops``
+    """
+    base = [Fraction(0)] * port_number
+    if base_load is not None:
+        base = [max(Fraction(b), Fraction(0)) for b in base_load]
+    groups = defaultdict(Fraction)
+    for cycles, ports in uops:
+        if len(ports) > 0:
+            groups[frozenset(ports)] += Fraction(cycles)
+    group_flows = _balance_groups({g: load for g, load in groups.items() if load > 0}, base)
+
+    shares = []
+    for cycles, ports in uops:
+        group = frozenset(ports)
+        if group not in group_flows:
+            # zero-cycle uop, nothing to distribute
+            shares.append({p: 0.0 for p in group})
+            continue
+        factor = Fraction(cycles) / groups[group]
+        shares.append({p: float(group_flows[group][p] * factor) for p in group})
+    return shares
+
+
+def _balance_groups(groups, base):
+    """Return lexicographically min-max flow of all uop ``groups`` as ``{group: {port: load}}``"""
+    group_flows = {g: defaultdict(Fraction) for g in groups}
+    # current (shrinking) port sets of all unscheduled groups
+    remaining = {g: set(g) for g in groups}
+    while remaining:
+        active = set().union(*remaining.values())
+        level = (
+            sum(groups[g] for g in remaining) + sum(base[p] for p in active)
+        ) / len(active)
+        while True:
+            flow, tight_ports, tight_groups, denser_level = _solve_level(
+                groups, remaining, base, active, level
+            )
+            if denser_level is None:
+                break
+            level = denser_level
+        if not tight_groups and not tight_ports:
+            # cannot happen with exact arithmetic, but guarantee termination anyway
+            tight_ports, tight_groups = active, set(remaining)
+        for g in tight_groups:
+            for p in remaining[g]:
+                group_flows[g][p] += flow.get((g, p), Fraction(0))
+            del remaining[g]
+        # the other groups do not use the bottleneck ports anymore
+        for g in remaining:
+            remaining[g] -= tight_ports
+    return group_flows
+
+
+def _solve_level(groups, remaining, base, active, level):
+    """
+    Check if all ``remaining`` groups fit into the ``active`` ports without exceeding ``level``.
+
+    :returns: `tuple` -- flow per ``(group, port)``, set of tight ports, set of tight groups and
+        `None` if feasible, otherwise the density of the violating port set as last element
+    """
+    total = sum(groups[g] for g in remaining)
+    infinity = total + 1
+    source, sink = ('s',), ('t',)
+    capacity = defaultdict(Fraction)
+    neighbors = defaultdict(set)
+
+    def add_edge(u, v, cap):
+        capacity[(u, v)] += cap
+        neighbors[u].add(v)
+        neighbors[v].add(u)
+
+    for g in remaining:
+        add_edge(source, ('g', g), groups[g])
+        for p in remaining[g]:
+            add_edge(('g', g), ('p', p), infinity)
+    for p in active:
+        add_edge(('p', p), sink, max(level - base[p], Fraction(0)))
+
+    flow = defaultdict(Fraction)
+
+    def residual(u, v):
+        return capacity[(u, v)] - flow[(u, v)] + flow[(v, u)]
+
+    # Edmonds-Karp
+    flow_value = Fraction(0)
+    while flow_value < total:
+        parent = {source: None}
+        queue = deque([source])
+        while queue and sink not in parent:
+            u = queue.popleft()
+            for v in neighbors[u]:
+                if v not in parent and residual(u, v) > 0:
+                    parent[v] = u
+                    queue.append(v)
+        if sink not in parent:
+            break
+        path = []
+        v = sink
+        while parent[v] is not None:
+            path.append((parent[v], v))
+            v = parent[v]
+        augment = min(residual(u, v) for u, v in path)
+        for u, v in path:
+            # cancel reverse flow first
+            cancel = min(flow[(v, u)], augment)
+            flow[(v, u)] -= cancel
+            flow[(u, v)] += augment - cancel
+        flow_value += augment
+
+    if flow_value < total:
+        # min cut violates level, Newton step to the density of the source side port set
+        reachable = _reachable(source, neighbors, residual)
+        cut_ports = [n[1] for n in reachable if n[0] == 'p']
+        cut_load = sum(groups[n[1]] for n in reachable if n[0] == 'g')
+        cut_load += sum(base[p] for p in cut_ports)
+        return None, None, None, cut_load / len(cut_ports)
+
+    # feasible: nodes unable to reach the sink in the residual graph form the bottleneck
+    reaching_sink = _reachable(sink, neighbors, lambda u, v: residual(v, u))
+    tight_ports = {p for p in active if ('p', p) not in reaching_sink}
+    tight_groups = {g for g in remaining if ('g', g) not in reaching_sink}
+    group_flow = {
+        (g, p): flow[(('g', g), ('p', p))] for g in remaining for p in remaining[g]
+    }
+    return group_flow, tight_ports, tight_groups, None
+
+
+def _reachable(start, neighbors, residual):
+    """Return all nodes reachable from ``start`` via edges with positive ``residual``"""
+    visited = {start}
+    queue = deque([start])
+    while queue:
+        u = queue.popleft()
+        for v in neighbors[u]:
+            if v not in visited and residual(u, v) > 0:
+                visited.add(v)
+                queue.append(v)
+    return visited
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Detection of unrolled loops and their canonical iteration"""
+from collections import Counter
+from math import gcd
+
+from osaca.semantics.marker_utils import find_basic_loop_bodies
+from osaca.semantics.memory_dependencies import (_get_access_width, _get_address,
+                                                 _get_memory_operands, _get_register_key,
+                                                 _update_register_values)
+
+# mnemonics comparing the loop counter before the conditional branch
+COMPARE_INSTRUCTIONS = {
+    'x86': ('cmp', 'test'),
+    'aarch64': ('cmp', 'cmn', 'tst', 'subs', 'adds'),
+}
+ELEMENT_SIZES = {'b': 1, 'h': 2, 's': 4, 'd': 8}
+
+
+def find_unroll_info(kernel, parser):
+    """
+    Infer the unroll factor of the innermost loop in ``kernel``.
+
+    Pointer increments are found by following the registers of all memory addresses through one
+    iteration of the loop body, see :func:`~osaca.semantics.find_basic_loop_bodies`. The most
+    common increment is the number of bytes processed per assembly iteration. The element size
+    is taken from the scale of an incremented index register, from the data type of the
+    instructions or, if unknown, from the increment of a loop counter compared before the
+    branch. If neither is known, the unrolled copies of the loop body are assumed to process
+    one element each.
+
+    :param list kernel: kernel with assigned semantic operands
+    :param parser: parser of the kernel
+    :type parser: :class:`~osaca.parser.BaseParser`
+    :returns: `dict` with the loop ``label``, the ``unroll_factor`` (source-level iterations
+        per assembly iteration), the ``stride`` (bytes per source-level iteration), the
+        ``pointer_increment`` (bytes per assembly iteration), the number of unrolled ``copies``
+        of the loop body, the loop ``counter`` register and the line numbers of the loop
+        ``control`` instruction forms, which are executed once per assembly iteration, or
+        `None` if there is no loop with pointer increments
+    """
+    loop = _analyze_loop(kernel, parser)
+    if loop is None:
+        return None
+    return {
+        'label': loop['label'],
+        'unroll_factor': loop['unroll_factor'],
+        'stride': loop['pointer_increment'] // loop['unroll_factor'],
+        'pointer_increment': loop['pointer_increment'],
+        'copies': loop['copies'],
+        'counter': loop['counter'],
+        'control': [loop['body'][i]['line_number'] for i in sorted(loop['control'])],
+    }
+
+
+def get_canonical_iteration(kernel, parser):
+    """
+    Return one canonical iteration of an unrolled loop, i.e., the instruction forms of one
+    unrolled copy together with the loop control. Every other line of ``kernel`` is kept.
+
+    The copies are told apart by the offsets of their memory accesses. Instruction forms
+    connected via registers, except pointers and counters, belong to the same copy. If the
+    copies share data, e.g., loads reused by stencils or a single accumulator, or more than one
+    copy increments pointers, there is no canonical iteration.
+
+    :param list kernel: kernel with assigned semantic operands
+    :param parser: parser of the kernel
+    :type parser: :class:`~osaca.parser.BaseParser`
+    :returns: `list` of instruction forms, covering ``unroll_factor // copies`` source-level
+        iterations (see :func:`find_unroll_info`), or `None` if the copies cannot be separated
+    """
+    loop = _analyze_loop(kernel, parser)
+    if loop is None or loop['copies'] == 1 or loop['unroll_factor'] % loop['copies'] != 0:
+        return None
+    body = loop['body']
+    # group instruction forms connected via data registers
+    components = list(range(len(body)))
+
+    def find(i):
+        while components[i] != i:
+            components[i] = components[components[i]]
+            i = components[i]
+        return i
+
+    last_writer = {}
+    for _ in range(2):
+        # second pass for dependencies crossing the loop boundary
+        for i, instruction_form in enumerate(body):
+            if i in loop['control']:
+                continue
+            for key in _get_register_keys(instruction_form, parser, read=True):
+                if key not in loop['induction'] and key in last_writer:
+                    components[find(i)] = find(last_writer[key])
+            for key in _get_register_keys(instruction_form, parser, read=False):
+                last_writer[key] = i
+    copies = {}
+    for i, copy in loop['copy_of_access'].items():
+        copies.setdefault(find(i), set()).add(copy)
+    if any(len(c) > 1 or max(c) >= loop['copies'] for c in copies.values()):
+        # copies share data
+        return None
+    counts = Counter(
+        min(copies[find(i)])
+        for i in range(len(body))
+        if i not in loop['control'] and find(i) in copies
+    )
+    if sorted(counts) != list(range(loop['copies'])):
+        return None
+    # first copy with the most common number of instruction forms, e.g., not the first copy
+    # if only the others need address computations
+    sizes = Counter(counts.values())
+    candidates = [copy for copy in counts if sizes[counts[copy]] == max(sizes.values())]
+    # copies incrementing pointers, e.g., by post-indexed stores, keep the increments
+    updating = set(
+        min(copies[find(i)])
+        for i, instruction_form in enumerate(body)
+        if i not in loop['control']
+        and find(i) in copies
+        and any(
+            key in loop['induction']
+            for key in _get_register_keys(instruction_form, parser, read=False)
+        )
+    )
+    if len(updating) > 1 or not updating.issubset(candidates):
+        return None
+    canonical = updating.pop() if updating else min(candidates)
+    removed = set(
+        id(instruction_form)
+        for i, instruction_form in enumerate(body)
+        if i not in loop['control'] and min(copies.get(find(i), {canonical})) != canonical
+    )
+    return [instruction_form for instruction_form in kernel if id(instruction_form) not in removed]
+
+
+def _analyze_loop(kernel, parser):
+    """
+    Return loop body, induction registers, loop control instruction forms and unrolled copies
+    of the innermost loop in ``kernel`` or `None` if there is no loop with pointer increments.
+    """
+    loop_bodies = find_basic_loop_bodies(kernel)
+    if not loop_bodies:
+        return None
+    # the innermost loop ends last
+    label, lines = list(loop_bodies.items())[-1]
+    body = [
+        instruction_form
+        for instruction_form in lines
+        if instruction_form['instruction'] is not None
+        and instruction_form['semantic_operands'] is not None
+    ]
+    if not body:
+        return None
+
+    # follow register values through one iteration
+    values = {}
+    accesses = []
+    for i, instruction_form in enumerate(body):
+        loads, stores = _get_memory_operands(instruction_form)
+        for memory in loads + stores:
+            address = _get_address(memory, parser, values)
+            if address is not None:
+                accesses.append((i, address))
+        _update_register_values(instruction_form, parser, values, (0, i), loads + stores)
+    # initial values of registers are identified by their key
+    induction = {
+        key: offset for key, (value, offset) in values.items() if value == key and offset != 0
+    }
+
+    # increments of accessed streams of data per iteration
+    streams = {}
+    for i, ((base, index, scale, _), offset) in accesses:
+        increment = induction.get(base, 0) if base is not None else 0
+        if index is not None:
+            increment += scale * induction.get(index, 0)
+        if increment != 0:
+            streams.setdefault((base, index, scale), []).append((i, offset, abs(increment)))
+    if not streams:
+        return None
+    pointer_increment = Counter(
+        increment for accesses in streams.values() for _, _, increment in accesses
+    ).most_common(1)[0][0]
+    streams = {
+        key: accesses
+        for key, accesses in streams.items()
+        if accesses[0][2] == pointer_increment
+    }
+
+    # distance of unrolled copies as greatest common divisor of all offset differences
+    distance = pointer_increment
+    for accesses in streams.values():
+        for _, offset, _ in accesses:
+            distance = gcd(distance, offset - accesses[0][1])
+    copy_of_access = {}
+    for accesses in streams.values():
+        first_offset = min(offset for _, offset, _ in accesses)
+        for i, offset, _ in accesses:
+            copy_of_access[i] = max(copy_of_access.get(i, 0), (offset - first_offset) // distance)
+
+    counter = _get_loop_counter(body, parser, induction)
+    element_size = _get_element_size(body, parser, streams)
+    address_registers = set(key for stream in streams for key in stream[:2])
+    if element_size is None and counter is not None and counter[1] not in address_registers:
+        # counter of source-level iterations
+        unroll_factor = abs(induction[counter[1]])
+    else:
+        element_size = element_size or distance
+        unroll_factor = pointer_increment // element_size
+        if pointer_increment % element_size != 0:
+            return None
+    if unroll_factor == 0 or pointer_increment % unroll_factor != 0:
+        return None
+    control = set(
+        i
+        for i, instruction_form in enumerate(body)
+        if i == len(body) - 1
+        or (counter is not None and i == counter[0])
+        or (
+            not any(_get_memory_operands(instruction_form))
+            and any(
+                key in induction
+                for key in _get_register_keys(instruction_form, parser, read=False)
+            )
+        )
+    )
+    return {
+        'label': label,
+        'body': body,
+        'induction': induction,
+        'control': control,
+        'copy_of_access': copy_of_access,
+        'pointer_increment': pointer_increment,
+        'copies': pointer_increment // distance,
+        'unroll_factor': unroll_factor,
+        'counter': counter[2] if counter is not None else None,
+    }
+
+
+def _get_loop_counter(body, parser, induction):
+    """
+    Return index of the instruction form comparing the loop counter, the key and the name of
+    the counter register or `None` if not found.
+    """
+    if body[-1]['instruction'].lower().startswith(('cbz', 'cbnz', 'tbz', 'tbnz')):
+        # compare and branch
+        candidates = [(len(body) - 1, body[-1])]
+    else:
+        candidates = [
+            (i, instruction_form)
+            for i, instruction_form in enumerate(body[:-1])
+            if instruction_form['instruction']
+            .lower()
+            .startswith(COMPARE_INSTRUCTIONS.get(parser.isa, ()))
+        ][-1:]
+        if not candidates and len(body) > 1:
+            # flags set by the last arithmetic instruction, e.g., DEC
+            candidates = [(len(body) - 2, body[-2])]
+    for i, instruction_form in candidates:
+        for op in instruction_form['operands']:
+            if 'register' in op and 'name' in op['register']:
+                key = _get_register_key(op['register'], parser)
+                if key in induction:
+                    return i, key, parser.get_full_reg_name(op['register'])
+    return None
+
+
+def _get_element_size(body, parser, streams):
+    """Return most common size of the data elements processed in ``body`` or `None`."""
+    # index registers of arrays are scaled by the element size
+    scales = [scale for _, index, scale in streams if index is not None and scale > 1]
+    if scales:
+        return Counter(scales).most_common(1)[0][0]
+    sizes = []
+    for instruction_form in body:
+        mnemonic = instruction_form['instruction'].lower()
+        loads, stores = _get_memory_operands(instruction_form)
+        if parser.isa == 'x86':
+            if 'mov' in mnemonic and mnemonic.endswith('ps'):
+                # packed moves are used for any data type
+                continue
+            if mnemonic.endswith(('pd', 'sd')):
+                sizes.append(8)
+            elif mnemonic.endswith(('ps', 'ss')):
+                sizes.append(4)
+            elif loads or stores:
+                sizes.append(_get_access_width(instruction_form, parser))
+        elif parser.isa == 'aarch64':
+            for op in instruction_form['operands']:
+                register = op['register'] if 'register' in op else {}
+                if 'shape' in register:
+                    sizes.append(ELEMENT_SIZES.get(register['shape']))
+                elif register.get('prefix') in ELEMENT_SIZES:
+                    sizes.append(ELEMENT_SIZES[register['prefix']])
+                elif register.get('prefix') in ('w', 'x') and (loads or stores):
+                    sizes.append(parser.get_access_width(register))
+    sizes = [size for size in sizes if size is not None]
+    if not sizes:
+        return None
+    # smaller size if ambiguous
+    return max(Counter(sorted(sizes)).most_common(), key=lambda c: c[1])[0]
+
+
+def _get_register_keys(instruction_form, parser, read):
+    """Return keys of registers read or written by ``instruction_form``."""
+    operands = instruction_form['semantic_operands']
+    keys = []
+    for op in operands['source' if read else 'destination'] + operands['src_dst']:
+        if 'register' in op and 'name' in op['register']:
+            keys.append(_get_register_key(op['register'], parser))
+        elif 'memory' in op and read:
+            for register in [op['memory'].get('base'), op['memory'].get('index')]:
+                if register is not None and 'name' in register:
+                    keys.append(_get_register_key(register, parser))
+        elif 'memory' in op and (
+            op['memory'].get('pre_indexed') or op['memory'].get('post_indexed')
+        ):
+            keys.append(_get_register_key(op['memory']['base'], parser))
+    return keys
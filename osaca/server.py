@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Analysis daemon for OSACA. Keeps parsers and machine models in memory and answers analysis
+requests via HTTP on localhost or on a Unix socket.
+
+Endpoints:
+
+- ``POST /analyze`` with a JSON object containing the assembly ``code`` and optionally ``arch``,
+  ``lines``, ``fixed``, ``exact``, ``canonical``, ``ignore_unknown``, ``verbose`` and ``format``,
+  returns the analysis summary and the report of
+  :meth:`~osaca.frontend.Frontend.full_analysis` as JSON, or the result of
+  :meth:`~osaca.frontend.Frontend.analysis_result` for ``"format": "json"``
+- ``GET /metrics`` returns request counters and latency statistics
+- ``GET /health`` returns the server status
+"""
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from osaca import osaca
+from osaca.frontend import Frontend
+from osaca.parser import ParserAArch64, ParserX86ATT
+from osaca.result_cache import ResultCache
+from osaca.semantics import ISASemantics, MachineModel
+
+QUEUE_TIMEOUT = 30  # seconds a request waits for a free analysis slot
+LATENCY_WINDOW = 1000  # number of requests considered for latency statistics
+
+
+class ServerMetrics(object):
+    """Thread-safe request counters and latency statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    def start(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def finish(self, latency, error=False):
+        with self._lock:
+            self.in_flight -= 1
+            self._latencies.append(latency)
+            if error:
+                self.errors += 1
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def get(self):
+        """Return metrics as `dict`, latencies in milliseconds."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {
+                'requests': self.requests,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'in_flight': self.in_flight,
+            }
+        if latencies:
+            metrics['latency_ms'] = {
+                'count': len(latencies),
+                'mean': 1000 * sum(latencies) / len(latencies),
+                'p50': 1000 * latencies[(len(latencies) - 1) // 2],
+                'p95': 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+                'max': 1000 * latencies[-1],
+            }
+        return metrics
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Handler for analysis, metrics and health requests"""
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.server.metrics.get())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'version': osaca.get_version()})
+        else:
+            self._send_json(404, {'error': 'Unknown endpoint {!r}'.format(self.path)})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send_json(404, {'error': 'Unknown endpoint {!r}'.format(self.path)})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            args = get_request_args(request, cache_size=self.server.cache_size)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        if not self.server.slots.acquire(timeout=QUEUE_TIMEOUT):
+            self.server.metrics.reject()
+            self._send_json(503, {'error': 'Too many concurrent requests'})
+            return
+        self.server.metrics.start()
+        start = time.perf_counter()
+        try:
+            result = analyze(request['code'], request.get('file', ''), args)
+        except Exception as e:
+            self.server.metrics.finish(time.perf_counter() - start, error=True)
+            self._send_json(500, {'error': '{}: {}'.format(type(e).__name__, e)})
+            return
+        finally:
+            self.server.slots.release()
+        elapsed = time.perf_counter() - start
+        self.server.metrics.finish(elapsed)
+        result['elapsed_ms'] = 1000 * elapsed
+        self._send_json(200, result)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, content):
+        body = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class AnalysisHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server on localhost"""
+
+    daemon_threads = True
+
+
+class AnalysisUnixServer(socketserver.ThreadingUnixStreamServer):
+    """HTTP server on a Unix socket"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            # remove socket of previous run
+            os.remove(self.server_address)
+        super().server_bind()
+
+
+def get_request_args(request, cache_size=None):
+    """
+    Return analysis arguments for an analysis request.
+
+    :param dict request: decoded JSON request
+    :param cache_size: maximum size of the result cache in MB, `None` disables the cache,
+        defaults to `None`
+    :type cache_size: int, optional
+    :returns: :class:`~argparse.Namespace` with the same attributes as the CLI arguments
+    """
+    if not isinstance(request, dict) or not isinstance(request.get('code'), str):
+        raise ValueError('Request must be a JSON object with the assembly as "code"')
+    arch = request.get('arch')
+    if arch is not None and (
+        not isinstance(arch, str) or arch.upper() not in osaca.SUPPORTED_ARCHS
+    ):
+        raise ValueError('Microarchitecture {!r} not supported.'.format(arch))
+    if request.get('format', 'text') not in ['text', 'json']:
+        raise ValueError('"format" must be either "text" or "json"')
+    if request.get('fixed') and request.get('exact'):
+        raise ValueError('"exact" cannot be combined with "fixed"')
+    if request.get('lines') is not None:
+        if not isinstance(request['lines'], str):
+            raise ValueError('"lines" must be a string, e.g., "1,2,8-18"')
+        osaca.get_line_range(request['lines'])
+    verbose = request.get('verbose', 0)
+    if not isinstance(verbose, int) or isinstance(verbose, bool) or verbose < 0:
+        raise ValueError('"verbose" must be a non-negative integer')
+    return argparse.Namespace(
+        arch=arch,
+        lines=request.get('lines'),
+        fixed=bool(request.get('fixed', False)),
+        exact=bool(request.get('exact', False)),
+        canonical=bool(request.get('canonical', False)),
+        ignore_unknown=bool(request.get('ignore_unknown', False)),
+        verbose=int(verbose),
+        format=request.get('format', 'text'),
+        cache=cache_size is not None,
+        cache_size=cache_size,
+        dotpath=None,
+        batch=None,
+        jobs=1,
+    )
+
+
+def analyze(code, filename, args):
+    """
+    Analyze assembly code and return summary and report or the full analysis result.
+
+    :param str code: assembly code
+    :param str filename: name of kernel file for documentation
+    :param args: analysis arguments, see :func:`get_request_args`
+    :returns: `dict` with the analysis summary and the report
+    """
+    if args.format == 'json' and args.cache:
+        return osaca.get_cached_result(code, filename, args)
+    arch, kernel, kernel_graph, arch_warning, length_warning, unroll = osaca.analyze_kernel(
+        code, args
+    )
+    if args.format == 'json':
+        return Frontend(filename, arch=arch).analysis_result(
+            kernel,
+            kernel_graph,
+            arch_warning=arch_warning,
+            length_warning=length_warning,
+            unroll=unroll,
+        )
+    result = osaca.get_summary(arch, kernel, kernel_graph)
+    result['report'] = Frontend(filename, arch=arch).full_analysis(
+        kernel,
+        kernel_graph,
+        ignore_unknown=args.ignore_unknown,
+        arch_warning=arch_warning,
+        length_warning=length_warning,
+        verbose=args.verbose,
+        unroll=unroll,
+    )
+    return result
+
+
+def warm_up(archs):
+    """Construct parsers and load machine models of ``archs`` and their ISAs."""
+    ParserX86ATT()
+    ParserAArch64()
+    for arch in archs:
+        MachineModel.get_shared(arch=arch)
+        ISASemantics(MachineModel.get_isa_for_arch(arch))
+
+
+def create_server(port=0, socket_path=None, max_concurrent=1, cache_size=None, verbose=False):
+    """
+    Create analysis server, either on localhost or on a Unix socket.
+
+    :param port: TCP port on localhost, 0 for any free port, defaults to 0
+    :type port: int, optional
+    :param socket_path: path of Unix socket, used instead of ``port``, defaults to `None`
+    :type socket_path: str, optional
+    :param max_concurrent: maximum number of concurrently running analyses, defaults to 1
+    :type max_concurrent: int, optional
+    :param cache_size: maximum size of the result cache for ``"format": "json"`` requests in MB,
+        `None` disables the cache, defaults to `None`
+    :type cache_size: int, optional
+    :param verbose: flag for logging each request, defaults to `False`
+    :type verbose: bool, optional
+    :returns: server object, call ``serve_forever()`` to start it
+    """
+    if socket_path is not None:
+        server = AnalysisUnixServer(socket_path, AnalysisRequestHandler)
+    else:
+        server = AnalysisHTTPServer(('127.0.0.1', port), AnalysisRequestHandler)
+    server.slots = threading.BoundedSemaphore(max_concurrent)
+    server.metrics = ServerMetrics()
+    server.cache_size = cache_size
+    server.verbose = verbose
+    return server
+
+
+def create_parser():
+    """Return argparse parser for ``osaca serve``."""
+    parser = argparse.ArgumentParser(
+        prog='osaca serve',
+        description='Run OSACA as analysis daemon, which keeps parsers and machine models in '
+        'memory and answers analysis requests via HTTP.',
+    )
+    parser.add_argument(
+        '--port', type=int, default=8780, help='TCP port on localhost (default: 8780).'
+    )
+    parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        dest='socket_path',
+        default=None,
+        help='Listen on this Unix socket instead of a TCP port.',
+    )
+    parser.add_argument(
+        '--max-concurrent',
+        metavar='N',
+        type=int,
+        default=1,
+        help='Maximum number of concurrently running analyses, further requests wait '
+        '(default: 1).',
+    )
+    parser.add_argument(
+        '--preload',
+        metavar='ARCHS',
+        default=','.join(osaca.DEFAULT_ARCHS.values()),
+        help='Comma-separated list of architectures to load at startup (default: {}).'.format(
+            ','.join(osaca.DEFAULT_ARCHS.values())
+        ),
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Store results of "format": "json" requests in the result cache in ~/.osaca/cache '
+        'and reuse them.',
+    )
+    parser.add_argument(
+        '--cache-size',
+        metavar='MB',
+        type=int,
+        default=ResultCache.MAX_SIZE // 1024 ** 2,
+        help='Maximum size of the result cache in MB (default: {}).'.format(
+            ResultCache.MAX_SIZE // 1024 ** 2
+        ),
+    )
+    parser.add_argument(
+        '--verbose', '-v', action='count', default=0, help='Log each request to stderr.'
+    )
+    return parser
+
+
+def main(argv=None):
+    """Initialize and run analysis daemon."""
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    archs = [arch for arch in args.preload.split(',') if arch]
+    if any(arch.upper() not in osaca.SUPPORTED_ARCHS for arch in archs):
+        parser.error('Microarchitecture not supported. Please see --help for all valid codes.')
+    if args.max_concurrent < 1:
+        parser.error('--max-concurrent must be at least 1')
+    if args.cache_size < 1:
+        parser.error('--cache-size must be at least 1 MB')
+    warm_up(archs)
+    server = create_server(
+        port=args.port,
+        socket_path=args.socket_path,
+        max_concurrent=args.max_concurrent,
+        cache_size=args.cache_size if args.cache else None,
+        verbose=args.verbose > 0,
+    )
+    print(
+        'OSACA server listening on {}'.format(
+            args.socket_path or 'http://127.0.0.1:{}'.format(server.server_address[1])
+        ),
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket_path is not None and os.path.exists(args.socket_path):
+            os.remove(args.socket_path)
@@ -4,9 +4,11 @@ Unit tests for base assembly parser
 """
 
 import os
+import pickle
 import unittest
+from copy import deepcopy
 
-from osaca.parser import AttrDict, BaseParser
+from osaca.parser import AttrDict, BaseParser, InstructionForm, Operand, Register
 
 
 class TestBaseParser(unittest.TestCase):
@@ -71,6 +73,46 @@ class TestBaseParser(unittest.TestCase):
         self.assertEqual(BaseParser.detect_ISA(self.x86_code), 'x86')
         self.assertEqual(BaseParser.detect_ISA(self.aarch64_code), 'aarch64')
 
+    def test_attr_dict_copy(self):
+        attr_dict = AttrDict.convert_dict({'a': 1, 'b': {'c': 2}})
+        for copied in [deepcopy(attr_dict), pickle.loads(pickle.dumps(attr_dict))]:
+            copied['d'] = 3
+            self.assertEqual(copied.a, 1)
+            self.assertEqual(copied.b.c, 2)
+            self.assertEqual(copied.d, 3)
+            self.assertFalse('d' in attr_dict)
+
+    def test_slotted_dict(self):
+        operand = Operand(register=Register(name='zmm1', mask='k1'))
+        self.assertEqual(operand, {'register': {'name': 'zmm1', 'mask': 'k1'}})
+        self.assertEqual(
+            operand, AttrDict.convert_dict({'register': {'name': 'zmm1', 'mask': 'k1'}})
+        )
+        self.assertEqual(operand.register.name, 'zmm1')
+        self.assertEqual(list(operand), ['register'])
+        self.assertTrue('register' in operand)
+        self.assertFalse('memory' in operand)
+        self.assertIsNone(operand.get('memory'))
+        with self.assertRaises(KeyError):
+            operand['memory']
+        del operand.register['mask']
+        self.assertEqual(dict(operand.register), {'name': 'zmm1'})
+        # unset fields are missing attributes as well
+        self.assertFalse(hasattr(operand.register, 'mask'))
+        with self.assertRaises(AttributeError):
+            operand.memory
+        # keys which are no fields
+        form = InstructionForm(instruction='vaddpd', operands=[operand])
+        form['custom'] = True
+        self.assertEqual(len(form), 3)
+        self.assertTrue(form['custom'])
+        for copied in [deepcopy(form), pickle.loads(pickle.dumps(form))]:
+            self.assertEqual(copied, form)
+            copied.operands[0].register.name = 'zmm2'
+            copied['line_number'] = 1
+            self.assertEqual(operand.register.name, 'zmm1')
+            self.assertFalse('line_number' in form)
+
     ##################
     # Helper functions
     ##################
@@ -4,17 +4,36 @@ Unit tests for the CLI of OSACA and running the sample kernels in examples/
 """
 
 import argparse
+import glob
+import http.client
+import json
 import os
+import socket
+import threading
 import unittest
 from io import StringIO
 from shutil import copyfile
+from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
 import osaca.osaca as osaca
+import osaca.server as osaca_server
+from osaca.api import KerncraftAPI
 from osaca.parser import ParserAArch64, ParserX86ATT
+from osaca.result_cache import ResultCache
 from osaca.semantics import MachineModel
 
 
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
 class ErrorRaisingArgumentParser(argparse.ArgumentParser):
     def error(self, message):
         raise ValueError(message)  # reraise an error
@@ -36,6 +55,11 @@ class TestCLI(unittest.TestCase):
         )
         with self.assertRaises(ValueError):
             osaca.check_arguments(args, parser)
+        args = parser.parse_args(
+            ['--arch', 'csx', '--fixed', '--exact', self._find_file('gs', 'csx', 'gcc')]
+        )
+        with self.assertRaises(ValueError):
+            osaca.check_arguments(args, parser)
 
     def test_import_data(self):
         parser = osaca.create_parser(parser=ErrorRaisingArgumentParser())
@@ -185,6 +209,271 @@ class TestCLI(unittest.TestCase):
         self.assertTrue(output.getvalue().count('WARNING') == 1)
 
 
+    def test_batch(self):
+        parser = osaca.create_parser(parser=ErrorRaisingArgumentParser())
+        files = [self._find_file('add', 'csx', 'gcc'), self._find_file('triad', 'csx', 'icc')]
+        expected = StringIO()
+        for f in files:
+            osaca.run(parser.parse_args(['--arch', 'csx', f]), output_file=expected)
+        with TemporaryDirectory() as tmp_dir:
+            manifest = os.path.join(tmp_dir, 'manifest.txt')
+            with open(manifest, 'w') as f:
+                f.write('# kernels\n' + '\n'.join(os.path.abspath(f) for f in files) + '\n')
+            args = parser.parse_args(['--arch', 'csx', '--batch', manifest])
+            osaca.check_arguments(args, parser)
+            output = StringIO()
+            osaca.run(args, output_file=output)
+            self.assertEqual(self._strip_header(output), self._strip_header(expected))
+            # directory and glob pattern
+            for f in files:
+                copyfile(f, os.path.join(tmp_dir, os.path.basename(f)))
+            for batch in [tmp_dir, os.path.join(tmp_dir, '*.s')]:
+                output = StringIO()
+                osaca.run(
+                    parser.parse_args(['--arch', 'csx', '--batch', batch]), output_file=output
+                )
+                self.assertEqual(self._strip_header(output), self._strip_header(expected))
+            # worker processes keep order of kernels
+            output = StringIO()
+            osaca.run(
+                parser.parse_args(['--arch', 'csx', '--batch', tmp_dir, '--jobs', '2']),
+                output_file=output,
+            )
+            self.assertEqual(self._strip_header(output), self._strip_header(expected))
+            # missing kernels are reported, but do not stop the batch
+            with open(manifest, 'a') as f:
+                f.write('missing.s\n' + os.path.abspath(files[0]) + '\n')
+            output = StringIO()
+            with self.assertRaises(SystemExit):
+                osaca.run(
+                    parser.parse_args(['--arch', 'csx', '--batch', manifest]), output_file=output
+                )
+            self.assertEqual(output.getvalue().count('Analyzed file:'), 3)
+        args = parser.parse_args(['--batch', '*.s', self._find_file('add', 'csx', 'gcc')])
+        with self.assertRaises(ValueError):
+            osaca.check_arguments(args, parser)
+        args = parser.parse_args(['--jobs', '2', self._find_file('add', 'csx', 'gcc')])
+        with self.assertRaises(ValueError):
+            osaca.check_arguments(args, parser)
+
+    def test_multiple_archs(self):
+        parser = osaca.create_parser(parser=ErrorRaisingArgumentParser())
+        kernel = self._find_file('triad', 'csx', 'gcc')
+        for arch_arg, jobs in [('csx,ZEN2', '1'), ('all', '2')]:
+            args = parser.parse_args(['--arch', arch_arg, '--jobs', jobs, kernel])
+            osaca.check_arguments(args, parser)
+            output = StringIO()
+            osaca.run(args, output_file=output)
+            rows = {
+                line.split('|')[0].strip(): [x.strip() for x in line.split('|')[1:]]
+                for line in output.getvalue().split('\n')
+                if line.count('|') == 5
+            }
+            for arch in ['CSX', 'ZEN2']:
+                with open(kernel) as f:
+                    api = KerncraftAPI(arch, f.read())
+                self.assertEqual(rows[arch][0], '{:.2f}'.format(api.get_total_throughput()))
+                self.assertEqual(rows[arch][1], '{:.1f}'.format(api.get_cp()))
+                self.assertEqual(rows[arch][2], '{:.1f}'.format(api.get_lcd()))
+            if arch_arg == 'all':
+                self.assertTrue('ICL' in rows and 'TX2' not in rows)
+        # all architectures must have the same ISA
+        args = parser.parse_args(['--arch', 'csx,tx2', kernel])
+        with self.assertRaises(ValueError):
+            osaca.check_arguments(args, parser)
+
+    def test_output_format(self):
+        parser = osaca.create_parser(parser=ErrorRaisingArgumentParser())
+        files = [self._find_file('add', 'csx', 'gcc'), self._find_file('triad', 'csx', 'icc')]
+        with TemporaryDirectory() as tmp_dir:
+            manifest = os.path.join(tmp_dir, 'kernels.txt')
+            with open(manifest, 'w') as f:
+                f.write('\n'.join(os.path.abspath(f) for f in files) + '\n')
+            args = parser.parse_args(['--arch', 'csx', '--format', 'json', '--batch', manifest])
+            osaca.check_arguments(args, parser)
+            output = StringIO()
+            osaca.run(args, output_file=output)
+        # one JSON object per kernel and line
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([r['file'] for r in results], [os.path.abspath(f) for f in files])
+        for result, kernel in zip(results, files):
+            with open(kernel) as f:
+                api = KerncraftAPI('csx', f.read())
+            self.assertEqual(result['arch'], 'CSX')
+            self.assertEqual(result['throughput'], api.get_total_throughput())
+            self.assertEqual(result['critical_path'], api.get_cp())
+            self.assertEqual(result['loopcarried'], api.get_lcd())
+        # multiple architectures
+        args = parser.parse_args(['--arch', 'csx,zen2', '--format', 'json', files[1]])
+        output = StringIO()
+        osaca.run(args, output_file=output)
+        result = json.loads(output.getvalue())
+        self.assertEqual([r['arch'] for r in result['archs']], ['CSX', 'ZEN2'])
+        self.assertEqual(result['archs'][0]['throughput'], results[1]['throughput'])
+
+    def test_result_cache(self):
+        parser = osaca.create_parser(parser=ErrorRaisingArgumentParser())
+        kernel = self._find_file('triad', 'csx', 'gcc')
+        with open(kernel) as f:
+            code = f.read()
+        with TemporaryDirectory() as tmp_dir, patch('osaca.utils.CACHE_DIR', tmp_dir):
+            cache_dir = os.path.join(tmp_dir, 'results')
+            args = parser.parse_args(['--arch', 'csx', '--format', 'json', '--cache', kernel])
+            osaca.check_arguments(args, parser)
+            output = StringIO()
+            osaca.run(args, output_file=output)
+            self.assertEqual(len(glob.glob(os.path.join(cache_dir, '*', '*.json'))), 1)
+            # second run is answered from the cache without analysis
+            args = parser.parse_args(['--arch', 'csx', '--format', 'json', '--cache', kernel])
+            output_cached = StringIO()
+            with patch('osaca.osaca.analyze_kernel', side_effect=AssertionError):
+                osaca.run(args, output_file=output_cached)
+            self.assertEqual(output_cached.getvalue(), output.getvalue())
+            # other options are cached separately
+            args = parser.parse_args(
+                ['--arch', 'csx', '--fixed', '--format', 'json', '--cache', kernel]
+            )
+            osaca.run(args, output_file=StringIO())
+            self.assertEqual(len(glob.glob(os.path.join(cache_dir, '*', '*.json'))), 2)
+        # only trailing whitespace is normalized
+        key = ResultCache.get_key(code, 'csx', 'x86', {})
+        self.assertEqual(key, ResultCache.get_key(code.replace('\n', '  \r\n'), 'csx', 'x86', {}))
+        self.assertNotEqual(key, ResultCache.get_key('\n' + code, 'csx', 'x86', {}))
+        self.assertNotEqual(key, ResultCache.get_key(code, 'icl', 'x86', {}))
+        self.assertNotEqual(key, ResultCache.get_key(code, 'csx', 'x86', {'fixed': True}))
+        # least recently used results are evicted
+        with TemporaryDirectory() as tmp_dir:
+            cache = ResultCache(tmp_dir, max_size=1000)
+            keys = ['{:064x}'.format(i) for i in range(3)]
+            for i, key in enumerate(keys[:2]):
+                cache.put(key, {'data': 'x' * 400})
+                os.utime(cache._get_path(key), ns=(i * 10 ** 9, i * 10 ** 9))
+            # mark first one as recently used
+            self.assertEqual(cache.get(keys[0]), {'data': 'x' * 400})
+            cache.put(keys[2], {'data': 'x' * 400})
+            self.assertIsNotNone(cache.get(keys[0]))
+            self.assertIsNone(cache.get(keys[1]))
+            self.assertIsNotNone(cache.get(keys[2]))
+        # text reports are not cached
+        args = parser.parse_args(['--arch', 'csx', '--cache', kernel])
+        with self.assertRaises(ValueError):
+            osaca.check_arguments(args, parser)
+
+    def test_canonical_iteration(self):
+        parser = osaca.create_parser(parser=ErrorRaisingArgumentParser())
+        kernel = self._find_file('add', 'csx', 'gcc')
+        results = []
+        for canonical in [[], ['--canonical']]:
+            args = parser.parse_args(['--arch', 'csx', '--format', 'json'] + canonical + [kernel])
+            osaca.check_arguments(args, parser)
+            output = StringIO()
+            osaca.run(args, output_file=output)
+            results.append(json.loads(output.getvalue()))
+        full, canonical = results
+        self.assertEqual(full['unroll']['unroll_factor'], 32)
+        self.assertEqual(full['unroll']['copies'], 8)
+        self.assertEqual(full['unroll']['stride'], 8)
+        self.assertIsNone(full['unroll']['canonical'])
+        self.assertEqual(full['unroll']['iterations'], 32)
+        self.assertTrue(canonical['unroll']['canonical'])
+        self.assertEqual(canonical['unroll']['iterations'], 4)
+        self.assertLess(len(canonical['lines']), len(full['lines']))
+        self.assertEqual(full['unroll']['control'], canonical['unroll']['control'])
+        # same cycles per source-level iteration
+        for name in ['throughput', 'critical_path', 'loopcarried']:
+            self.assertEqual(full['unroll'][name], full[name] / 32)
+            self.assertEqual(canonical['unroll'][name], full['unroll'][name])
+        self.assertEqual(canonical['unroll']['critical_path'], 7 / 32)
+        self.assertEqual(canonical['unroll']['loopcarried'], 1 / 32)
+        # copy incrementing the pointer by a post-indexed store
+        kernel_update = self._find_file('update', 'tx2', 'clang')
+        results = []
+        for canonical in [[], ['--canonical']]:
+            args = parser.parse_args(
+                ['--arch', 'tx2', '--format', 'json'] + canonical + [kernel_update]
+            )
+            output = StringIO()
+            osaca.run(args, output_file=output)
+            results.append(json.loads(output.getvalue())['unroll'])
+        full, canonical = results
+        self.assertTrue(canonical['canonical'])
+        for name in ['throughput', 'critical_path', 'loopcarried']:
+            self.assertEqual(canonical[name], full[name])
+        # report of the unrolling
+        args = parser.parse_args(['--arch', 'csx', '--canonical', kernel])
+        output = StringIO()
+        osaca.run(args, output_file=output)
+        self.assertIn('Loop Unrolling Report', output.getvalue())
+        self.assertIn('canonical iteration (4 source iterations)', output.getvalue())
+        # copies sharing data are analyzed in full
+        kernel_j2d = self._find_file('j2d', 'tx2', 'gcc')
+        args = parser.parse_args(['--arch', 'tx2', '--canonical', '--format', 'json', kernel_j2d])
+        output = StringIO()
+        osaca.run(args, output_file=output)
+        self.assertFalse(json.loads(output.getvalue())['unroll']['canonical'])
+        # not supported for multiple architectures
+        args = parser.parse_args(['--arch', 'csx,zen2', '--canonical', kernel])
+        with self.assertRaises(ValueError):
+            osaca.check_arguments(args, parser)
+
+    def test_server(self):
+        kernel = self._find_file('triad', 'csx', 'gcc')
+        with open(kernel) as f:
+            code = f.read()
+        parser = osaca.create_parser()
+        expected = StringIO()
+        osaca.run(parser.parse_args(['--arch', 'csx', kernel]), output_file=expected)
+        api = KerncraftAPI('csx', code)
+        with TemporaryDirectory() as tmp_dir:
+            for socket_path in [None, os.path.join(tmp_dir, 'osaca.sock')]:
+                server = osaca_server.create_server(socket_path=socket_path)
+                thread = threading.Thread(target=server.serve_forever, daemon=True)
+                thread.start()
+                try:
+                    status, result = self._request(
+                        server, 'POST', '/analyze', {'code': code, 'arch': 'csx', 'file': kernel}
+                    )
+                    self.assertEqual(status, 200)
+                    self.assertEqual(result['arch'], 'CSX')
+                    self.assertEqual(result['throughput'], api.get_total_throughput())
+                    self.assertEqual(result['critical_path'], api.get_cp())
+                    self.assertEqual(result['loopcarried'], api.get_lcd())
+                    self.assertEqual(
+                        self._strip_header(StringIO(result['report'] + '\n')),
+                        self._strip_header(expected),
+                    )
+                    status, result = self._request(
+                        server, 'POST', '/analyze', {'code': code, 'arch': 'csx', 'format': 'json'}
+                    )
+                    self.assertEqual(status, 200)
+                    self.assertEqual(result['critical_path'], api.get_cp())
+                    self.assertEqual(len(result['lines']), len(api.kernel))
+                    # invalid requests
+                    status, result = self._request(
+                        server, 'POST', '/analyze', {'code': code, 'arch': 'WRONG_ARCH'}
+                    )
+                    self.assertEqual(status, 400)
+                    status, result = self._request(server, 'POST', '/analyze', {'arch': 'csx'})
+                    self.assertEqual(status, 400)
+                    invalid_requests = [
+                        {'lines': 5}, {'verbose': 'x'}, {'verbose': [1]}, {'verbose': True},
+                        {'verbose': -1},
+                    ]
+                    for invalid in invalid_requests:
+                        request = {'code': code, 'arch': 'csx'}
+                        request.update(invalid)
+                        status, result = self._request(server, 'POST', '/analyze', request)
+                        self.assertEqual(status, 400)
+                        self.assertIn('error', result)
+                    status, metrics = self._request(server, 'GET', '/metrics')
+                    self.assertEqual(status, 200)
+                    self.assertEqual(metrics['requests'], 2)
+                    self.assertEqual(metrics['in_flight'], 0)
+                    self.assertEqual(metrics['latency_ms']['count'], 2)
+                finally:
+                    server.shutdown()
+                    server.server_close()
+
     def test_lines_arg(self):
         # Run tests with --lines option
         parser = osaca.create_parser()
@@ -205,6 +494,11 @@ class TestCLI(unittest.TestCase):
         args.append(parser.parse_args(
             ['--lines', '146,147:148,149-154', '--arch', 'csx', self._find_test_file(kernel_x86)]
         ))
+        # large ranges are not expanded to single line numbers
+        args.append(parser.parse_args(
+            ['--lines', '146-154,100000-2000000000', '--arch', 'csx',
+             self._find_test_file(kernel_x86)]
+        ))
         for a in args:
             with self.subTest(params=a):
                 output = StringIO()
@@ -229,6 +523,27 @@ class TestCLI(unittest.TestCase):
         assert os.path.exists(name)
         return name
 
+    @staticmethod
+    def _request(server, method, path, content=None):
+        if isinstance(server.server_address, str):
+            connection = UnixHTTPConnection(server.server_address)
+        else:
+            connection = http.client.HTTPConnection(*server.server_address)
+        body = json.dumps(content) if content is not None else None
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        result = json.loads(response.read().decode('utf-8'))
+        connection.close()
+        return response.status, result
+
+    @staticmethod
+    def _strip_header(output):
+        return [
+            line
+            for line in output.getvalue().split('\n')
+            if not line.startswith(('Analyzed file:', 'Timestamp:'))
+        ]
+
     @staticmethod
     def _find_test_file(name):
         testdir = os.path.dirname(__file__)
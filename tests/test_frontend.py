@@ -3,10 +3,11 @@
 Unit tests for OSACA Frontend
 """
 
+import json
 import os
 import unittest
 
-from osaca.frontend import Frontend
+from osaca.frontend import Frontend, dump_result
 from osaca.parser import ParserAArch64, ParserX86ATT
 from osaca.semantics import ArchSemantics, KernelDG, MachineModel
 
@@ -77,6 +78,44 @@ class TestFrontend(unittest.TestCase):
         fe.full_analysis(self.kernel_AArch64, dg, verbose=True)
         # TODO compare output with checked string
 
+    def test_analysis_result(self):
+        dg = KernelDG(self.kernel_AArch64, self.parser_AArch64, self.machine_model_tx2)
+        fe = Frontend(path_to_yaml=os.path.join(self.MODULE_DATA_DIR, 'tx2.yml'))
+        result = fe.analysis_result(self.kernel_AArch64, dg, length_warning=True)
+        # only plain data types
+        self.assertEqual(json.loads(dump_result(result)), result)
+        self.assertEqual(result['arch'], 'TX2')
+        self.assertEqual(result['warnings'], ['length'])
+        self.assertEqual(result['ports'], self.machine_model_tx2.get_ports())
+        self.assertEqual(len(result['lines']), len(self.kernel_AArch64))
+        tp_sum = ArchSemantics.get_throughput_sum(self.kernel_AArch64)
+        self.assertEqual(result['port_pressure'], tp_sum)
+        self.assertEqual(result['throughput'], max(tp_sum))
+        self.assertEqual(
+            result['critical_path'], sum(x['latency_cp'] for x in dg.get_critical_path())
+        )
+        self.assertEqual(
+            result['critical_path_lines'], [x['line_number'] for x in dg.get_critical_path()]
+        )
+        self.assertEqual(
+            sum(line['latency_cp'] for line in result['lines'] if line['latency_cp'] is not None),
+            result['critical_path'],
+        )
+        lcd_dict = dg.get_loopcarried_dependencies()
+        self.assertEqual(
+            [lcd['root'] for lcd in result['loopcarried_dependencies']], list(lcd_dict)
+        )
+        self.assertEqual(
+            result['loopcarried'],
+            max(lcd['latency'] for lcd in result['loopcarried_dependencies']),
+        )
+        for line, instruction_form in zip(result['lines'], self.kernel_AArch64):
+            self.assertEqual(line['line_number'], instruction_form['line_number'])
+            self.assertEqual(line['port_pressure'], instruction_form['port_pressure'])
+            self.assertEqual(line['flags'], sorted(instruction_form['flags']))
+        with self.assertRaises(ValueError):
+            dump_result(result, 'yaml')
+
     ##################
     # Helper functions
     ##################
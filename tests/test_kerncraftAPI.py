@@ -73,6 +73,16 @@ class TestKerncraftAPI(unittest.TestCase):
         self.assertEqual(kapi.get_total_throughput(), 64.0)
         # TODO add missing latency values
         # self.assertEqual(kapi.get_latency(kernel), 20.0)
+        kernel_graph = kapi.kernel_graph
+        self.assertEqual(
+            kapi.get_latency(),
+            (
+                max([0.0] + list(kernel_graph.loopcarried_latencies.values())),
+                kernel_graph.critical_path_latency,
+            ),
+        )
+        # dependency graph is only built once
+        self.assertIs(kapi.kernel_graph, kernel_graph)
 
     ##################
     # Helper functions
@@ -39,6 +39,31 @@ class TestMarkerUtils(unittest.TestCase):
         self.assertEqual(kernel[0].line_number, 146)
         self.assertEqual(kernel[-1].line_number, 154)
 
+    def test_marker_detection_lazy(self):
+        for parser, isa, filename in [
+            (self.parser_x86, 'x86', 'triad_x86_iaca.s'),
+            (self.parser_AArch, 'AArch64', 'triad_arm_iaca.s'),
+        ]:
+            with open(self._find_file(filename)) as f:
+                parsed = parser.parse_lazy(f)
+            with self.subTest(isa=isa):
+                kernel = reduce_to_section(parsed, isa)
+                full_kernel = reduce_to_section(
+                    self.parsed_x86 if isa == 'x86' else self.parsed_AArch, isa
+                )
+                self.assertEqual(kernel, full_kernel)
+                # only markers and kernel are parsed
+                self.assertLess(len(parsed._parsed), len(kernel) + 20)
+        # hexadecimal marker values
+        code = (
+            'addl $1, %eax\n'
+            'movl $0x6F, %ebx\n.byte 100,103,144\n'
+            'addl $2, %eax\n'
+            'movl $0xde, %ebx\n.byte 100,103,144\n'
+        )
+        kernel = reduce_to_section(self.parser_x86.parse_lazy(code), 'x86')
+        self.assertEqual([line.line_number for line in kernel], [4])
+
     def test_marker_matching_AArch64(self):
         # preparation
         bytes_1_line = '.byte     213,3,32,31\n'
@@ -101,6 +126,10 @@ class TestMarkerUtils(unittest.TestCase):
                         ):
                             sample_parsed = self.parser_AArch.parse_file(sample_code)
                             sample_kernel = reduce_to_section(sample_parsed, 'AArch64')
+                            lazy_parsed = self.parser_AArch.parse_lazy(sample_code)
+                            self.assertEqual(
+                                reduce_to_section(lazy_parsed, 'AArch64'), sample_kernel
+                            )
                             self.assertEqual(len(sample_kernel), kernel_length)
                             kernel_start = len(
                                 list(
@@ -163,6 +192,10 @@ class TestMarkerUtils(unittest.TestCase):
                         ):
                             sample_parsed = self.parser_x86.parse_file(sample_code)
                             sample_kernel = reduce_to_section(sample_parsed, 'x86')
+                            self.assertEqual(
+                                reduce_to_section(self.parser_x86.parse_lazy(sample_code), 'x86'),
+                                sample_kernel,
+                            )
                             self.assertEqual(len(sample_kernel), kernel_length)
                             kernel_start = len(
                                 list(
@@ -214,6 +247,9 @@ class TestMarkerUtils(unittest.TestCase):
             code = pro + kernel + epi
             parsed = self.parser_AArch.parse_file(code)
             test_kernel = reduce_to_section(parsed, 'AArch64')
+            self.assertEqual(
+                reduce_to_section(self.parser_AArch.parse_lazy(code), 'AArch64'), test_kernel,
+                msg="Invalid lazily extracted kernel on {!r}".format(test_name))
             if kernel:
                 kernel_length = len(kernel.strip().split('\n'))
             else:
@@ -272,6 +308,9 @@ class TestMarkerUtils(unittest.TestCase):
             code = pro + kernel + epi
             parsed = self.parser_x86.parse_file(code)
             test_kernel = reduce_to_section(parsed, 'x86')
+            self.assertEqual(
+                reduce_to_section(self.parser_x86.parse_lazy(code), 'x86'), test_kernel,
+                msg="Invalid lazily extracted kernel on {!r}".format(test_name))
             if kernel:
                 kernel_length = len(kernel.strip().split('\n'))
             else:
@@ -401,6 +401,33 @@ class TestParserAArch64(unittest.TestCase):
                 with self.subTest(reg_a=ri, reg_b=rj, assert_val=assert_value):
                     self.assertEqual(self.parser.is_reg_dependend_of(ri, rj), assert_value)
 
+    def test_reg_id(self):
+        parsed = self.parser.parse_line('ldr q1, [x2, w3, uxtw #3]')
+        reg_ids = [
+            self.parser.get_reg_id(parsed.operands[0].register),
+            self.parser.get_reg_id(parsed.operands[1].memory.base),
+            self.parser.get_reg_id(parsed.operands[1].memory.index),
+        ]
+        reg_v1 = AttrDict({'prefix': 'v', 'name': '1', 'lanes': '2', 'shape': 'd'})
+        reg_w2 = AttrDict({'prefix': 'w', 'name': '2'})
+        reg_x1 = AttrDict({'prefix': 'x', 'name': '1'})
+        self.assertEqual(reg_ids[0], self.parser.get_reg_id(reg_v1))
+        self.assertEqual(reg_ids[1], self.parser.get_reg_id(reg_w2))
+        self.assertNotEqual(reg_ids[0], self.parser.get_reg_id(reg_x1))
+        self.assertEqual(len(set(reg_ids)), 3)
+        self.assertIsNone(self.parser.get_reg_id(AttrDict({'prefix': 'p', 'name': '0'})))
+
+    def test_access_width(self):
+        stp = self.parser.parse_line('stp q1, q2, [x0]')
+        ld1 = self.parser.parse_line('ld1 {v0.4s, v1.4s}, [x0]')
+        ld1_lane = self.parser.parse_line('ld1 {v0.s}[1], [x0]')
+        self.assertEqual(self.parser.get_access_width(stp.operands[0].register), 16)
+        self.assertEqual(self.parser.get_access_width(ld1.operands[0].register), 32)
+        self.assertIsNone(self.parser.get_access_width(ld1_lane.operands[0].register))
+        for prefix, width in [('w', 4), ('x', 8), ('b', 1), ('h', 2), ('d', 8)]:
+            register = AttrDict({'prefix': prefix, 'name': '1'})
+            self.assertEqual(self.parser.get_access_width(register), width)
+
     ##################
     # Helper functions
     ##################
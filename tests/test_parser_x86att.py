@@ -5,6 +5,7 @@ Unit tests for x86 AT&T assembly parser
 
 import os
 import unittest
+from unittest.mock import patch
 
 from pyparsing import ParseException
 
@@ -220,6 +221,87 @@ class TestParserX86ATT(unittest.TestCase):
         parsed = self.parser.parse_file(self.triad_code)
         self.assertEqual(parsed[0].line_number, 1)
         self.assertEqual(len(parsed), 353)
+        # line by line from file
+        with open(self._find_file('triad_x86_iaca.s')) as f:
+            self.assertEqual(list(self.parser.parse_stream(f)), parsed)
+        # lazily
+        lazy_parsed = self.parser.parse_lazy(self.triad_code)
+        self.assertEqual(len(lazy_parsed), 353)
+        self.assertEqual(lazy_parsed[-1], parsed[-1])
+        self.assertEqual(lazy_parsed[10:12], parsed[10:12])
+        self.assertEqual(lazy_parsed.line_numbers, [line.line_number for line in parsed])
+
+    def test_parse_line_fast_path(self):
+        lines = [line for line in self.triad_code.split('\n') if line.strip()]
+        with open(self._find_file('kernel_x86.s')) as f:
+            lines += [line for line in f.read().split('\n') if line.strip()]
+        # lines falling back to pyparsing
+        lines += [
+            'data16 nopw %cs:0x0(%rax,%rax,1)',
+            'vaddpd %zmm1, %zmm2, %zmm3{%k1}{z}',
+            'call foo@PLT',
+            'jmp *%rax',
+            'jmp 1b',
+            '1:',
+            '.L3+1:',
+            '.section .rodata,"a"',
+            'movq (%rax,4), %rbx',
+            'movl 8+foo(%rip), %eax',
+            'movl %eax,,%ebx',
+            'fld %st(1)',
+            'mov %eax, %ebx, %ecx, %edx, %esi',
+            '# Größe',
+        ]
+        # tricky lines for the fast path
+        lines += [
+            '.L3:#L3',
+            'foo: # x:y',
+            'movl $1, %eax # a:b',
+            '.byte 1 // x',
+            'movq 8(,%rax,4), %rbx',
+            'movl $-0x10, %eax',
+            'movl $0X10, %eax',
+            'movl $.LC0, %eax',
+            'mov\t%eax,%ebx\t#\tx',
+            'ret#',
+            'rep stosq',
+        ]
+        fast = [self._parse_or_error(line) for line in lines]
+        with patch.object(ParserX86ATT, '_parse_line_fast', return_value=False):
+            for line, instruction_form in zip(lines, fast):
+                self.assertEqual(instruction_form, self._parse_or_error(line, False), msg=line)
+
+    def test_parse_line_cache(self):
+        line = 'vfmadd231pd %zmm1, %zmm2, %zmm3 # fma'
+        parsed_1 = self.parser.parse_line(line, 1)
+        parsed_2 = self.parser.parse_line('\t' + line, 2)
+        self.assertEqual(parsed_2.line, '\t' + line)
+        self.assertEqual(parsed_2.line_number, 2)
+        self.assertEqual(parsed_2.comment, 'fma')
+        self.assertEqual(parsed_2.operands, parsed_1.operands)
+        # cached instruction forms are not shared
+        parsed_2.operands[0].register.name = 'zmm4'
+        parsed_2['port_pressure'] = [1.0]
+        parsed_3 = self.parser.parse_line(line, 3)
+        self.assertEqual(parsed_3.operands[0].register.name, 'zmm1')
+        self.assertNotIn('port_pressure', parsed_3)
+        self.assertEqual(parsed_3, self.parser._parse_line(line, 3))
+        # lines only differing in their comment share the cache entry
+        cache_size = len(self.parser._line_cache)
+        for other_line in [
+            'vfmadd231pd %zmm1, %zmm2, %zmm3 #  other   comment',
+            'vfmadd231pd %zmm1, %zmm2, %zmm3 #',
+            'vfmadd231pd %zmm1, %zmm2, %zmm3 // fma',
+        ]:
+            with self.subTest(line=other_line):
+                self.assertEqual(
+                    self.parser.parse_line(other_line, 4), self.parser._parse_line(other_line, 4)
+                )
+        self.assertEqual(len(self.parser._line_cache), cache_size + 1)
+        # '//' does not start a comment in directives
+        line = '.text // no comment'
+        self.parser.parse_line('.text # comment', 5)
+        self.assertEqual(self.parser.parse_line(line, 6), self.parser._parse_line(line, 6))
 
     def test_parse_register(self):
         register_str_1 = '%rax'
@@ -296,6 +378,25 @@ class TestParserX86ATT(unittest.TestCase):
                 with self.subTest(reg_a=ri, reg_b=rj, assert_val=assert_value):
                     self.assertEqual(self.parser.is_reg_dependend_of(ri, rj), assert_value)
 
+    def test_reg_id(self):
+        parsed = self.parser.parse_line('vfmadd231pd (%rax,%r11d,8), %ymm1, %xmm1')
+        reg_ids = [self.parser.get_reg_id(op.register) for op in parsed.operands[1:]]
+        reg_ids += [
+            self.parser.get_reg_id(parsed.operands[0].memory.base),
+            self.parser.get_reg_id(parsed.operands[0].memory.index),
+        ]
+        self.assertEqual(reg_ids[0], reg_ids[1])
+        self.assertEqual(reg_ids[2], self.parser.get_reg_id(AttrDict({'name': 'AL'})))
+        self.assertEqual(reg_ids[3], self.parser.get_reg_id(AttrDict({'name': 'r11'})))
+        self.assertEqual(len(set(reg_ids)), 3)
+        self.assertTrue(all(isinstance(reg_id, int) for reg_id in reg_ids))
+
+    def test_access_width(self):
+        widths = {'rax': 8, 'ebp': 4, 'si': 2, 'dil': 1, 'ah': 1, 'r11d': 4, 'r9w': 2, 'r8': 8}
+        for name, width in widths.items():
+            self.assertEqual(self.parser.get_access_width(AttrDict({'name': name})), width)
+        self.assertIsNone(self.parser.get_access_width(AttrDict({'name': 'xmm1'})))
+
     ##################
     # Helper functions
     ##################
@@ -316,6 +417,14 @@ class TestParserX86ATT(unittest.TestCase):
             parser.process_operand(parser.directive.parseString(directive, parseAll=True).asDict())
         ).directive
 
+    def _parse_or_error(self, line, cache=True):
+        try:
+            if not cache:
+                return self.parser._parse_line(line)
+            return self.parser.parse_line(line)
+        except ValueError as e:
+            return str(e)
+
     @staticmethod
     def _find_file(name):
         testdir = os.path.dirname(__file__)
@@ -4,16 +4,24 @@ Unit tests for Semantic Analysis
 """
 
 import os
+import shutil
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from subprocess import call
+from unittest.mock import patch
 
 import networkx as nx
 
 from osaca.osaca import get_unmatched_instruction_ratio
 from osaca.parser import AttrDict, ParserAArch64, ParserX86ATT
 from osaca.semantics import (INSTR_FLAGS, ArchSemantics, KernelDG,
-                             MachineModel, reduce_to_section)
+                             MachineModel, find_unroll_info, get_canonical_iteration,
+                             reduce_to_section)
+from osaca.semantics.array_dag import ArrayDAG
+from osaca.semantics.memory_dependencies import find_store_dependents
+from osaca.semantics.port_scheduler import schedule_uops
 
 
 class TestSemanticTools(unittest.TestCase):
@@ -184,6 +192,147 @@ class TestSemanticTools(unittest.TestCase):
             test_mm_x86.dump(stream=dev_null)
             test_mm_arm.dump(stream=dev_null)
 
+    def test_operand_signature_index(self):
+        test_mm_x86 = MachineModel(path_to_yaml=self._find_file('test_db_x86.yml'))
+        lea_forms = test_mm_x86['instruction_forms_dict']['LEA']
+        for line, form_index in [
+            ('lea (%rax), %rbx', 0),
+            ('lea (%rax,%rcx,4), %rbx', 1),
+            ('lea 8(%rax,%rcx,4), %rbx', 2),
+            ('lea 8(%rax), %rbx', 3),
+            ('lea 8(,%rcx,8), %rbx', 6),
+        ]:
+            with self.subTest(line=line):
+                operands = self.parser_x86.parse_line(line).operands
+                self.assertIs(test_mm_x86.get_instruction('lea', operands), lea_forms[form_index])
+                # candidates keep DB order and include forms with wildcards
+                key = test_mm_x86._get_key('lea', operands)
+                candidates = test_mm_x86._get_indexed_iforms(*key)
+                self.assertIn(lea_forms[form_index], candidates)
+                self.assertLess(len(candidates), len(lea_forms))
+                self.assertEqual(
+                    candidates, [f for f in lea_forms if any(f is c for c in candidates)]
+                )
+        # DB entries find themselves
+        for form in lea_forms:
+            self.assertIs(test_mm_x86.get_instruction('LEA', form['operands']), form)
+
+    def test_lookup_cache(self):
+        test_mm_x86 = MachineModel(path_to_yaml=self._find_file('test_db_x86.yml'))
+        operands_1 = self.parser_x86.parse_line('vaddpd %xmm1, %xmm2, %xmm3').operands
+        operands_2 = self.parser_x86.parse_line('vaddpd %xmm4, %xmm5, %xmm6').operands
+        operands_3 = self.parser_x86.parse_line('vaddpd %ymm4, %ymm5, %ymm6').operands
+        instr_form = test_mm_x86.get_instruction('vaddpd', operands_1)
+        self.assertIsNotNone(instr_form)
+        # same operand shape, different registers
+        self.assertIs(test_mm_x86.get_instruction('vaddpd', operands_2), instr_form)
+        self.assertIs(test_mm_x86.get_instruction('VADDPD', operands_1), instr_form)
+        self.assertIsNot(test_mm_x86.get_instruction('vaddpd', operands_3), instr_form)
+        cache_info = test_mm_x86.get_cache_info()
+        self.assertEqual(cache_info['hits'], 2)
+        self.assertEqual(cache_info['misses'], 2)
+        self.assertEqual(cache_info['currsize'], 2)
+        # set_instruction invalidates cache
+        test_mm_x86.set_instruction('vaddpd', instr_form['operands'], latency=42)
+        self.assertEqual(test_mm_x86.get_cache_info()['currsize'], 0)
+        self.assertEqual(test_mm_x86.get_instruction('vaddpd', operands_2)['latency'], 42)
+
+    def test_binary_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test_db_x86.yml')
+            shutil.copy(self._find_file('test_db_x86.yml'), path)
+            test_mm_x86 = MachineModel(path_to_yaml=path)
+            self.assertTrue(os.path.exists(os.path.join(tmp_dir, '.test_db_x86.stamp')))
+            cached_mm_x86 = MachineModel(path_to_yaml=path)
+            # instruction forms are loaded on demand
+            self.assertIsNone(cached_mm_x86._data['instruction_forms'])
+            operands = self.parser_x86.parse_line('vaddpd %xmm1, %xmm2, %xmm3').operands
+            self.assertEqual(
+                cached_mm_x86.get_instruction('vaddpd', operands),
+                test_mm_x86.get_instruction('vaddpd', operands),
+            )
+            self.assertEqual(cached_mm_x86['instruction_forms'], test_mm_x86['instruction_forms'])
+            self.assertEqual(cached_mm_x86.dump(), test_mm_x86.dump())
+            # outdated stamp falls back to content hash
+            os.utime(path, ns=(0, 0))
+            self.assertIsNone(MachineModel(path_to_yaml=path)._data['instruction_forms'])
+
+    def test_on_demand_loading(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test_db_x86.yml')
+            shutil.copy(self._find_file('test_db_x86.yml'), path)
+            test_mm_x86 = MachineModel(path_to_yaml=path, on_demand=True)
+            # no cache is written
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, '.test_db_x86.stamp')))
+            self.assertIsNone(test_mm_x86._data['instruction_forms'])
+            operands = self.parser_x86.parse_line('mov %rax, (%rbx)').operands
+            full_mm_x86 = MachineModel(path_to_yaml=self._find_file('test_db_x86.yml'))
+            self.assertEqual(
+                test_mm_x86.get_instruction('mov', operands),
+                full_mm_x86.get_instruction('mov', operands),
+            )
+            self.assertIsNone(test_mm_x86.get_instruction('nonexistent', operands))
+            self.assertEqual(test_mm_x86['instruction_forms'], full_mm_x86['instruction_forms'])
+        with self.assertRaises(ValueError):
+            MachineModel(path_to_yaml=path, lazy=True, on_demand=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test_db_x86.yml')
+            shutil.copy(self._find_file('test_db_x86.yml'), path)
+            shared_mm_x86 = MachineModel.get_shared(path_to_yaml=path, on_demand=True)
+            self.assertIsNone(shared_mm_x86._data['instruction_forms'])
+            # on demand models serve full requests as well
+            self.assertIs(MachineModel.get_shared(path_to_yaml=path)._data, shared_mm_x86._data)
+            # models are loaded on demand if no cache can be written
+            with patch.object(MachineModel, '_can_write_cache', return_value=False):
+                test_mm_x86 = MachineModel(path_to_yaml=path)
+            self.assertIsNone(test_mm_x86._data['instruction_forms'])
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, '.test_db_x86.stamp')))
+
+    def test_shared_machine_model(self):
+        path = self._find_file('test_db_x86.yml')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            shared_mms = list(
+                executor.map(lambda _: MachineModel.get_shared(path_to_yaml=path), range(8))
+            )
+        test_mm_x86 = shared_mms[0]
+        for shared_mm in shared_mms[1:]:
+            self.assertIs(shared_mm._data, test_mm_x86._data)
+        # full model serves lazy requests
+        self.assertIs(MachineModel.get_shared(path_to_yaml=path, lazy=True)._data,
+                      test_mm_x86._data)
+        # copy on write
+        operands = self.parser_x86.parse_line('vaddpd %xmm1, %xmm2, %xmm3').operands
+        instr_form = test_mm_x86.get_instruction('vaddpd', operands)
+        shared_mms[1].set_instruction('vaddpd', instr_form['operands'], latency=42)
+        self.assertEqual(shared_mms[1].get_instruction('vaddpd', operands)['latency'], 42)
+        self.assertNotEqual(test_mm_x86.get_instruction('vaddpd', operands)['latency'], 42)
+        self.assertNotEqual(
+            MachineModel.get_shared(path_to_yaml=path).get_instruction('vaddpd', operands)[
+                'latency'
+            ],
+            42,
+        )
+
+    def test_shared_lookup_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test_db_x86.yml')
+            shutil.copy(self._find_file('test_db_x86.yml'), path)
+            operands = self.parser_x86.parse_line('vaddpd %xmm1, %xmm2, %xmm3').operands
+            first_mm_x86 = MachineModel.get_shared(path_to_yaml=path)
+            instr_form = first_mm_x86.get_instruction('vaddpd', operands)
+            # views of the same model share their lookups
+            second_mm_x86 = MachineModel.get_shared(path_to_yaml=path)
+            self.assertIs(second_mm_x86.get_instruction('vaddpd', operands), instr_form)
+            cache_info = second_mm_x86.get_cache_info()
+            self.assertEqual((cache_info['hits'], cache_info['misses']), (1, 1))
+            self.assertEqual(first_mm_x86.get_cache_info(), cache_info)
+            # copy on write gives a private cache
+            second_mm_x86.set_instruction('vaddpd', instr_form['operands'], latency=42)
+            self.assertEqual(second_mm_x86.get_instruction('vaddpd', operands)['latency'], 42)
+            self.assertIs(first_mm_x86.get_instruction('vaddpd', operands), instr_form)
+            self.assertEqual(first_mm_x86.get_cache_info()['hits'], 2)
+            self.assertEqual(second_mm_x86.get_cache_info()['hits'], 0)
+
     def test_src_dst_assignment_x86(self):
         for instruction_form in self.kernel_x86:
             with self.subTest(instruction_form=instruction_form):
@@ -243,6 +392,101 @@ class TestSemanticTools(unittest.TestCase):
         self.assertNotEqual(tp_fixed, tp_optimal)
         self.assertTrue(max(tp_optimal) <= max(tp_fixed))
 
+    def test_optimal_throughput_port_sums(self):
+        # the running port sums used for balancing must be bit-identical to a full re-reduction
+        # of the kernel in every single step
+        class CheckedArchSemantics(ArchSemantics):
+            def _get_port_sums(self, port_totals, indices):
+                port_sums = super()._get_port_sums(port_totals, indices)
+                tp_sum = self.get_throughput_sum(self.checked_kernel)
+                assert port_sums == [tp_sum[i] for i in indices]
+                return port_sums
+
+        semantics = CheckedArchSemantics(
+            self.machine_model_csx, path_to_yaml=os.path.join(self.MODULE_DATA_DIR, 'isa/x86.yml')
+        )
+        # unroll kernel to get more unbalanced ports
+        kernel = deepcopy(self.kernel_x86) + deepcopy(self.kernel_x86)
+        semantics.add_semantics(kernel)
+        semantics.checked_kernel = kernel
+        semantics.assign_optimal_throughput(kernel)
+
+    def test_optimal_throughput_reference(self):
+        # balancing with running port sums gives the same result as re-reducing the whole kernel
+        # for every port sum, as OSACA did before
+        class ReferenceArchSemantics(ArchSemantics):
+            def _get_port_sums(self, port_totals, indices):
+                tp_sum = self.get_throughput_sum(self.reference_kernel)
+                return [tp_sum[i] for i in indices]
+
+        for machine_model, isa, kernel in [
+            (self.machine_model_csx, 'x86', self.kernel_x86),
+            (self.machine_model_tx2, 'aarch64', self.kernel_AArch64),
+        ]:
+            with self.subTest(isa=isa):
+                path = os.path.join(self.MODULE_DATA_DIR, 'isa/{}.yml'.format(isa))
+                semantics = ArchSemantics(machine_model, path_to_yaml=path)
+                reference = ReferenceArchSemantics(machine_model, path_to_yaml=path)
+                # small unrolled kernel
+                kernel = [
+                    deepcopy(instruction_form) for _ in range(3) for instruction_form in kernel
+                ]
+                semantics.add_semantics(kernel)
+                kernel_reference = deepcopy(kernel)
+                semantics.assign_optimal_throughput(kernel)
+                reference.reference_kernel = kernel_reference
+                reference.assign_optimal_throughput(kernel_reference)
+                self.assertEqual(
+                    [instruction_form['port_pressure'] for instruction_form in kernel],
+                    [instruction_form['port_pressure'] for instruction_form in kernel_reference],
+                )
+
+    def test_exact_throughput_assignment(self):
+        # x86
+        kernel_fixed = deepcopy(self.kernel_x86)
+        self.semantics_csx.add_semantics(kernel_fixed)
+        kernel_optimal = deepcopy(kernel_fixed)
+        self.semantics_csx.assign_optimal_throughput(kernel_optimal)
+        kernel_exact = deepcopy(kernel_fixed)
+        self.semantics_csx.assign_exact_throughput(kernel_exact)
+        tp_fixed = self.semantics_csx.get_throughput_sum(kernel_fixed)
+        tp_optimal = self.semantics_csx.get_throughput_sum(kernel_optimal)
+        tp_exact = self.semantics_csx.get_throughput_sum(kernel_exact)
+        self.assertTrue(max(tp_exact) <= max(tp_optimal))
+        self.assertAlmostEqual(sum(tp_exact), sum(tp_fixed), delta=0.01 * len(tp_fixed))
+
+        # arm
+        kernel_fixed = deepcopy(self.kernel_AArch64)
+        self.semantics_tx2.add_semantics(kernel_fixed)
+        kernel_optimal = deepcopy(kernel_fixed)
+        self.semantics_tx2.assign_optimal_throughput(kernel_optimal)
+        kernel_exact = deepcopy(kernel_fixed)
+        self.semantics_tx2.assign_exact_throughput(kernel_exact)
+        tp_fixed = self.semantics_tx2.get_throughput_sum(kernel_fixed)
+        tp_optimal = self.semantics_tx2.get_throughput_sum(kernel_optimal)
+        tp_exact = self.semantics_tx2.get_throughput_sum(kernel_exact)
+        self.assertTrue(max(tp_exact) <= max(tp_optimal))
+        self.assertAlmostEqual(sum(tp_exact), sum(tp_fixed), delta=0.01 * len(tp_fixed))
+
+    def test_port_scheduler(self):
+        # port 0 is bottleneck, uop on ports 0 and 1 must go to port 1 completely
+        shares = schedule_uops([(1, [0, 1]), (1, [0])], 2)
+        self.assertEqual(shares, [{0: 0.0, 1: 1.0}, {0: 1.0}])
+        # 3 cy on ports 0/1 make them the bottleneck, uop on ports 1/2 goes to port 2
+        shares = schedule_uops([(3, [0, 1]), (1, [1, 2])], 3)
+        port_sums = [sum(s.get(p, 0.0) for s in shares) for p in range(3)]
+        self.assertEqual(port_sums, [1.5, 1.5, 1.0])
+        # 2 cy on ports 0/1 and 2 cy on 1/2 balance to 4/3 cy on each port
+        shares = schedule_uops([(2, [0, 1]), (2, [1, 2])], 3)
+        port_sums = [sum(s.get(p, 0.0) for s in shares) for p in range(3)]
+        for port_sum in port_sums:
+            self.assertAlmostEqual(port_sum, 4 / 3)
+        # fixed base load is considered
+        shares = schedule_uops([(2, [0, 1])], 2, base_load=[1.0, 0.0])
+        self.assertEqual(shares, [{0: 0.5, 1: 1.5}])
+        # zero-cycle uops and uops without ports are ignored
+        self.assertEqual(schedule_uops([(0, [0, 1]), (1, [])], 2), [{0: 0.0, 1: 0.0}, {}])
+
     def test_kernelDG_x86(self):
         #
         #  4
@@ -294,6 +538,27 @@ class TestSemanticTools(unittest.TestCase):
         # test dot creation
         dg.export_graph(filepath='/dev/null')
 
+    def test_kernelDG_dependents(self):
+        # linear def-use lookup must find the same dependencies as the forward scan
+        for kernel, parser, model in [
+            (self.kernel_x86, self.parser_x86, self.machine_model_csx),
+            (self.kernel_AArch64, self.parser_AArch64, self.machine_model_tx2),
+        ]:
+            dg = KernelDG(kernel, parser, model)
+            for flag_dependencies in [False, True]:
+                dependents = dg._find_dependents(kernel, flag_dependencies=flag_dependencies)
+                for i, instruction_form in enumerate(kernel):
+                    with self.subTest(
+                        line_number=instruction_form.line_number, flags=flag_dependencies
+                    ):
+                        expected = dg.find_depending(
+                            instruction_form, kernel[i + 1 :], flag_dependencies=flag_dependencies
+                        )
+                        self.assertEqual(
+                            sorted({instr.line_number for instr in expected}),
+                            [instr.line_number for instr in dependents[i]],
+                        )
+
     def test_hidden_load(self):
         machine_model_hld = MachineModel(
             path_to_yaml=self._find_file('hidden_load_machine_model.yml')
@@ -325,6 +590,71 @@ class TestSemanticTools(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             dg.get_loopcarried_dependencies()
 
+    def test_cached_critical_path_and_lcd(self):
+        dg = KernelDG(self.kernel_x86, self.parser_x86, self.machine_model_csx)
+        cp = dg.get_critical_path()
+        self.assertIs(dg.get_critical_path(), cp)
+        self.assertIs(dg.critical_path, cp)
+        self.assertEqual(dg.critical_path_latency, sum(x['latency_cp'] for x in cp))
+        lcd = dg.get_loopcarried_dependencies()
+        self.assertEqual(list(dg.loopcarried_latencies), list(lcd))
+        for root, dep in lcd.items():
+            self.assertEqual(
+                dg.loopcarried_latencies[root], sum(x['latency_lcd'] for x in dep['dependencies'])
+            )
+        # critical path is found again for a new graph
+        graph = dg.dg
+        graph.add_edge(100, 101, latency=1.0)
+        graph.add_edge(101, 100, latency=1.0)
+        dg.dg = graph
+        with self.assertRaises(NotImplementedError):
+            dg.critical_path
+        with self.assertRaises(NotImplementedError):
+            dg.loopcarried_latencies
+
+    def test_modified_dg(self):
+        dg = KernelDG(self.kernel_x86, self.parser_x86, self.machine_model_csx)
+        self.assertEqual(dg.critical_path_latency, 9)
+        graph = dg.dg
+        self.assertIs(dg.dg, graph)
+        # in-place changes are applied on the next query
+        graph.edges[4, 6]['latency'] = 10
+        self.assertEqual([x['line_number'] for x in dg.critical_path], [4, 6, 7])
+        self.assertEqual(self.kernel_x86[1]['latency_cp'], 0)
+        self.assertEqual(len(dg.get_loopcarried_dependencies()), 2)
+        # assigning a cyclic graph resets CP and LCD annotations
+        cyclic = nx.DiGraph(graph)
+        cyclic.add_edge(7, 3, latency=1)
+        dg.dg = cyclic
+        self.assertIs(dg.dg, cyclic)
+        self.assertEqual(dg.loopcarried_deps, {})
+        for instruction_form in self.kernel_x86:
+            self.assertEqual(instruction_form['latency_cp'], 0)
+            self.assertEqual(instruction_form['latency_lcd'], 0)
+        with self.assertRaises(NotImplementedError):
+            dg.loopcarried_latencies
+        cyclic.remove_edge(7, 3)
+        self.assertEqual([x['line_number'] for x in dg.critical_path], [4, 6, 7])
+        self.assertEqual(dg.loopcarried_latencies, {5: 1, 8: 1})
+
+    def test_array_dag(self):
+        graph = nx.DiGraph()
+        graph.add_nodes_from([3, 1, 2, 4, 0], instruction_form=None)
+        for u, v, latency in [(3, 1, 2), (3, 2, 4), (1, 4, 5), (2, 4, 3), (0, 4, 7)]:
+            graph.add_edge(u, v, latency=latency)
+        dag = ArrayDAG.from_networkx(graph)
+        self.assertTrue(dag.is_acyclic())
+        self.assertEqual(dag.longest_path(), nx.dag_longest_path(graph, weight='latency'))
+        self.assertEqual(dag.get_latency(1, 4), 5)
+        self.assertFalse(dag.has_edge(4, 1))
+        self.assertEqual(list(dag.successors(3)), [1, 2])
+        # round trip keeps order of nodes and edges
+        exported = dag.to_networkx()
+        self.assertEqual(list(exported.nodes), list(graph.nodes))
+        self.assertEqual(list(exported.edges(data=True)), list(graph.edges(data=True)))
+        graph.add_edge(4, 3, latency=1)
+        self.assertFalse(ArrayDAG.from_networkx(graph).is_acyclic())
+
     def test_loop_carried_dependency_x86(self):
         lcd_id = 8
         lcd_id2 = 5
@@ -351,6 +681,226 @@ class TestSemanticTools(unittest.TestCase):
             dg.dg.nodes(data=True)[lcd_id2]['instruction_form'],
         )
 
+    def test_loopcarried_dependents(self):
+        dg = KernelDG(self.kernel_x86, self.parser_x86, self.machine_model_csx)
+        kernel = deepcopy(self.kernel_x86)
+        dependents = dg._find_loopcarried_dependents(kernel)
+        # addl $1, %ecx depends on itself, addq $32, %rax on itself and all %rax reads before
+        self.assertEqual(dependents, [[], [], [], [3], [], [], [1, 2, 4, 5, 6], [], []])
+        # kernel is not modified
+        self.assertEqual(kernel, self.kernel_x86)
+
+    def test_store_dependents_x86(self):
+        code = (
+            'vmovsd -8(%rax), %xmm0\n'
+            'vaddsd %xmm1, %xmm0, %xmm0\n'
+            'vmovsd %xmm0, (%rax)\n'
+            'vmovsd 8(%rax), %xmm2\n'
+            'vmovsd (%rax), %xmm3\n'
+            'addq $8, %rax\n'
+        )
+        kernel = self._get_kernel(code, self.parser_x86, self.semantics_csx)
+        # same address in the same iteration, shifted by the increment of %rax in the next one
+        self.assertEqual(find_store_dependents(kernel, self.parser_x86), [[], [], [4], [], [], []])
+        self.assertEqual(
+            find_store_dependents(kernel, self.parser_x86, loopcarried=True),
+            [[], [], [0], [], [], []],
+        )
+        # overlapping accesses of known width
+        code = 'movq %rax, (%rdx)\nmovl 4(%rdx), %ecx\nmovl 8(%rdx), %esi\nmovl -4(%rdx), %edi\n'
+        kernel = self._get_kernel(code, self.parser_x86, self.semantics_csx)
+        self.assertEqual(find_store_dependents(kernel, self.parser_x86), [[1], [], [], []])
+
+    def test_store_dependents_AArch64(self):
+        code = (
+            'ldr d0, [x1, #-8]\n'
+            'fadd d0, d0, d1\n'
+            'str d0, [x1], #8\n'
+            'ldr d2, [x1, #-8]\n'
+            'ldr d3, [x1]\n'
+            'ldr d4, [x2]\n'
+        )
+        kernel = self._get_kernel(code, self.parser_AArch64, self.semantics_tx2)
+        self.assertEqual(
+            find_store_dependents(kernel, self.parser_AArch64), [[], [], [3], [], [], []]
+        )
+        self.assertEqual(
+            find_store_dependents(kernel, self.parser_AArch64, loopcarried=True),
+            [[], [], [0], [], [], []],
+        )
+
+    def test_memory_dependency(self):
+        code = (
+            'vmovsd -8(%rax), %xmm0\n'
+            'vaddsd %xmm1, %xmm0, %xmm0\n'
+            'vmovsd %xmm0, (%rax)\n'
+            'vaddsd (%rax), %xmm2, %xmm2\n'
+            'addq $8, %rax\n'
+        )
+        kernel = self._get_kernel(code, self.parser_x86, self.semantics_csx)
+        dg = KernelDG(kernel, self.parser_x86, self.machine_model_csx)
+        # store to the load of the same iteration
+        self.assertTrue(dg.dg.has_edge(3, 4.1))
+        # recurrence through memory with the store-to-load forwarding as load latency
+        lc_deps = dg.get_loopcarried_dependencies()
+        self.assertIn(3, lc_deps)
+        self.assertEqual(lc_deps[3]['dependencies'], kernel[:3])
+        self.assertEqual(
+            dg.loopcarried_latencies[3], kernel[0]['latency'] + kernel[1]['latency_wo_load']
+        )
+        self.assertEqual(
+            self.machine_model_csx.get_store_to_load_forward_latency('gpr'),
+            self.machine_model_csx['load_latency']['gpr'],
+        )
+        # stored data of a post-indexed store only reaches loads, not the updated base register
+        kernel = self._get_kernel(
+            'ldr d0, [x1, #-8]\nfadd d0, d0, d1\nstr d0, [x1], #8\nldr d2, [x1, #-8]\n',
+            self.parser_AArch64,
+            self.semantics_tx2,
+        )
+        dg = KernelDG(kernel, self.parser_AArch64, self.machine_model_tx2)
+        self.assertTrue(dg.dg.has_edge(3, 4))
+        lc_deps = dg.get_loopcarried_dependencies()
+        self.assertEqual(list(lc_deps), [3])
+        self.assertEqual(lc_deps[3]['dependencies'], kernel[:3])
+
+    def test_unroll_info_x86(self):
+        code = (
+            '.L2:\n'
+            'vmovupd (%rsi,%rax), %ymm0\n'
+            'vaddpd (%rdx,%rax), %ymm0, %ymm0\n'
+            'vmovupd %ymm0, (%rdi,%rax)\n'
+            'vmovupd 32(%rsi,%rax), %ymm1\n'
+            'vaddpd 32(%rdx,%rax), %ymm1, %ymm1\n'
+            'vmovupd %ymm1, 32(%rdi,%rax)\n'
+            'addq $64, %rax\n'
+            'cmpq %rcx, %rax\n'
+            'jne .L2\n'
+        )
+        kernel = self._get_kernel(code, self.parser_x86, self.semantics_csx)
+        # two copies of a loop over four doubles
+        self.assertEqual(
+            find_unroll_info(kernel, self.parser_x86),
+            {
+                'label': '.L2',
+                'unroll_factor': 8,
+                'stride': 8,
+                'pointer_increment': 64,
+                'copies': 2,
+                'counter': 'rax',
+                'control': [8, 9, 10],
+            },
+        )
+        canonical = get_canonical_iteration(kernel, self.parser_x86)
+        self.assertEqual(canonical, kernel[:4] + kernel[7:])
+        # no loop
+        self.assertIsNone(find_unroll_info(kernel[1:-1], self.parser_x86))
+        self.assertIsNone(get_canonical_iteration(kernel[1:-1], self.parser_x86))
+
+    def test_unroll_info_AArch64(self):
+        code = (
+            '.L2:\n'
+            'ldr d0, [x1]\n'
+            'ldr d1, [x1, #8]\n'
+            'fmul d0, d0, d2\n'
+            'fmul d1, d1, d2\n'
+            'str d0, [x0]\n'
+            'str d1, [x0, #8]\n'
+            'add x1, x1, #16\n'
+            'add x0, x0, #16\n'
+            'subs x2, x2, #2\n'
+            'b.ne .L2\n'
+        )
+        kernel = self._get_kernel(code, self.parser_AArch64, self.semantics_tx2)
+        unroll = find_unroll_info(kernel, self.parser_AArch64)
+        self.assertEqual(
+            (unroll['unroll_factor'], unroll['stride'], unroll['copies'], unroll['counter']),
+            (2, 8, 2, 'x2'),
+        )
+        canonical = get_canonical_iteration(kernel, self.parser_AArch64)
+        self.assertEqual(canonical, [kernel[i] for i in [0, 1, 3, 5, 7, 8, 9, 10]])
+        # copies sharing data cannot be separated
+        kernel = self._get_kernel(
+            code.replace('fmul d1, d1, d2', 'fmul d1, d1, d0'),
+            self.parser_AArch64,
+            self.semantics_tx2,
+        )
+        self.assertIsNone(get_canonical_iteration(kernel, self.parser_AArch64))
+
+    def test_loop_carried_dependency_longest_chain(self):
+        # every instruction depends on both predecessors, i.e., exponentially many paths
+        regs = ['ymm0', 'ymm1', 'ymm2']
+        code = '\n'.join(
+            'vaddpd %{}, %{}, %{}'.format(regs[i % 3], regs[(i + 1) % 3], regs[(i + 2) % 3])
+            for i in range(30)
+        )
+        kernel = self.parser_x86.parse_file(code)
+        for instruction_form in kernel:
+            self.semantics_csx.assign_src_dst(instruction_form)
+            self.semantics_csx.assign_tp_lt(instruction_form)
+        dg = KernelDG(kernel, self.parser_x86, self.machine_model_csx)
+        lc_deps = dg.get_loopcarried_dependencies()
+        longest = max(lc_deps.values(), key=lambda dep: len(dep['dependencies']))
+        # recurrence with maximum latency runs through the whole kernel
+        self.assertEqual(longest['dependencies'], kernel)
+
+    def test_loop_carried_dependency_writeback(self):
+        # kernel of update.s.tx2.clang
+        code = (
+            '.LBB1_32:\n'
+            'ldp q0, q1, [x8]\n'
+            'ldp q2, q3, [x8, #-32]\n'
+            'fmul v2.2d, v2.2d, v26.2d\n'
+            'fmul v3.2d, v3.2d, v26.2d\n'
+            'stp q2, q3, [x8, #-32]\n'
+            'fmul v0.2d, v0.2d, v26.2d\n'
+            'fmul v1.2d, v1.2d, v26.2d\n'
+            'stp q0, q1, [x8], #64\n'
+            'adds x9, x9, #1\n'
+            'b.ne .LBB1_32\n'
+        )
+        kernel = self.parser_AArch64.parse_file(code)
+        for instruction_form in kernel:
+            self.semantics_tx2.assign_src_dst(instruction_form)
+            self.semantics_tx2.assign_tp_lt(instruction_form)
+        dg = KernelDG(kernel, self.parser_AArch64, self.machine_model_tx2)
+        # the stored data does not delay the update of x8
+        lc_deps = dg.get_loopcarried_dependencies()
+        self.assertEqual(sorted(lc_deps), [9, 10])
+        self.assertEqual(lc_deps[9]['dependencies'], [kernel[8]])
+        self.assertEqual(lc_deps[10]['dependencies'], [kernel[9]])
+
+    def test_critical_path_writeback(self):
+        # kernel of update.s.tx2.gcc
+        code = (
+            '.L17:\n'
+            'ldr q23, [x16]\n'
+            'mov x17, x16\n'
+            'add x16, x16, 128\n'
+            'fmul v24.2d, v23.2d, v2.2d\n'
+            'str q24, [x17], 16\n'
+            'ldr q25, [x16, -112]\n'
+            'fmul v26.2d, v25.2d, v2.2d\n'
+            'str q26, [x16, -112]\n'
+            'ldr q27, [x17, 16]\n'
+            'fmul v28.2d, v27.2d, v2.2d\n'
+            'str q28, [x17, 16]\n'
+            'cmp x22, x16\n'
+            'bne .L17\n'
+        )
+        kernel = self.parser_AArch64.parse_file(code)
+        for instruction_form in kernel:
+            self.semantics_tx2.assign_src_dst(instruction_form)
+            self.semantics_tx2.assign_tp_lt(instruction_form)
+        dg = KernelDG(kernel, self.parser_AArch64, self.machine_model_tx2)
+        # the LCD search must not change the critical path through post-indexed stores
+        cp = dg.get_critical_path()
+        self.assertEqual([instr['line_number'] for instr in cp], [2, 5, 6, 10, 11, 12])
+        self.assertEqual(sum(instr['latency_cp'] for instr in cp), 20)
+        lc_deps = dg.get_loopcarried_dependencies()
+        self.assertEqual(sorted(lc_deps), [4])
+        self.assertEqual(lc_deps[4]['dependencies'], [kernel[3]])
+
     def test_is_read_is_written_x86(self):
         # independent form HW model
         dag = KernelDG(self.kernel_x86, self.parser_x86, None)
@@ -488,6 +1038,14 @@ class TestSemanticTools(unittest.TestCase):
     ##################
     # Helper functions
     ##################
+    @staticmethod
+    def _get_kernel(code, parser, semantics):
+        kernel = parser.parse_file(code)
+        for instruction_form in kernel:
+            semantics.assign_src_dst(instruction_form)
+            semantics.assign_tp_lt(instruction_form)
+        return kernel
+
 
     @staticmethod
     def _find_file(name):